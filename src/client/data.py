@@ -1,5 +1,7 @@
 from collections import namedtuple
 
+from evolution.core.codec import (
+    CARD, CARD_CODES, SPECIES, unpack_list, unpack_nibbles, unpack_traits)
 from evolution.core.utils import lmap
 from evolution.core.card import BaseCard
 from evolution.core.species import BaseSpecies
@@ -48,6 +50,22 @@ class Opponent(namedtuple('Opponent', ['boards'])):
         boards = lmap(Species.from_json, jboards)
         return cls(boards)
 
+    @classmethod
+    def from_binary(cls, buf, offset):
+        """
+        :param buf: buffer holding a BinaryList of BinarySpecies
+        :type buf: bytes or memoryview
+
+        :param offset: position of the boards in buf
+        :type offset: Natural
+
+        :returns: opponent and the offset just past its boards
+        :rtype: (Opponent, Natural)
+        """
+
+        boards, offset = unpack_list(buf, offset, Species.from_binary)
+        return cls(boards), offset
+
     def to_json(self):
         return [species.to_json() for species in self.boards]
 
@@ -180,6 +198,103 @@ class Species(BaseSpecies):
 
         return cls(food, body, population, traits, fat_food)
 
+    @classmethod
+    def from_binary(cls, buf, offset):
+        """
+        :param buf: buffer holding a BinarySpecies
+        :type buf: bytes or memoryview
+
+        :param offset: position of the species in buf
+        :type offset: Natural
+
+        :returns: species and the offset just past it
+        :rtype: (Species, Natural)
+        """
+
+        food_body, population_fat_food, trait_field = SPECIES.unpack_from(
+            buf, offset)
+        food, body = unpack_nibbles(food_body)
+        population, fat_food = unpack_nibbles(population_fat_food)
+
+        if not (is_nat(food) and is_nat(body) and is_nat(fat_food)):
+            raise ValueError('food, body and fat food must be Nats')
+        if not (is_nat(population) and
+                population >= Species.MIN_POPULATION):
+            raise ValueError('population must be a Nat greater than {}'
+                             .format(Species.MIN_POPULATION))
+
+        traits = unpack_traits(trait_field)
+        cls._validate_traits(traits)
+        if fat_food > 0 and Trait.fat_tissue not in traits:
+            raise ValueError('fat tissue must be in traits if fat food is > 0')
+
+        species = cls(food, body, population, traits, fat_food)
+        return species, offset + SPECIES.size
+
+
+class SpeciesView(Species):
+    """Read-only view of a species from any representation of the game
+
+    :attr species: the viewed species
+    :type species: BaseSpecies
+    """
+
+    __slots__ = ['species']
+
+    def __init__(self, species):
+        self.species = species
+
+    food = property(lambda self: self.species.food)
+    body = property(lambda self: self.species.body)
+    population = property(lambda self: self.species.population)
+    traits = property(lambda self: tuple(self.species.traits))
+    fat_food = property(lambda self: self.species.fat_food)
+
+    def copy(self):
+        return Species(
+            self.food, self.body, self.population, list(self.traits),
+            self.fat_food)
+
+
+class PlayerView(namedtuple('PlayerView', ['boards', 'cards', 'bag'])):
+    """Read-only view of a player from any representation of the game
+
+    :attr boards: views of the player's species boards
+    :type boards: tuple of SpeciesView
+
+    :attr cards: cards held in the player's hand
+    :type cards: tuple of BaseCard
+
+    :attr bag: amount of tokens in the player's food bag
+    :type bag: Natural
+    """
+
+    @classmethod
+    def of(cls, player):
+        """
+        :param player: the player to view
+        :type player: BasePlayer
+
+        :returns: view of the player
+        :rtype: PlayerView
+        """
+
+        return cls(view_boards(player.boards), tuple(player.cards),
+                   player.bag)
+
+
+def view_boards(boards):
+    """Creates read-only views of species boards
+
+    :param boards: species boards to view
+    :type boards: list of BaseSpecies
+
+    :returns: views of the boards
+    :rtype: tuple of SpeciesView
+    """
+
+    return tuple(SpeciesView(species) for species in boards)
+
 
 class Card(BaseCard):
 
@@ -205,6 +320,27 @@ class Card(BaseCard):
 
         return cls(food, trait)
 
+    @classmethod
+    def from_binary(cls, buf, offset):
+        """Convert a binary card to the internal representation
+
+        :param buf: buffer holding a BinaryCard
+        :type buf: bytes or memoryview
+
+        :param offset: position of the card in buf
+        :type offset: Natural
+
+        :returns: card and the offset just past it
+        :rtype: (Card, Natural)
+        """
+
+        [code] = CARD.unpack_from(buf, offset)
+        if code >= len(CARD_CODES):
+            raise ValueError('{} is not a valid card code'.format(code))
+
+        food, trait = CARD_CODES[code]
+        return cls(food, trait), offset + CARD.size
+
     @staticmethod
     def _validate_jcard(jcard):
         """validates a given jcard according to the json spec
@@ -1,13 +1,16 @@
 from enum import Enum
-import socket
 
+from evolution.core.codec import (
+    BINARY_CODEC, CHOOSE_FRAME, CODECS, FEED_NEXT_FRAME, JSON_CODEC,
+    START_FRAME, read_frame, unpack_list, unpack_natural)
 from evolution.core.connection import send_msg, read_msg
 from evolution.core.utils import (
-    assert_list_with_size, is_natural, is_natural_plus, lmap)
+    assert_list_with_size, is_natural, is_natural_plus)
 from evolution.client import strategy
 from evolution.client.action import (
     AddToWateringHole, AddPopulation, AddBody, AddSpecies, ReplaceTrait)
 from evolution.client.data import Card, Opponent, Player, Species
+from evolution.client.world import World
 
 
 """
@@ -65,7 +68,7 @@ class TurnEnum(Enum):
         :raises: ValueError if the msg does not represent a turn
         """
 
-        if msg == RemoteDealerProxy.SIGN_UP_RESPONSE:
+        if RemoteDealerProxy.is_signup_response(msg):
             return cls.unstarted
 
         if not isinstance(msg, list):
@@ -80,23 +83,107 @@ class TurnEnum(Enum):
 
         raise ValueError('Invalid message length from dealer')
 
+    @classmethod
+    def from_frame(cls, kind):
+        """The turn that the given binary frame kind represents
+
+        :param kind: kind of a BinaryFrame
+        :type kind: Natural
+
+        :returns: Turn the frame represents
+        :rtype: Turn
+
+        :raises: ValueError if the kind does not represent a turn
+        """
+
+        if kind == START_FRAME:
+            return cls.start
+        if kind == CHOOSE_FRAME:
+            return cls.choose
+        if kind == FEED_NEXT_FRAME:
+            return cls.feedNext
+
+        raise ValueError('Invalid frame kind from dealer')
+
 
 Turn = TurnEnum('Turn', ['unstarted', 'start', 'choose', 'feedNext'])
 
 
 class BaseDealerProxy:
 
-    def __init__(self):
+    def __init__(self, feed_next=None, play_cards=None):
         """
         :attr current_turn: the current turn of the game
         :type current_turn: Turn
 
         :attr player_state: the current state of the player
         :type player_state: Player
+
+        :attr world: decoded game state kept across messages, so unchanged
+                     species, cards and opponents are handed to the strategies
+                     as the same objects
+        :type world: World
+
+        :attr feed_next: strategy picking feedings, the greedy one by default
+        :type feed_next: (Player, Natural+, list of Opponent) -> Feeding
+
+        :attr play_cards: strategy picking card plays, the default heuristic
+                          if not given
+        :type play_cards: (Player, list of Opponent, list of Opponent)
+                          -> dict of (type -> Action or list of Action)
         """
 
         self.current_turn = Turn.unstarted
         self.player_state = Player()
+        self.world = World()
+        self.feed_next = feed_next or strategy.feedNext
+        self.play_cards = play_cards or strategy.play_cards
+
+    def respond(self, msg):
+        """Moves to the turn the dealer's message starts and answers it
+
+        :param msg: message received from the dealer
+        :type msg: JSON
+
+        :returns: reply for the dealer, None if the message needs no reply
+        :rtype: JSON or None
+
+        :raises: ValueError if the message is invalid or out of turn
+        """
+
+        next_turn = Turn.from_msg(msg)
+        self._validate_next_turn(next_turn)
+
+        self.current_turn = next_turn
+        if self.current_turn is Turn.unstarted:
+            self._handle_unstarted(msg)
+        if self.current_turn is Turn.start:
+            self._handle_start(msg)
+        if self.current_turn is Turn.choose:
+            return self._serialize_actions(self._choose_actions(*msg))
+        if self.current_turn is Turn.feedNext:
+            return self._choose_feeding(*msg).to_json()
+
+    def _handle_unstarted(self, msg):
+        """Handle response from the dealer of an unstarted game
+
+        :raises: ValueError if the dealer does not respond positively
+        """
+
+        if msg != RemoteDealerProxy.SIGN_UP_RESPONSE:
+            raise ValueError('invalid registration response')
+
+    def _handle_start(self, msg):
+        """Lets the external player know that a new turn has started
+
+        :param msg: message to signify start turn
+        :type msg: [Natural, JPlayer]
+
+        :effect: updates self.player_state
+        """
+
+        watering_hole, *jplayer = msg
+        self._set_player_state(watering_hole, jplayer)
 
     def _set_player_state(self, watering_hole, jplayer):
         """Updates the player's knowledge of the state of the game
@@ -113,7 +200,7 @@ class BaseDealerProxy:
         if not is_natural(watering_hole):
             raise ValueError('Watering hole must be a Natural')
 
-        self.player_state = Player.from_json(jplayer)
+        self.player_state = self.world.see_player(jplayer)
 
     def _choose_actions(self, before_jopponents, after_jopponents):
         """Choose actions to play
@@ -132,11 +219,99 @@ class BaseDealerProxy:
                 isinstance(after_jopponents, list)):
             raise ValueError('Before and after opponents must be lists')
 
-        before_opponents = lmap(Opponent.from_json, before_jopponents)
-        after_opponents = lmap(Opponent.from_json, after_jopponents)
-        return strategy.play_cards(
+        opponents = self.world.see_opponents(
+            before_jopponents + after_jopponents)
+        before_opponents = opponents[:len(before_jopponents)]
+        after_opponents = opponents[len(before_jopponents):]
+        return self.play_cards(
             self.player_state, before_opponents, after_opponents)
 
+    @staticmethod
+    def _decode_start(payload):
+        """Converts a START_FRAME payload into internal representations
+
+        :param payload: binary representation of the start of a turn
+        :type payload: memoryview
+
+        :returns: watering hole, current state of the player
+        :rtype: (Natural, Player)
+
+        :raises: ValueError if the payload does not match the spec
+        """
+
+        watering_hole, offset = unpack_natural(payload, 0)
+        player, offset = BaseDealerProxy._decode_player(payload, offset)
+        BaseDealerProxy._validate_payload_end(payload, offset)
+
+        return watering_hole, player
+
+    @staticmethod
+    def _decode_choose(payload):
+        """Converts a CHOOSE_FRAME payload into internal representations
+
+        :param payload: binary representation of the opponents' boards
+        :type payload: memoryview
+
+        :returns: opponents who play before and after the current player
+        :rtype: (list of Opponent, list of Opponent)
+
+        :raises: ValueError if the payload does not match the spec
+        """
+
+        before_opponents, offset = unpack_list(
+            payload, 0, Opponent.from_binary)
+        after_opponents, offset = unpack_list(
+            payload, offset, Opponent.from_binary)
+        BaseDealerProxy._validate_payload_end(payload, offset)
+
+        return before_opponents, after_opponents
+
+    @staticmethod
+    def _decode_state(payload):
+        """Converts a FEED_NEXT_FRAME payload into internal representations
+
+        :param payload: binary representation of the state of the game
+        :type payload: memoryview
+
+        :returns: player, watering hole, opponents
+        :rtype: (Player, Natural+, list of Opponent)
+
+        :raises: ValueError if the payload does not match the spec
+        """
+
+        player, offset = BaseDealerProxy._decode_player(payload, 0)
+        watering_hole, offset = unpack_natural(payload, offset)
+        opponents, offset = unpack_list(payload, offset, Opponent.from_binary)
+        BaseDealerProxy._validate_payload_end(payload, offset)
+
+        if not is_natural_plus(watering_hole):
+            raise ValueError('Watering hole must be a natural plus')
+
+        return player, watering_hole, opponents
+
+    @staticmethod
+    def _decode_player(payload, offset):
+        """Converts a binary bag, boards and cards into a Player
+
+        :returns: player and the offset just past it
+        :rtype: (Player, Natural)
+        """
+
+        bag, offset = unpack_natural(payload, offset)
+        boards, offset = unpack_list(payload, offset, Species.from_binary)
+        cards, offset = unpack_list(payload, offset, Card.from_binary)
+        return Player(id=1, boards=boards, bag=bag, cards=cards), offset
+
+    @staticmethod
+    def _validate_payload_end(payload, offset):
+        """Makes sure the whole payload was decoded
+
+        :raises: ValueError if there are bytes left over in the payload
+        """
+
+        if offset != len(payload):
+            raise ValueError('Unexpected data at the end of the frame')
+
     def _choose_feeding(self, bag, jboards, jcards, watering_hole, jopponents):
         """Choose a feeding to make
 
@@ -170,13 +345,10 @@ class BaseDealerProxy:
         if not is_natural_plus(watering_hole):
             raise ValueError('Watering hole must be a natural plus')
 
-        boards = lmap(Species.from_json, jboards)
-        cards = lmap(Card.from_json, jcards)
-        opponents = lmap(Opponent.from_json, jopponents)
+        player = self.world.see_player([bag, jboards, jcards])
+        opponents = self.world.see_opponents(jopponents)
 
-        player = Player(bag=bag, boards=boards, cards=cards)
-
-        return strategy.feedNext(player, watering_hole, opponents)
+        return self.feed_next(player, watering_hole, opponents)
 
     @staticmethod
     def _serialize_actions(actions):
@@ -215,42 +387,122 @@ class RemoteDealerProxy(BaseDealerProxy):
     SIGN_UP_MSG = 'hello'
     SIGN_UP_RESPONSE = 'ok'
 
-    def __init__(self, host, port):
+    def __init__(self, sock, codec=JSON_CODEC, feed_next=None,
+                 play_cards=None, policy=None, name=None):
         """
-        :attr sock: connection to the Dealer
+        :attr sock: connection to the Dealer, from transport.connect or
+                    transport.pipe
         :type sock: socket.socket
+
+        :attr outbox: buffer every message to the dealer is encoded into,
+                      reused from one message to the next
+        :type outbox: bytearray
+
+        :attr name: (optional) name the player is rated under; players
+                    without one sign up with SIGN_UP_MSG and are rated
+                    for their current connection only
+        :type name: str or None
+
+        :attr requested_codec: codec asked for when signing up
+        :type requested_codec: Codec
+
+        :attr codec: codec the dealer agreed to use for its messages
+        :type codec: Codec
+
+        :attr policy: (optional) feeding policy delegated to the dealer when
+                      signing up; the dealer only asks for the feedings it
+                      declines, so it should agree with feed_next
+        :type policy: JPolicy or None
         """
 
-        self.sock = socket.create_connection((host, port))
-        super().__init__()
+        if codec not in CODECS:
+            raise ValueError('{} is not a valid codec'.format(codec))
+
+        self.sock = sock
+        self.outbox = bytearray()
+        self.name = name
+        self.requested_codec = codec
+        self.codec = JSON_CODEC
+        self.policy = policy
+        super().__init__(feed_next, play_cards)
+
+    @classmethod
+    def is_signup_response(cls, msg):
+        """Is the message the dealer's response to signing up?
+
+        :param msg: message received from the dealer
+        :type msg: JSON
+
+        :returns: whether the message accepts the sign up
+        :rtype: bool
+        """
+
+        return msg == cls.SIGN_UP_RESPONSE or (
+            isinstance(msg, list) and len(msg) == 2 and
+            msg[0] == cls.SIGN_UP_RESPONSE and isinstance(msg[1], dict))
 
     def request_join(self):
         """Send request to the server asking to join the game"""
 
-        send_msg(self.SIGN_UP_MSG, self.sock)
-        self._handle_msg()
+        options = {}
+        if self.requested_codec != JSON_CODEC:
+            options['codec'] = self.requested_codec
+        if self.policy is not None:
+            options['policy'] = self.policy
+
+        name = self.SIGN_UP_MSG if self.name is None else self.name
+        signup = [name, options] if options else name
+
+        send_msg(signup, self.sock, self.outbox)
+        while self._handle_msg():
+            pass
 
     def _handle_msg(self):
-        """Delegates the received message to the correct handler"""
+        """Delegates the received message to the correct handler
+
+        :returns: whether a message was received
+        :rtype: bool
+        """
+
+        if self.codec == BINARY_CODEC:
+            return self._handle_frame()
 
         msg = read_msg(self.sock)
         if not msg:
-            return
+            return False
 
-        next_turn = Turn.from_msg(msg)
+        reply = self.respond(msg)
+        if reply is not None:
+            send_msg(reply, self.sock, self.outbox)
+        return True
+
+    def _handle_frame(self):
+        """Delegates the received binary frame to the correct handler
+
+        :returns: whether a frame was received
+        :rtype: bool
+        """
+
+        frame = read_frame(self.sock)
+        if not frame:
+            return False
+
+        kind, payload = frame
+        next_turn = Turn.from_frame(kind)
         self._validate_next_turn(next_turn)
 
         self.current_turn = next_turn
-        if self.current_turn is Turn.unstarted:
-            self._handle_unstarted(msg)
         if self.current_turn is Turn.start:
-            self._handle_start(msg)
+            watering_hole, self.player_state = self._decode_start(payload)
         if self.current_turn is Turn.choose:
-            self._handle_choose(msg)
+            actions = self.play_cards(
+                self.player_state, *self._decode_choose(payload))
+            send_msg(self._serialize_actions(actions), self.sock, self.outbox)
         if self.current_turn is Turn.feedNext:
-            self._handle_feedNext(msg)
+            feeding = self.feed_next(*self._decode_state(payload))
+            send_msg(feeding.to_json(), self.sock, self.outbox)
 
-        self._handle_msg()
+        return True
 
     def _handle_unstarted(self, msg):
         """Handle response from the dealer of an unstarted game
@@ -258,40 +510,15 @@ class RemoteDealerProxy(BaseDealerProxy):
         :raises: ValueError if the dealer does not respond positively
         """
 
-        if msg != self.SIGN_UP_RESPONSE:
+        if not self.is_signup_response(msg):
             raise ValueError('invalid registration response')
 
-    def _handle_start(self, msg):
-        """Lets the external player know that a new turn has started
-
-        :param msg: message to signify start turn
-        :type msg: [Natural, JPlayer]
-
-        :effect: updates self.player_state
-        """
-
-        watering_hole, *jplayer = msg
-        self._set_player_state(watering_hole, jplayer)
-
-    def _handle_choose(self, msg):
-        """Send the player's card plays across the socket
-
-        :param msg: dealer message to deserialize into internal representations
-        :type msg: [list of JOpponent, list of JOpponent]
-        """
-
-        actions = self._choose_actions(*msg)
-        send_msg(self._serialize_actions(actions), self.sock)
-
-    def _handle_feedNext(self, msg):
-        """Send the player's feeding choice across the wire
-
-        :param msg: dealer message to deserialize into internal representations
-        :type msg: JState
-        """
-
-        feeding = self._choose_feeding(*msg)
-        send_msg(feeding.to_json(), self.sock)
+        if msg != self.SIGN_UP_RESPONSE:
+            [_, options] = msg
+            codec = options.get('codec', JSON_CODEC)
+            if codec not in {JSON_CODEC, self.requested_codec}:
+                raise ValueError('dealer chose a codec that was not requested')
+            self.codec = codec
 
 
 class StaticDealerProxy(BaseDealerProxy):
@@ -0,0 +1,266 @@
+from collections import Counter
+import selectors
+import socket
+
+from evolution.core import transport
+from evolution.core.connection import MessageDecoder, write_msg
+from evolution.client.dealer_proxy import BaseDealerProxy, RemoteDealerProxy
+
+
+RECV_SIZE = 4096  # bytes read from a bot's socket at a time
+FEED_SECONDS = 0.8  # seconds shared by the feedings answered at once
+
+
+class HostedDealerProxy(BaseDealerProxy):
+    """Dealer proxy for one bot whose socket is driven by a BotHost"""
+
+    def __init__(self, sock, feed_next=None, play_cards=None):
+        """
+        :attr sock: non-blocking connection to the dealer
+        :type sock: socket.socket
+
+        :attr decoder: splits the bytes received into messages
+        :type decoder: MessageDecoder
+
+        :attr outbox: replies waiting to be sent to the dealer
+        :type outbox: bytearray
+        """
+
+        super().__init__(feed_next, play_cards)
+        self.sock = sock
+        self.decoder = MessageDecoder()
+        self.outbox = bytearray()
+
+    def queue_msg(self, msg):
+        """Queues a message to be sent once the socket is writable
+
+        :param msg: message to send
+        :type msg: JSON
+        """
+
+        write_msg(msg, self.outbox)
+
+    def receive(self, data):
+        """Answers every message completed by the data received
+
+        :param data: bytes received from the dealer
+        :type data: bytes
+
+        :effect: queues the replies in self.outbox
+
+        :raises: ValueError if a message is invalid or out of turn
+        """
+
+        for msg in self.decoder.feed(data):
+            reply = self.respond(msg)
+            if reply is not None:
+                self.queue_msg(reply)
+
+
+class BotHost:
+    """Plays many bots against a dealer from a single process
+
+    Every bot has its own connection and turn state machine, but all of
+    them share the strategies and one thread, which waits on the sockets
+    with a selector and answers whichever dealer messages have arrived.
+
+    A feeding strategy that searches until a deadline is given one deadline
+    for all the bots answering at once, split evenly between them, since
+    every bot waits for the ones answered before it. A feeding asked for
+    while others are answered waits at most feed_seconds and then takes at
+    most feed_seconds, so FEED_SECONDS keeps it within the dealer's 2
+    second timeout.
+    """
+
+    def __init__(self, address, num_bots, feed_next=None, play_cards=None,
+                 feed_seconds=None):
+        """
+        :attr address: where the dealer listens
+        :type address: Address
+
+        :attr num_bots: number of bots to connect
+        :type num_bots: Natural+
+
+        :attr feed_next: (optional) strategy picking feedings for every bot
+        :type feed_next: (Player, Natural+, list of Opponent) -> Feeding
+
+        :attr play_cards: (optional) strategy picking card plays for every bot
+        :type play_cards: (Player, list of Opponent, list of Opponent)
+                          -> dict of (type -> Action or list of Action)
+
+        :attr feed_seconds: (optional) seconds the feedings answered at once
+                            may take together; feed_next is then given each
+                            bot's share as its deadline
+        :type feed_seconds: float or None
+
+        :attr finished: number of bots whose dealer closed the connection
+        :type finished: Natural
+
+        :attr failures: number of bots dropped, by the error that dropped them
+        :type failures: Counter of str
+        """
+
+        self.address = address
+        self.num_bots = num_bots
+        self.feed_next = feed_next
+        self.play_cards = play_cards
+        self.feed_seconds = feed_seconds
+        self.finished = 0
+        self.failures = Counter()
+        self.selector = selectors.DefaultSelector()
+        self._feed_deadline = feed_seconds
+
+    def run(self):
+        """Connects every bot and plays until all connections are closed"""
+
+        for _ in range(self.num_bots):
+            self.connect()
+
+        while self.selector.get_map() or self._is_waiting():
+            ready = self.selector.select(self._next_timeout())
+            if self.feed_seconds:
+                answering = sum(
+                    1 for _, events in ready if events & selectors.EVENT_READ)
+                self._feed_deadline = self.feed_seconds / max(answering, 1)
+
+            for key, events in ready:
+                proxy = key.data
+                if events & selectors.EVENT_READ:
+                    self._receive(proxy)
+                if events & selectors.EVENT_WRITE and proxy.sock.fileno() >= 0:
+                    self._flush(proxy)
+            self._tick()
+
+    def _is_waiting(self):
+        """Is there scheduled work left once every connection is closed?
+
+        :rtype: bool
+        """
+
+        return False
+
+    def _next_timeout(self):
+        """Seconds until scheduled work is due, None if there is none
+
+        :rtype: float or None
+        """
+
+        return None
+
+    def _tick(self):
+        """Does whatever scheduled work is due after handling the sockets"""
+
+        pass
+
+    def connect(self):
+        """Starts connecting one bot to the dealer and queues its sign up
+
+        The connection completes in the background, so a dealer that only
+        accepts a few connections at a time cannot stall the other bots.
+
+        :returns: proxy of the connecting bot
+        :rtype: HostedDealerProxy
+        """
+
+        sock = transport.connect(self.address, blocking=False)
+
+        proxy = self._make_proxy(sock)
+        proxy.queue_msg(RemoteDealerProxy.SIGN_UP_MSG)
+        self.selector.register(
+            sock, selectors.EVENT_READ | selectors.EVENT_WRITE, proxy)
+        return proxy
+
+    def _make_proxy(self, sock):
+        """Creates the proxy of a newly connected bot
+
+        :param sock: non-blocking connection to the dealer
+        :type sock: socket.socket
+
+        :rtype: HostedDealerProxy
+        """
+
+        return HostedDealerProxy(sock, self._bot_feed_next(), self.play_cards)
+
+    def _bot_feed_next(self):
+        """The feeding strategy to hand a newly connected bot
+
+        :returns: feed_next, held to the bot's share of feed_seconds if set
+        :rtype: (Player, Natural+, list of Opponent) -> Feeding or None
+        """
+
+        if not self.feed_seconds:
+            return self.feed_next
+
+        def feed_next(player, watering_hole, opponents):
+            return self.feed_next(player, watering_hole, opponents,
+                                  deadline=self._feed_deadline)
+        return feed_next
+
+    def _receive(self, proxy):
+        """Reads what the dealer sent the bot and answers it
+
+        :param proxy: bot whose socket is readable
+        :type proxy: HostedDealerProxy
+        """
+
+        try:
+            data = proxy.sock.recv(RECV_SIZE)
+        except BlockingIOError:
+            return
+        except socket.error as error:
+            return self._close(proxy, error)
+
+        if not data:
+            return self._close(proxy)
+
+        try:
+            proxy.receive(data)
+        except ValueError as error:
+            return self._close(proxy, error)
+        self._update_interest(proxy)
+
+    def _flush(self, proxy):
+        """Sends as much of the bot's queued replies as the socket takes
+
+        :param proxy: bot whose socket is writable
+        :type proxy: HostedDealerProxy
+        """
+
+        try:
+            sent = proxy.sock.send(proxy.outbox)
+        except BlockingIOError:
+            return
+        except socket.error as error:
+            return self._close(proxy, error)
+
+        del proxy.outbox[:sent]
+        self._update_interest(proxy)
+
+    def _update_interest(self, proxy):
+        """Waits for the bot's socket to be writable only if it has replies
+
+        :param proxy: bot to update
+        :type proxy: HostedDealerProxy
+        """
+
+        events = selectors.EVENT_READ
+        if proxy.outbox:
+            events |= selectors.EVENT_WRITE
+        self.selector.modify(proxy.sock, events, proxy)
+
+    def _close(self, proxy, error=None):
+        """Closes the bot's connection
+
+        :param proxy: bot to close
+        :type proxy: HostedDealerProxy
+
+        :param error: (optional) error that dropped the bot
+        :type error: Exception
+        """
+
+        self.selector.unregister(proxy.sock)
+        proxy.sock.close()
+        if error is None:
+            self.finished += 1
+        else:
+            self.failures[type(error).__name__] += 1
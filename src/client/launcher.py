@@ -0,0 +1,218 @@
+import gc
+import os
+import subprocess
+import sys
+import time
+
+from evolution.core import transport
+from evolution.core.codec import JSON_CODEC
+from evolution.client.dealer_proxy import BaseDealerProxy, RemoteDealerProxy
+
+
+READ_SIZE = 4096  # bytes read from the startup report pipe at a time
+FRESH_START = (  # what a bot started without forking has to run first
+    'from evolution.client.launcher import BotLauncher\n'
+    'BotLauncher(None).warm_up()')
+
+"""
+Messages a bot answers while the launcher warms up, covering the decoding,
+strategies and encoding of a whole turn
+"""
+WARM_UP_MSGS = [
+    [0, 0, [], [[3, 'carnivore'], [1, 'fat-tissue'], [0, 'burrowing'],
+                [-2, 'climbing']]],
+    [[], [[[['food', 0], ['body', 2], ['population', 2],
+            ['traits', ['climbing']]]]]],
+    [0, [[['food', 0], ['body', 0], ['population', 1],
+          ['traits', ['carnivore']]],
+         [['food', 0], ['body', 0], ['population', 1], ['traits', []]]],
+     [], 3, [[[['food', 0], ['body', 2], ['population', 2],
+               ['traits', []]]]]]
+]
+
+
+def time_fresh_start():
+    """Times getting a bot ready in a fresh interpreter instead of a fork
+
+    The interpreter imports the client and plays through the same sample
+    turn as BotLauncher.warm_up, which is what every bot would pay when
+    started on its own. It does not connect.
+
+    :returns: seconds from starting the interpreter until it exits
+    :rtype: float
+
+    :raises: subprocess.CalledProcessError if the interpreter fails
+    """
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    started = time.monotonic()
+    subprocess.run([sys.executable, '-c', FRESH_START], env=env, check=True)
+    return time.monotonic() - started
+
+
+class BotLauncher:
+    """Starts bot processes by forking an interpreter that is ready to play
+
+    The launcher pays for imports and warm up once; every bot is a forked
+    child that only has to connect before signing up. Each child reports
+    how long it took from being launched to being ready to sign up.
+    """
+
+    def __init__(self, address, codec=JSON_CODEC, feed_next=None,
+                 play_cards=None):
+        """
+        :attr address: where the dealer listens
+        :type address: Address
+
+        :attr codec: codec every bot asks for when signing up
+        :type codec: Codec
+
+        :attr feed_next: (optional) strategy picking feedings for every bot
+        :type feed_next: (Player, Natural+, list of Opponent) -> Feeding
+
+        :attr play_cards: (optional) strategy picking card plays for every bot
+        :type play_cards: (Player, list of Opponent, list of Opponent)
+                          -> dict of (type -> Action or list of Action)
+
+        :attr startup_seconds: time each reporting bot took to get ready
+        :type startup_seconds: list of float
+
+        :attr finished: number of bots that exited cleanly
+        :type finished: Natural
+
+        :attr failed: number of bots that exited with an error
+        :type failed: Natural
+        """
+
+        self.address = address
+        self.codec = codec
+        self.feed_next = feed_next
+        self.play_cards = play_cards
+        self.startup_seconds = []
+        self.finished = 0
+        self.failed = 0
+        self._pids = []
+        self._reports = []
+
+    def warm_up(self):
+        """Runs a bot through a turn so its code paths are ready to fork
+
+        Objects alive after the warm up are moved out of the garbage
+        collector's reach, keeping them shared with the children instead of
+        copied when the collector touches them.
+        """
+
+        proxy = BaseDealerProxy(self.feed_next, self.play_cards)
+        for msg in WARM_UP_MSGS:
+            proxy.respond(msg)
+
+        gc.collect()
+        gc.freeze()
+
+    def run(self, num_bots):
+        """Launches bots and waits until every one of them has exited
+
+        :param num_bots: number of bots to launch
+        :type num_bots: Natural+
+        """
+
+        self.launch(num_bots)
+        self.wait()
+
+    def launch(self, num_bots):
+        """Forks bots that connect and play in the background
+
+        :param num_bots: number of bots to launch
+        :type num_bots: Natural+
+        """
+
+        read_end, write_end = os.pipe()
+        self._pids.extend(
+            self._launch(read_end, write_end) for _ in range(num_bots))
+        os.close(write_end)
+        self._reports.append(read_end)
+
+    def wait(self):
+        """Waits until every launched bot has exited
+
+        :effect: records the bots' startup times and exit statuses
+        """
+
+        for read_end in self._reports:
+            self._read_reports(read_end)
+        self._reports = []
+
+        for pid in self._pids:
+            _, status = os.waitpid(pid, 0)
+            if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+                self.finished += 1
+            else:
+                self.failed += 1
+        self._pids = []
+
+    def _launch(self, read_end, write_end):
+        """Forks a bot that reports its startup time and plays
+
+        :param read_end: pipe the launcher reads startup times from
+        :type read_end: int
+
+        :param write_end: pipe the bot writes its startup time to
+        :type write_end: int
+
+        :returns: process id of the bot
+        :rtype: int
+        """
+
+        launched = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            for report in self._reports + [read_end]:
+                os.close(report)
+            self._play(launched, write_end)
+        return pid
+
+    def _play(self, launched, write_end):
+        """Connects and plays in the forked child
+
+        Never returns; the child exits once the dealer closes the
+        connection.
+
+        :param launched: monotonic time at which the bot was launched
+        :type launched: float
+
+        :param write_end: pipe to write the startup time to
+        :type write_end: int
+        """
+
+        status = 1
+        try:
+            dealer_proxy = RemoteDealerProxy(
+                transport.connect(self.address), self.codec,
+                self.feed_next, self.play_cards)
+            # one short line per bot, so writes from bots never interleave
+            os.write(write_end, '{:.6f}\n'.format(
+                time.monotonic() - launched).encode('utf-8'))
+            os.close(write_end)
+
+            dealer_proxy.request_join()
+            status = 0
+        finally:
+            os._exit(status)
+
+    def _read_reports(self, read_end):
+        """Collects startup times until every bot has closed the pipe
+
+        :param read_end: pipe the bots write their startup times to
+        :type read_end: int
+
+        :effect: extends self.startup_seconds
+        """
+
+        data = b''
+        chunk = os.read(read_end, READ_SIZE)
+        while chunk:
+            data += chunk
+            chunk = os.read(read_end, READ_SIZE)
+        os.close(read_end)
+
+        self.startup_seconds.extend(map(float, data.split()))
@@ -0,0 +1,403 @@
+from collections import Counter, deque
+import heapq
+from random import Random
+import subprocess
+import time
+
+from evolution.core.connection import encode_msg
+from evolution.client.host import BotHost, HostedDealerProxy
+from evolution.server.latency import LatencyHistogram
+
+
+NORMAL, SLOW, MALFORMED, DISCONNECT = 'normal', 'slow', 'malformed', 'disconnect'
+
+SLOW_THINK_SECONDS = 3  # beyond the dealer's 2 second hard budget
+MALFORMED_REPLY = b'[1, }'
+MAX_REPLIES_BEFORE_DISCONNECT = 5
+RECONNECT_DELAY = 0.1  # seconds before a bot replaces one that left
+RSS_INTERVAL = 1  # seconds between samples of the server's memory
+
+
+def think_time(spec):
+    """Parses a think time distribution
+
+    :param spec: one of 'constant:SECONDS', 'uniform:LOW:HIGH' or
+                 'exponential:MEAN'
+    :type spec: str
+
+    :returns: draws a think time in seconds from a source of randomness
+    :rtype: random.Random -> float
+
+    :raises: ValueError if the spec is not a known distribution
+    """
+
+    name, *args = spec.split(':')
+    args = [float(arg) for arg in args]
+    if name == 'constant' and len(args) == 1:
+        return lambda rng: args[0]
+    if name == 'uniform' and len(args) == 2:
+        return lambda rng: rng.uniform(*args)
+    if name == 'exponential' and len(args) == 1 and args[0] > 0:
+        return lambda rng: rng.expovariate(1 / args[0])
+    raise ValueError('unknown think time distribution {}'.format(spec))
+
+
+def read_rss(pid):
+    """Reads the resident set size of a process from /proc
+
+    :param pid: id of the process
+    :type pid: int
+
+    :returns: resident set size in bytes, None if it cannot be read
+    :rtype: Natural or None
+    """
+
+    try:
+        with open('/proc/{}/status'.format(pid)) as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class LoadBot(HostedDealerProxy):
+    """Bot that thinks before replying and may misbehave on purpose"""
+
+    def __init__(self, sock, behaviour, think, rng, feed_next=None,
+                 play_cards=None):
+        """
+        :attr behaviour: one of NORMAL, SLOW, MALFORMED and DISCONNECT
+        :type behaviour: str
+
+        :attr think: draws the time the bot takes before replying
+        :type think: random.Random -> float
+
+        :attr rng: source of randomness for the bot
+        :type rng: random.Random
+
+        :attr pending: replies waiting for their think time to pass, each
+                       with the time it is due, None to disconnect instead
+        :type pending: deque of (float, bytes or None)
+
+        :attr sent_at: when the last reply finished sending, None once the
+                       dealer has answered it
+        :type sent_at: float or None
+
+        :attr latencies: (message kind, seconds) the dealer took to answer
+                         each reply, not yet collected by the host
+        :type latencies: list of (str, float)
+        """
+
+        super().__init__(sock, feed_next, play_cards)
+        self.behaviour = behaviour
+        self.think = think
+        self.rng = rng
+        self.pending = deque()
+        self.sent_at = None
+        self.latencies = []
+        self._replies_left = rng.randint(1, MAX_REPLIES_BEFORE_DISCONNECT)
+        self._signed_up = False
+
+    def receive(self, data):
+        now = time.monotonic()
+        for msg in self.decoder.feed(data):
+            if self.sent_at is not None:
+                kind = 'turnaround' if self._signed_up else 'signup'
+                self.latencies.append((kind, now - self.sent_at))
+                self.sent_at = None
+            self._signed_up = True
+
+            reply = self.respond(msg)
+            if reply is not None:
+                self.pending.append(self._misbehave(reply, now))
+
+    def _misbehave(self, reply, now):
+        """Decides when and how the reply is sent according to the behaviour
+
+        :param reply: reply the strategy chose
+        :type reply: JSON
+
+        :param now: when the dealer's message arrived
+        :type now: float
+
+        :returns: when the reply is due and its bytes, None to disconnect
+        :rtype: (float, bytes or None)
+        """
+
+        data = encode_msg(reply)
+        if self.behaviour == SLOW:
+            return now + SLOW_THINK_SECONDS, data
+        if self.behaviour == MALFORMED:
+            data = MALFORMED_REPLY
+        if self.behaviour == DISCONNECT:
+            self._replies_left -= 1
+            if not self._replies_left:
+                data = None
+        return now + self.think(self.rng), data
+
+    def release(self, now):
+        """Moves the replies whose think time has passed to the outbox
+
+        :param now: current time
+        :type now: float
+
+        :returns: whether the bot wants to disconnect
+        :rtype: bool
+        """
+
+        while self.pending and self.pending[0][0] <= now:
+            _, data = self.pending.popleft()
+            if data is None:
+                return True
+            self.outbox += data
+        return False
+
+
+class ServerRunner:
+    """Keeps a dealer server running, restarting it after every game"""
+
+    def __init__(self, command):
+        """
+        :attr command: command starting the server, e.g. remote-main
+        :type command: list of str
+
+        :attr process: currently running server
+        :type process: subprocess.Popen or None
+
+        :attr games: number of runs that finished a game
+        :type games: Natural
+
+        :attr failures: number of runs that exited with an error
+        :type failures: Natural
+        """
+
+        self.command = command
+        self.process = None
+        self.games = 0
+        self.failures = 0
+
+    def poll(self):
+        """Records how the last run ended and starts the next one"""
+
+        if self.process and self.process.poll() is not None:
+            output, _ = self.process.communicate()
+            if self.process.returncode:
+                self.failures += 1
+            elif b'score:' in output:
+                self.games += 1
+            self.process = None
+
+        if not self.process:
+            self.process = subprocess.Popen(
+                self.command, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL)
+
+    def rss(self):
+        """Resident set size of the running server
+
+        :rtype: Natural or None
+        """
+
+        return read_rss(self.process.pid) if self.process else None
+
+    def stop(self):
+        """Stops the running server"""
+
+        if self.process:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+
+
+class LoadHost(BotHost):
+    """Keeps a population of bots playing against a dealer for a duration
+
+    Every bot that leaves, whether its game ended or it was dropped, is
+    replaced by a new one until the duration has passed. Each new bot is
+    misbehaving with the configured probabilities.
+    """
+
+    def __init__(self, address, num_bots, duration, think,
+                 slow=0, malformed=0, disconnect=0, server=None, rng=None,
+                 feed_next=None, play_cards=None):
+        """
+        :attr duration: seconds during which bots that leave are replaced
+        :type duration: float
+
+        :attr think: draws the time a bot takes before replying
+        :type think: random.Random -> float
+
+        :attr behaviours: probability of each misbehaviour
+        :type behaviours: list of (str, float)
+
+        :attr server: (optional) server to keep running and sample
+        :type server: ServerRunner
+
+        :attr rng: source of randomness for the bots
+        :type rng: random.Random
+
+        :attr connections: number of bots connected so far
+        :type connections: Natural
+
+        :attr outcomes: number of bots that left, by behaviour and how they
+                        left ('closed' or the error that dropped them)
+        :type outcomes: Counter of (str, str)
+
+        :attr latencies: time the dealer took to answer, by message kind
+        :type latencies: dict of (str -> LatencyHistogram)
+
+        :attr rss: (seconds since start, bytes) samples of the server's memory
+        :type rss: list of (float, Natural)
+
+        :attr started: when the run started
+        :type started: float
+
+        :attr elapsed: seconds the run took
+        :type elapsed: float
+        """
+
+        super().__init__(address, num_bots, feed_next, play_cards)
+        self.duration = duration
+        self.think = think
+        self.behaviours = [
+            (SLOW, slow), (MALFORMED, malformed), (DISCONNECT, disconnect)]
+        self.server = server
+        self.rng = rng or Random()
+        self.connections = 0
+        self.outcomes = Counter()
+        self.latencies = {
+            'signup': LatencyHistogram(), 'turnaround': LatencyHistogram()}
+        self.rss = []
+        self.started = self.elapsed = 0
+        self._timers = []
+        self._next_sample = 0
+
+    def run(self):
+        self.started = time.monotonic()
+        self._next_sample = self.started
+        if self.server:
+            self.server.poll()
+        try:
+            super().run()
+        finally:
+            self.elapsed = time.monotonic() - self.started
+
+    def summary(self):
+        """Summarizes the run
+
+        :returns: games, games per second, connections, outcomes, latency
+                  summaries with p99 added, and server memory samples
+        :rtype: dict
+        """
+
+        latencies = {}
+        for kind, histogram in self.latencies.items():
+            latencies[kind] = dict(
+                histogram.summary(), p99=histogram.percentile(99))
+
+        games = self.server.games if self.server else None
+        return {
+            'elapsed': self.elapsed,
+            'games': games,
+            'games_per_second': games / self.elapsed if games else 0,
+            'connections': self.connections,
+            'outcomes': dict(self.outcomes),
+            'latencies': latencies,
+            'rss': list(self.rss)
+        }
+
+    def connect(self):
+        self.connections += 1
+        return super().connect()
+
+    def _make_proxy(self, sock):
+        behaviour = NORMAL
+        draw = self.rng.random()
+        for misbehaviour, probability in self.behaviours:
+            if draw < probability:
+                behaviour = misbehaviour
+                break
+            draw -= probability
+
+        return LoadBot(sock, behaviour, self.think, Random(self.rng.random()),
+                       self._bot_feed_next(), self.play_cards)
+
+    def _flush(self, proxy):
+        super()._flush(proxy)
+        if proxy.sock.fileno() >= 0 and not proxy.outbox:
+            proxy.sent_at = time.monotonic()
+
+    def _close(self, proxy, error=None):
+        super()._close(proxy, error)
+        how = 'closed' if error is None else type(error).__name__
+        self.outcomes[(proxy.behaviour, how)] += 1
+        self._collect(proxy)
+
+        if not self._is_over():
+            heapq.heappush(
+                self._timers,
+                (time.monotonic() + RECONNECT_DELAY, self.connections))
+
+    def _is_waiting(self):
+        return bool(self._timers) and not self._is_over()
+
+    def _next_timeout(self):
+        due = [timer for timer, _ in self._timers[:1]]
+        due += [
+            bot.pending[0][0] for bot in self._bots() if bot.pending]
+        if not self._is_over():
+            due.append(self.started + self.duration)
+            due.append(self._next_sample)
+        return max(0, min(due) - time.monotonic()) if due else None
+
+    def _tick(self):
+        now = time.monotonic()
+        for bot in self._bots():
+            self._collect(bot)
+            if bot.release(now):
+                self._close(bot, ConnectionAbortedError('bot disconnected'))
+            elif bot.outbox:
+                self._update_interest(bot)
+
+        while self._timers and self._timers[0][0] <= now:
+            heapq.heappop(self._timers)
+            if not self._is_over():
+                self.connect()
+
+        if not self.server or self._is_over():
+            return
+        self.server.poll()
+        if now >= self._next_sample:
+            rss = self.server.rss()
+            if rss is not None:
+                self.rss.append((now - self.started, rss))
+            self._next_sample = now + RSS_INTERVAL
+
+    def _is_over(self):
+        """Has the duration passed?
+
+        :rtype: bool
+        """
+
+        return time.monotonic() >= self.started + self.duration
+
+    def _bots(self):
+        """Bots that are still connected
+
+        :rtype: list of LoadBot
+        """
+
+        return [key.data for key in self.selector.get_map().values()]
+
+    def _collect(self, bot):
+        """Moves the bot's measured latencies into the host's histograms
+
+        :param bot: bot to collect from
+        :type bot: LoadBot
+        """
+
+        for kind, seconds in bot.latencies:
+            self.latencies[kind].record(seconds)
+        bot.latencies.clear()
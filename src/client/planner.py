@@ -0,0 +1,461 @@
+from collections import namedtuple
+from itertools import combinations
+
+from evolution.core.trait import Trait
+from evolution.core.utils import get_neighbors
+from evolution.client.action import (
+    AddToWateringHole, AddSpecies, AddPopulation, AddBody, ReplaceTrait)
+from evolution.client.data import Species
+
+
+MAX_PLANNED_CARDS = 8  # larger hands keep their least useful cards
+MAX_NEW_BOARDS = 2
+MAX_TRAITS = 3
+MAX_POPULATION = MAX_BODY = 7
+MAX_BODY_GROWTH = 3  # more body in one turn rarely pays for its cards
+
+FOOD_SHARE = 2  # food a species can expect from the watering hole
+KEEP_VALUE = 0.4  # worth of a card held for a later turn
+WATERING_HOLE_WEIGHT = 0.2  # worth of each food token on the watering hole
+THREAT_WEIGHT = 0.5  # population expected to be lost to each able attacker
+BODY_TRAITS = {Trait.carnivore, Trait.fat_tissue, Trait.hard_shell}
+DEFENSIVE_TRAITS = {Trait.climbing, Trait.hard_shell, Trait.herding,
+                    Trait.burrowing, Trait.warning_call, Trait.symbiosis}
+FEEDING_TRAITS = {Trait.foraging, Trait.long_neck, Trait.fat_tissue,
+                  Trait.fertile, Trait.cooperation}
+
+
+def play_cards(player, boards_before, boards_after):
+    """Plans the card plays that leave the player best off this turn
+
+    :param player: current state of the player
+    :type player: Player
+
+    :param boards_before: opponents who play before the player
+    :type boards_before: list of Opponent
+
+    :param boards_after: opponents who play after the player
+    :type boards_after: list of Opponent
+
+    :returns: the actions a player wishes to make
+    :rtype: dict of (type -> Action or list of Action)
+    """
+
+    return Planner(player, boards_before + boards_after).plan()
+
+
+class Package(namedtuple('Package', ['traits', 'population', 'body', 'value'])):
+    """
+    Cards spent on one species board.
+
+    :attr traits: (card index, trait index) of each card played as a trait
+    :type traits: tuple of (Natural, Natural)
+
+    :attr population: number of cards traded for population or the board
+    :type population: Natural
+
+    :attr body: number of cards traded for body
+    :type body: Natural
+
+    :attr value: expected worth of the board once the cards are spent
+    :type value: float
+    """
+
+    def cards(self):
+        """Number of cards the package trades, not counting trait cards
+
+        :rtype: Natural
+        """
+
+        return self.population + self.body
+
+
+class Planner:
+    """Searches over the ways to spend the player's cards this turn
+
+    The cards spent on one board only change the worth of that board, so
+    the search visits the boards one at a time and picks a package of cards
+    for each. Any card can be traded for growth or to pay for a board, so
+    only the cards played as traits are told apart; the best outcome for the
+    remaining boards is memoised on the cards still in hand and the number
+    of cards traded so far. The watering hole takes the card with the most
+    food among those left over.
+    """
+
+    def __init__(self, player, opponents):
+        """
+        :attr player: current state of the player
+        :type player: Player
+
+        :attr opponents: boards of every opponent
+        :type opponents: list of Opponent
+
+        :attr attackers: carnivores the opponents own
+        :type attackers: list of Species
+        """
+
+        self.player = player
+        self.opponents = opponents
+        self.attackers = [
+            species
+            for opponent in opponents for species in opponent.boards
+            if Trait.carnivore in species.traits
+        ]
+        self._board_values = {}
+
+    def plan(self):
+        """Finds the best card plays
+
+        :returns: the actions a player wishes to make
+        :rtype: dict of (type -> Action or list of Action)
+
+        :raises: ValueError if the player has no card for the watering hole
+        """
+
+        if not self.player.cards:
+            raise ValueError('a card must be placed on the watering hole')
+
+        self._card_indices = self._order_cards()
+        self._packages = [
+            self._existing_packages(species) for species in self.player.boards
+        ]
+        self._packages += [self._new_packages()] * MAX_NEW_BOARDS
+        self._memo = {}
+        self._foods = {}
+
+        self._best(0, 0, 0)
+        return self._to_actions(self._replay())
+
+    def _order_cards(self):
+        """Indices of the cards to plan, most useful as a trait first
+
+        :rtype: list of Natural
+        """
+
+        ranked = sorted(
+            range(len(self.player.cards)),
+            key=lambda i: (-self._trait_worth(self.player.cards[i].trait),
+                           self.player.cards[i]))
+        return ranked[:MAX_PLANNED_CARDS]
+
+    def _best(self, board, used, traded):
+        """The best value reachable by spending cards on the remaining boards
+
+        :param board: position of the next board in the packages
+        :type board: Natural
+
+        :param used: bit i is set if planned card i is played as a trait
+        :type used: Natural
+
+        :param traded: number of cards traded for growth or boards so far
+        :type traded: Natural
+
+        :returns: best value of the remaining boards and left over cards
+        :rtype: float
+        """
+
+        left = len(self._card_indices) - bin(used).count('1') - traded
+        if board == len(self._packages):
+            return (WATERING_HOLE_WEIGHT * self._most_food(used) +
+                    KEEP_VALUE * (left - 1))
+
+        key = (board, used, traded)
+        if key not in self._memo:
+            best = (float('-inf'), None)
+            for mask, spent, traded_cards, package in self._packages[board]:
+                if mask & used or spent >= left:
+                    continue
+                value = package.value + self._best(
+                    board+1, used | mask, traded + traded_cards)
+                if value > best[0]:
+                    best = (value, package)
+            self._memo[key] = best
+        return self._memo[key][0]
+
+    def _most_food(self, used):
+        """Most food on a planned card that is not played as a trait
+
+        :param used: bit i is set if planned card i is played as a trait
+        :type used: Natural
+
+        :rtype: int
+        """
+
+        if used not in self._foods:
+            self._foods[used] = max(
+                self.player.cards[card_index].food
+                for i, card_index in enumerate(self._card_indices)
+                if not used & (1 << i))
+        return self._foods[used]
+
+    def _replay(self):
+        """Follows the memoised best packages from the first board
+
+        :returns: the best package of every board
+        :rtype: list of Package
+        """
+
+        packages = []
+        used = traded = 0
+        for board in range(len(self._packages)):
+            _, package = self._memo[(board, used, traded)]
+            packages.append(package)
+            used |= self._mask(package.traits)
+            traded += package.cards()
+        return packages
+
+    def _existing_packages(self, species):
+        """Every sensible package for one of the player's species
+
+        An existing species may replace one of its traits, and grows only
+        where that can pay off.
+
+        :param species: species board of the player
+        :type species: Species
+
+        :returns: each package as a search entry
+        :rtype: list of (Natural, Natural, Natural, Package)
+        """
+
+        traits = tuple(species.traits)
+        base = (species.population, species.body, traits, species.fat_food)
+        options = [((), base)]
+        for card_index in self._card_indices:
+            trait = self.player.cards[card_index].trait
+            if trait in traits:
+                continue
+            for slot in range(len(traits)):
+                new_traits = traits[:slot] + (trait,) + traits[slot+1:]
+                options.append(
+                    (((card_index, slot),),
+                     base[:2] + (new_traits,) + base[3:]))
+        return [
+            self._entry(package)
+            for trait_cards, board in options
+            for package in self._growth_packages(trait_cards, board, 0)
+        ]
+
+    def _new_packages(self):
+        """Every sensible package for a species added this turn
+
+        The first package adds no species at all.
+
+        :returns: each package as a search entry
+        :rtype: list of (Natural, Natural, Natural, Package)
+        """
+
+        packages = [self._entry(Package((), 0, 0, 0))]
+        for count in range(MAX_TRAITS + 1):
+            for chosen in combinations(self._card_indices, count):
+                traits = tuple(self.player.cards[i].trait for i in chosen)
+                if len(set(traits)) < count:
+                    continue
+                trait_cards = tuple(
+                    (card_index, slot) for slot, card_index in enumerate(chosen))
+                packages.extend(
+                    self._entry(package)
+                    for package in self._growth_packages(
+                        trait_cards, (1, 0, traits, 0), 1))
+        return packages
+
+    def _growth_packages(self, trait_cards, board, payment):
+        """Packages that grow the board, one per number of cards traded
+
+        For each number of cards only the best split between population and
+        body is kept, and only if it beats trading fewer cards by more than
+        the worth of keeping the extra ones.
+
+        :param trait_cards: (card index, trait index) of each trait card
+        :type trait_cards: tuple of (Natural, Natural)
+
+        :param board: population, body, traits and fat food of the board
+        :type board: (Natural, Natural, tuple of Trait, Natural)
+
+        :param payment: cards needed before the board exists
+        :type payment: Natural
+
+        :rtype: list of Package
+        """
+
+        population, body, traits, fat_food = board
+        max_population = max(
+            population, min(MAX_POPULATION, self._food(board)))
+        max_body = (min(MAX_BODY, body + MAX_BODY_GROWTH)
+                    if BODY_TRAITS.intersection(traits) else body)
+
+        best_by_cards = {}
+        for grown_population in range(population, max_population+1):
+            for grown_body in range(body, max_body+1):
+                grown = (grown_population, grown_body, traits, fat_food)
+                package = Package(
+                    trait_cards, grown_population - population + payment,
+                    grown_body - body, self._board_value(grown))
+                cards = package.cards()
+                if (cards not in best_by_cards or
+                        best_by_cards[cards].value < package.value):
+                    best_by_cards[cards] = package
+
+        packages = []
+        for cards in sorted(best_by_cards):
+            package = best_by_cards[cards]
+            if not packages or package.value > (
+                    packages[-1].value +
+                    KEEP_VALUE * (cards - packages[-1].cards())):
+                packages.append(package)
+        return packages
+
+    def _entry(self, package):
+        """Precomputes what the search needs to know about a package
+
+        :returns: mask of its trait cards, number of cards it spends, number
+                  of cards it trades and the package
+        :rtype: (Natural, Natural, Natural, Package)
+        """
+
+        cards = package.cards()
+        return (self._mask(package.traits), len(package.traits) + cards,
+                cards, package)
+
+    def _mask(self, trait_cards):
+        """Bit mask of the planned cards played as traits
+
+        :rtype: Natural
+        """
+
+        return sum(1 << self._card_indices.index(card_index)
+                   for card_index, _ in trait_cards)
+
+    def _board_value(self, board):
+        """Expected score the board contributes at the end of the turn
+
+        Population beyond the food the species can expect starves, and each
+        opponent carnivore able to attack it costs some population. A
+        species expected to go extinct is only worth the cards it returns.
+
+        :param board: population, body, traits and fat food of the board
+        :type board: (Natural, Natural, tuple of Trait, Natural)
+
+        :rtype: float
+        """
+
+        if board not in self._board_values:
+            population, _, traits, _ = board
+            fed = min(population, self._food(board))
+            survivors = fed - THREAT_WEIGHT * self._threats(board)
+            if survivors <= 0:
+                value = 2 * KEEP_VALUE
+            else:
+                value = survivors + len(traits)
+            self._board_values[board] = value
+        return self._board_values[board]
+
+    def _food(self, board):
+        """Food the species can expect to eat this turn
+
+        :rtype: Natural
+        """
+
+        _, body, traits, fat_food = board
+        if Trait.carnivore in traits:
+            food = FOOD_SHARE if self._can_attack(board) else 0
+        else:
+            food = (FOOD_SHARE + (Trait.foraging in traits) +
+                    (Trait.long_neck in traits))
+        if Trait.fat_tissue in traits:
+            food += min(1, body) + fat_food
+        return food
+
+    def _can_attack(self, board):
+        """Can the species attack any opponent species?
+
+        :rtype: bool
+        """
+
+        population, body, traits, _ = board
+        attacker = Species(0, body, population, list(traits))
+        return any(
+            defender.is_attackable(
+                attacker, *get_neighbors(opponent.boards, index))
+            for opponent in self.opponents
+            for index, defender in enumerate(opponent.boards))
+
+    def _threats(self, board):
+        """Number of opponent carnivores able to attack the species
+
+        :rtype: Natural
+        """
+
+        population, body, traits, _ = board
+        defender = Species(0, body, population, list(traits))
+        return sum(
+            defender.is_attackable(attacker, None, None)
+            for attacker in self.attackers)
+
+    def _trait_worth(self, trait):
+        """Rough worth of a trait, used to order the cards
+
+        Defensive traits are worth more when opponents own carnivores, and
+        carnivore is worth more when they own species.
+
+        :rtype: float
+        """
+
+        if trait is Trait.carnivore:
+            return 1 + any(opponent.boards for opponent in self.opponents)
+        if trait in DEFENSIVE_TRAITS:
+            return 1 + bool(self.attackers)
+        if trait in FEEDING_TRAITS:
+            return 1.5
+        return 1
+
+    def _to_actions(self, packages):
+        """Converts the best package of every board into actions
+
+        Cards played as traits are fixed by the packages. Of the cards left,
+        the one with the most food goes on the watering hole, the ones least
+        useful as traits are traded and the rest are kept.
+
+        :param packages: best package of every board, new boards last
+        :type packages: list of Package
+
+        :returns: the actions a player wishes to make
+        :rtype: dict of (type -> Action or list of Action)
+        """
+
+        trait_cards = {card_index
+                       for package in packages
+                       for card_index, _ in package.traits}
+        spare = [i for i in self._card_indices if i not in trait_cards]
+        watering_hole = max(
+            spare, key=lambda i: (self.player.cards[i].food, -i))
+        spare.remove(watering_hole)
+
+        actions = {
+            AddToWateringHole: AddToWateringHole(watering_hole),
+            AddSpecies: [], ReplaceTrait: [], AddPopulation: [], AddBody: []
+        }
+        num_boards = len(self.player.boards)
+        for board, package in enumerate(packages):
+            if board < num_boards:
+                species_index = board
+                growth = package.population
+                actions[ReplaceTrait].extend(
+                    ReplaceTrait(board, slot, card_index)
+                    for card_index, slot in package.traits)
+            elif package.cards():
+                species_index = num_boards + len(actions[AddSpecies])
+                growth = package.population - 1
+                actions[AddSpecies].append(AddSpecies(
+                    spare.pop(),
+                    [card_index for card_index, _ in package.traits]))
+            else:
+                continue
+
+            actions[AddPopulation].extend(
+                AddPopulation(species_index, spare.pop())
+                for _ in range(growth))
+            actions[AddBody].extend(
+                AddBody(species_index, spare.pop())
+                for _ in range(package.body))
+
+        return {kind: plays for kind, plays in actions.items() if plays}
@@ -0,0 +1,170 @@
+from operator import itemgetter
+from random import Random
+import time
+
+from evolution.client import feeding as client_feeding
+from evolution.server.dealer import Dealer
+from evolution.server.feeding import NoFeeding
+from evolution.server.player import Player
+from evolution.server.species import Species
+
+
+DEADLINE_SECONDS = 1  # stays well within the dealer's 2 second timeout
+MAX_ROLLOUTS = 200  # rollouts per feeding after which more stop helping
+
+
+def feedNext(player, watering_hole, opponents, deadline=DEADLINE_SECONDS,
+             max_rollouts=MAX_ROLLOUTS, rng=None):
+    """Picks a feeding by Monte Carlo rollouts of the rest of the feeding
+
+    Every legal feeding is tried on a copy of the game built with the
+    server's rules. The rest of the feeding phase is then played out with
+    every player picking random legal feedings, and the feeding whose
+    rollouts end with the best score relative to the strongest opponent is
+    chosen. Rollouts are spread evenly over the feedings until the deadline;
+    feedings that the deadline leaves untried are not considered.
+
+    :param player: current player which needs to be fed
+    :type player: Player
+
+    :param watering_hole: number of tokens remaining on the watering_hole
+    :type watering_hole: Natural+
+
+    :param opponents: opponents to potentially attack
+    :type opponents: list of Opponent
+
+    :param deadline: (optional) seconds the search may take
+    :type deadline: int or float
+
+    :param max_rollouts: (optional) most rollouts to spend on one feeding
+    :type max_rollouts: Natural+
+
+    :param rng: (optional) source of randomness for the rollouts
+    :type rng: random.Random
+
+    :returns: player's choice of feeding
+    :rtype: Feeding
+    """
+
+    stop_at = time.perf_counter() + deadline
+    rng = rng or Random()
+
+    dealer = _simulated_dealer(player, watering_hole, opponents)
+    current_player, simulated_opponents = dealer.players[0], dealer.players[1:]
+    choices = sorted(current_player.get_feeding_choices(
+        watering_hole, simulated_opponents))
+
+    if not choices:
+        return client_feeding.NoFeeding()
+    if len(choices) == 1:
+        return _to_client_feeding(choices[0])
+
+    snapshot = dealer.snapshot()
+    totals = [0] * len(choices)
+    rollouts = [0] * len(choices)
+    for rollout in range(max_rollouts * len(choices)):
+        i = rollout % len(choices)
+        totals[i] += _rollout(snapshot, choices[i], rng)
+        rollouts[i] += 1
+        if time.perf_counter() >= stop_at:
+            break
+
+    _, best_choice = max(
+        ((total / count, choice)
+         for total, count, choice in zip(totals, rollouts, choices)
+         if count),
+        key=itemgetter(0))
+    return _to_client_feeding(best_choice)
+
+
+def _rollout(snapshot, choice, rng):
+    """Plays out the feeding phase after the current player makes the choice
+
+    :param snapshot: game before the current player's feeding
+    :type snapshot: tuple
+
+    :param choice: feeding made by the current player
+    :type choice: Feeding
+
+    :param rng: source of randomness for the rollout
+    :type rng: random.Random
+
+    :returns: the current player's score minus the best opponent's
+    :rtype: int
+    """
+
+    proxies = [RolloutProxy(rng) for _ in snapshot[-1]]
+    dealer = Dealer.restore(snapshot, proxies)
+    player, opponents = dealer.players[0], dealer.players[1:]
+
+    choice.execute(dealer, player, opponents)
+    dealer._increment_feeding_index()
+    dealer.handle_feeding()
+
+    for each in dealer.players:
+        each.end_turn()
+
+    best_opponent = max(
+        (opponent.score() for opponent in opponents), default=0)
+    return player.score() - best_opponent
+
+
+def _simulated_dealer(player, watering_hole, opponents):
+    """Builds a server side game from the player's knowledge of the game
+
+    The current player is seated first, followed by the opponents in order.
+    Nothing is known about the deck, so it is left empty.
+
+    :returns: dealer that is about to let the current player feed
+    :rtype: Dealer
+    """
+
+    players = [Player(0, None, _to_server_boards(player.boards), player.bag)]
+    players.extend(
+        Player(i+1, None, _to_server_boards(opponent.boards))
+        for i, opponent in enumerate(opponents))
+    return Dealer(players, watering_hole)
+
+
+def _to_server_boards(boards):
+    """Copies the species boards into the server's representation
+
+    :rtype: list of evolution.server.species.Species
+    """
+
+    return [
+        Species(species.food, species.body, species.population,
+                list(species.traits), species.fat_food)
+        for species in boards
+    ]
+
+
+def _to_client_feeding(feeding):
+    """Converts a server feeding into the matching client feeding
+
+    :param feeding: feeding using the server's representation
+    :type feeding: evolution.server.feeding.Feeding
+
+    :rtype: evolution.client.feeding.Feeding
+    """
+
+    return getattr(client_feeding, type(feeding).__name__)(*feeding)
+
+
+class RolloutProxy:
+    """Makes uniformly random legal feedings during a rollout"""
+
+    def __init__(self, rng):
+        """
+        :attr rng: source of randomness for the choices
+        :type rng: random.Random
+        """
+
+        self.rng = rng
+
+    def feedNext(self, player, watering_hole, opponents):
+        choices = player.get_feeding_choices(watering_hole, opponents)
+        return self.rng.choice(sorted(choices)) if choices else NoFeeding()
+
+    def end_game(self):
+        pass
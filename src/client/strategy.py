@@ -1,13 +1,25 @@
 from operator import itemgetter
 
+from evolution.core import attack
 from evolution.core.trait import Trait
-from evolution.core.utils import get_neighbors, sort_indices
+from evolution.core.utils import sort_indices
 from evolution.client.action import (
     AddToWateringHole, AddSpecies, AddPopulation, AddBody, ReplaceTrait)
 from evolution.client.feeding import (
     NoFeeding, FatTissueFeeding, CarnivoreFeeding, VegetarianFeeding)
 
 
+"""
+Feeding policy the dealer can evaluate in place of feedNext, making the
+same choices; see src/server/policy.py for the JPolicy spec
+"""
+GREEDY_POLICY = [
+    ['fat-tissue', ['fat-need', 'population', 'food', 'body']],
+    ['vegetarian', ['population', 'food', 'body']],
+    ['carnivore', ['population', 'food', 'body']]
+]
+
+
 def play_cards(player, boards_before, boards_after):
     """get card play actions for the player
 
@@ -170,10 +182,8 @@ def choose_target(attacker, opponent):
     """
 
     target = target_index = None
-    for index, defender in enumerate(opponent.boards):
-        lneighbor, rneighbor = get_neighbors(opponent.boards, index)
-        if not defender.is_attackable(attacker, lneighbor, rneighbor):
-            continue
+    for index in attack.attackable_boards(opponent.boards, attacker):
+        defender = opponent.boards[index]
         if not target or target < defender:
             target = defender
             target_index = index
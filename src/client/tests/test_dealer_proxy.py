@@ -1,3 +1,5 @@
+import socket
+
 from pytest import raises
 
 from evolution.client.action import (
@@ -5,7 +7,9 @@ from evolution.client.action import (
 from evolution.client.feeding import VegetarianFeeding
 from evolution.client.dealer_proxy import (
     BaseDealerProxy, RemoteDealerProxy, Turn)
-from evolution.client.data import Card, Player, Species
+from evolution.client.data import Card, Opponent, Player, Species
+from evolution.client.world import World
+from evolution.core.connection import read_msg, send_msg
 from evolution.core.trait import Trait
 
 
@@ -15,6 +19,7 @@ def test_handle_start_turn():
         def __init__(self, *args, **kwargs):
             self.current_turn = Turn.unstarted
             self.player_state = Player()
+            self.world = World()
 
     dealer_proxy = MockDealerProxy()
 
@@ -176,3 +181,56 @@ def test_validate_next_turn_invalid():
     dealer_proxy = BaseDealerProxy()
     with raises(ValueError):
         assert dealer_proxy._validate_next_turn(Turn.feedNext)
+
+
+def test_decode_state():
+
+    payload = (
+        b'\x00\x02'                        # bag
+        b'\x00\x01' b'\x12\x20\x00\x01'    # boards
+        b'\x00\x01' b'\x00'                # cards
+        b'\x00\x05'                        # watering hole
+        b'\x00\x01' b'\x00\x00'            # opponents
+    )
+
+    player, watering_hole, opponents = BaseDealerProxy._decode_state(payload)
+
+    species = Species(food=1, body=2, population=2, traits=[Trait.carnivore])
+    assert player == Player(
+        id=1, boards=[species], bag=2, cards=[Card(-8, Trait.carnivore)])
+    assert watering_hole == 5
+    assert opponents == [Opponent([])]
+
+
+def test_decode_state_trailing_data():
+
+    payload = b'\x00\x00\x00\x00\x00\x00\x00\x05\x00\x00\xff'
+    with raises(ValueError):
+        BaseDealerProxy._decode_state(payload)
+
+
+def test_decode_invalid_species():
+
+    no_population = b'\x00\x00\x00\x00'
+    with raises(ValueError):
+        Species.from_binary(no_population, 0)
+
+
+def test_signup_response():
+
+    assert RemoteDealerProxy.is_signup_response('ok')
+    assert RemoteDealerProxy.is_signup_response(['ok', {'codec': 'binary'}])
+    assert not RemoteDealerProxy.is_signup_response([[], []])
+    assert Turn.from_msg(['ok', {'codec': 'binary'}]) == Turn.unstarted
+
+
+def test_signup_carries_the_name():
+    for name, signup in [(None, 'hello'), ('alice', 'alice')]:
+        sock, dealer = socket.socketpair()
+        send_msg('ok', dealer)
+        dealer.shutdown(socket.SHUT_WR)
+
+        RemoteDealerProxy(sock, name=name).request_join()
+        assert read_msg(dealer) == signup
+        sock.close()
+        dealer.close()
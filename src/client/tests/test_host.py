@@ -0,0 +1,113 @@
+from threading import Thread
+import time
+
+from evolution.client import strategy
+from evolution.core.connection import read_msg, send_msg
+from evolution.core.transport import listen, tcp_address
+from evolution.client.dealer_proxy import StaticDealerProxy, Turn
+from evolution.client.host import BotHost, HostedDealerProxy
+from evolution.server.dealer import Dealer
+from evolution.server.player import Player
+from evolution.server.player_proxy import RemotePlayerProxy, StaticPlayerProxy
+
+
+def start_host(bot_host):
+    thread = Thread(target=bot_host.run)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def test_hosted_proxy_answers_split_messages():
+    proxy = HostedDealerProxy(sock=None)
+
+    proxy.receive(b'"o')
+    proxy.receive(b'k"[0, 0, [], [[1, "carnivore"], [2, "ambush"],')
+    assert proxy.current_turn is Turn.unstarted
+
+    proxy.receive(b'[3, "burrowing"], [0, "climbing"]]][[], []]')
+    assert proxy.current_turn is Turn.choose
+    assert proxy.outbox
+
+
+def test_host_plays_game_like_static_players():
+    num_players = 4
+    server_sock = listen(tcp_address('localhost', 0))
+    bot_host = BotHost(tcp_address(*server_sock.getsockname()), num_players)
+    thread = start_host(bot_host)
+
+    players = []
+    for i in range(num_players):
+        conn, _ = server_sock.accept()
+        _, proxy = RemotePlayerProxy.from_signup(conn, read_msg(conn))
+        players.append(Player(id=i+1, proxy=proxy))
+    final_scores = Dealer(players=players).run_game()
+    thread.join(5)
+
+    static_players = [
+        Player(id=i+1, proxy=StaticPlayerProxy(external=StaticDealerProxy()))
+        for i in range(num_players)
+    ]
+    assert final_scores == Dealer(players=static_players).run_game()
+    assert bot_host.finished == num_players
+    assert not bot_host.failures
+
+
+def test_host_drops_bot_on_invalid_message():
+    server_sock = listen(tcp_address('localhost', 0))
+    bot_host = BotHost(tcp_address(*server_sock.getsockname()), 2)
+    thread = start_host(bot_host)
+
+    good, _ = server_sock.accept()
+    bad, _ = server_sock.accept()
+    for conn in [good, bad]:
+        assert read_msg(conn) == 'hello'
+        send_msg('ok', conn)
+    send_msg([1, 2, 3], bad)
+
+    assert bad.recv(1) == b''
+    good.close()
+    thread.join(5)
+
+    assert bot_host.finished == 1
+    assert bot_host.failures == {'ValueError': 1}
+
+
+def test_concurrent_bots_share_one_feeding_deadline():
+    num_bots, feed_seconds = 4, 0.4
+    deadlines = []
+
+    def feed_next(player, watering_hole, opponents, deadline):
+        deadlines.append(deadline)
+        time.sleep(deadline)
+        return strategy.feedNext(player, watering_hole, opponents)
+
+    server_sock = listen(tcp_address('localhost', 0))
+    bot_host = BotHost(tcp_address(*server_sock.getsockname()), num_bots,
+                       feed_next, feed_seconds=feed_seconds)
+    thread = start_host(bot_host)
+
+    conns = [server_sock.accept()[0] for _ in range(num_bots)]
+    for conn in conns:
+        assert read_msg(conn) == 'hello'
+        send_msg('ok', conn)
+        send_msg([0, 0, [], [[1, 'carnivore'], [2, 'ambush'],
+                             [3, 'burrowing'], [0, 'climbing']]], conn)
+        send_msg([[], []], conn)
+        read_msg(conn)
+
+    hungry = [['food', 0], ['body', 0], ['population', 1], ['traits', []]]
+    started = time.monotonic()
+    for conn in conns:
+        send_msg([0, [hungry], [], 5, []], conn)
+    feedings = [read_msg(conn) for conn in conns]
+    elapsed = time.monotonic() - started
+
+    assert feedings == [0] * num_bots
+    assert sum(deadlines) <= 2 * feed_seconds + 1e-9
+    assert elapsed < 2 * feed_seconds + 0.3 < num_bots * feed_seconds
+
+    for conn in conns:
+        conn.close()
+    thread.join(5)
+    assert bot_host.finished == num_bots
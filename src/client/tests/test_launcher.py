@@ -0,0 +1,54 @@
+import gc
+
+from evolution.core.connection import read_msg
+from evolution.core.transport import listen, tcp_address
+from evolution.client.dealer_proxy import StaticDealerProxy
+from evolution.client.launcher import BotLauncher, time_fresh_start
+from evolution.server.dealer import Dealer
+from evolution.server.player import Player
+from evolution.server.player_proxy import RemotePlayerProxy, StaticPlayerProxy
+
+
+def test_launched_bots_play_like_static_players():
+    num_players = 3
+    server_sock = listen(tcp_address('localhost', 0))
+    launcher = BotLauncher(tcp_address(*server_sock.getsockname()))
+    launcher.warm_up()
+    gc.unfreeze()
+    launcher.launch(num_players)
+
+    players = []
+    for i in range(num_players):
+        conn, _ = server_sock.accept()
+        _, proxy = RemotePlayerProxy.from_signup(conn, read_msg(conn))
+        players.append(Player(id=i+1, proxy=proxy))
+    final_scores = Dealer(players=players).run_game()
+    for player in players:
+        player.proxy.sock.close()
+    launcher.wait()
+
+    static_players = [
+        Player(id=i+1, proxy=StaticPlayerProxy(external=StaticDealerProxy()))
+        for i in range(num_players)
+    ]
+    assert final_scores == Dealer(players=static_players).run_game()
+    assert launcher.finished == num_players
+    assert not launcher.failed
+    assert len(launcher.startup_seconds) == num_players
+    assert all(seconds >= 0 for seconds in launcher.startup_seconds)
+
+
+def test_bot_failing_to_connect_is_counted():
+    server_sock = listen(tcp_address('localhost', 0))
+    address = tcp_address(*server_sock.getsockname())
+    server_sock.close()
+
+    launcher = BotLauncher(address)
+    launcher.run(2)
+
+    assert launcher.failed == 2
+    assert launcher.startup_seconds == []
+
+
+def test_fresh_start_is_timed():
+    assert time_fresh_start() > 0
@@ -0,0 +1,86 @@
+import os
+from random import Random
+from threading import Thread
+
+from pytest import raises
+
+from evolution.core.connection import read_msg
+from evolution.core.transport import listen, tcp_address
+from evolution.client.load import (
+    DISCONNECT, MALFORMED, MALFORMED_REPLY, NORMAL, SLOW, SLOW_THINK_SECONDS,
+    LoadBot, LoadHost, read_rss, think_time)
+from evolution.server.dealer import Dealer
+from evolution.server.player import Player
+from evolution.server.player_proxy import RemotePlayerProxy
+
+
+START_MSG = (b'"ok"[0, 0, [], [[1, "carnivore"], [2, "ambush"], '
+             b'[3, "burrowing"], [0, "climbing"]]][[], []]')
+
+
+def make_bot(behaviour):
+    return LoadBot(None, behaviour, think_time('constant:0.5'), Random(1))
+
+
+def test_think_time():
+    rng = Random(1)
+
+    assert think_time('constant:0.25')(rng) == 0.25
+    assert 1 <= think_time('uniform:1:2')(rng) <= 2
+    assert think_time('exponential:0.1')(rng) >= 0
+    with raises(ValueError):
+        think_time('normal:1')
+
+
+def test_read_rss():
+    assert read_rss(os.getpid()) > 0
+    assert read_rss(-1) is None
+
+
+def test_bot_thinks_before_replying():
+    bot = make_bot(NORMAL)
+    bot.receive(START_MSG)
+    [(due, _)] = bot.pending
+
+    assert not bot.release(due - 0.1)
+    assert not bot.outbox
+    assert not bot.release(due)
+    assert bot.outbox
+
+
+def test_misbehaving_bots():
+    malformed, slow, leaving = map(make_bot, [MALFORMED, SLOW, DISCONNECT])
+    leaving._replies_left = 1
+    for bot in [malformed, slow, leaving]:
+        bot.receive(START_MSG)
+
+    [(malformed_due, data)] = malformed.pending
+    [(slow_due, _)] = slow.pending
+    assert data == MALFORMED_REPLY
+    assert slow_due > malformed_due + SLOW_THINK_SECONDS - 1
+    assert leaving.release(leaving.pending[0][0])
+
+
+def test_load_host_plays_game():
+    num_players = 4
+    server_sock = listen(tcp_address('localhost', 0))
+
+    load_host = LoadHost(tcp_address(*server_sock.getsockname()),
+                         num_players, 0, think_time('constant:0.001'))
+    thread = Thread(target=load_host.run)
+    thread.daemon = True
+    thread.start()
+
+    players = []
+    for i in range(num_players):
+        conn, _ = server_sock.accept()
+        _, proxy = RemotePlayerProxy.from_signup(conn, read_msg(conn))
+        players.append(Player(id=i+1, proxy=proxy))
+    Dealer(players=players).run_game()
+    thread.join(5)
+
+    summary = load_host.summary()
+    assert summary['connections'] == num_players
+    assert summary['outcomes'] == {(NORMAL, 'closed'): num_players}
+    assert summary['latencies']['signup']['count'] == num_players
+    assert summary['latencies']['turnaround']['count'] > 0
@@ -0,0 +1,72 @@
+import time
+
+from evolution.core.trait import Trait
+from evolution.client.action import (
+    AddToWateringHole, AddSpecies, AddPopulation, ReplaceTrait)
+from evolution.client.data import Card, Opponent, Player, Species
+from evolution.client.planner import play_cards
+from evolution.server.dealer import Dealer
+from evolution.server.direct_proxy import DirectPlayerProxy
+from evolution.server.player import Player as ServerPlayer
+
+
+def test_adds_species_and_feeds_watering_hole():
+    cards = [
+        Card(2, Trait.foraging), Card(-1, Trait.fat_tissue),
+        Card(0, Trait.long_neck), Card(1, Trait.horns)
+    ]
+    player = Player(id=1, boards=[], cards=cards)
+
+    assert play_cards(player, [], [Opponent([])]) == {
+        AddToWateringHole: AddToWateringHole(0),
+        AddSpecies: [AddSpecies(3, [1])],
+        AddPopulation: [AddPopulation(0, 2)]
+    }
+
+
+def test_replaces_trait_to_defend_against_carnivore():
+    carnivore = Species(food=0, body=5, population=3, traits=[Trait.carnivore])
+    species = Species(food=0, body=0, population=2, traits=[Trait.horns])
+    player = Player(id=1, boards=[species],
+                    cards=[Card(0, Trait.climbing), Card(3, Trait.horns)])
+    opponents = [Opponent([carnivore]), Opponent([carnivore.copy()])]
+
+    assert play_cards(player, opponents, []) == {
+        AddToWateringHole: AddToWateringHole(1),
+        ReplaceTrait: [ReplaceTrait(0, 0, 0)]
+    }
+
+
+def test_plans_full_hand_within_timeout():
+    boards = [
+        Species(food=0, body=2, population=3, traits=[Trait.carnivore]),
+        Species(food=0, body=1, population=2,
+                traits=[Trait.fat_tissue, Trait.horns, Trait.climbing]),
+        Species(food=0, body=0, population=4, traits=[Trait.foraging])
+    ]
+    cards = [Card(food, trait) for food, trait in zip(
+        range(-2, 6),
+        [Trait.cooperation, Trait.long_neck, Trait.hard_shell,
+         Trait.ambush, Trait.scavenger, Trait.herding, Trait.symbiosis,
+         Trait.burrowing])]
+    player = Player(id=1, boards=boards, cards=cards)
+    opponents = [Opponent([species.copy() for species in boards])] * 7
+
+    begin = time.perf_counter()
+    actions = play_cards(player, opponents[:3], opponents[3:])
+
+    assert time.perf_counter() - begin < 1
+    assert AddToWateringHole in actions
+
+
+def test_planned_games_are_legal():
+    for num_players in range(3, 9):
+        players = [
+            ServerPlayer(id=i+1, proxy=DirectPlayerProxy(
+                play_cards=play_cards, validate=True))
+            for i in range(num_players)
+        ]
+
+        final_scores = Dealer(players=players).run_game()
+
+        assert len(final_scores) == num_players
@@ -0,0 +1,76 @@
+from random import Random
+import time
+
+from evolution.core.trait import Trait
+from evolution.client.data import Opponent, Player, Species
+from evolution.client.feeding import (
+    CarnivoreFeeding, NoFeeding, VegetarianFeeding)
+from evolution.client.search import feedNext
+from evolution.client.strategy import feedNext as greedy_feedNext
+from evolution.server.dealer import Dealer
+from evolution.server.direct_proxy import DirectPlayerProxy
+from evolution.server.player import Player as ServerPlayer
+
+
+def test_no_choices():
+    fed = Species(food=1, body=1, population=1, traits=[])
+    player = Player(id=1, boards=[fed])
+
+    assert feedNext(player, 3, [Opponent([])]) == NoFeeding()
+
+
+def test_single_choice():
+    hungry = Species(food=0, body=1, population=2, traits=[])
+    player = Player(id=1, boards=[hungry])
+
+    assert feedNext(player, 3, [Opponent([])]) == VegetarianFeeding(0)
+
+
+def test_prefers_attack_that_removes_opponent_species():
+    vegetarian = Species(food=0, body=0, population=1, traits=[])
+    carnivore = Species(
+        food=0, body=4, population=1, traits=[Trait.carnivore])
+    player = Player(id=1, boards=[vegetarian, carnivore])
+    opponent = Opponent([
+        Species(food=0, body=0, population=1,
+                traits=[Trait.fertile, Trait.foraging, Trait.long_neck])])
+
+    assert greedy_feedNext(player, 1, [opponent]) == VegetarianFeeding(0)
+    assert (
+        feedNext(player, 1, [opponent], rng=Random(1)) ==
+        CarnivoreFeeding(1, 0, 0))
+
+
+def test_respects_deadline():
+    boards = [
+        Species(food=0, body=i % 8, population=7, traits=[Trait.carnivore])
+        for i in range(6)
+    ]
+    player = Player(id=1, boards=boards)
+    opponents = [Opponent([species.copy() for species in boards])] * 4
+
+    begin = time.perf_counter()
+    choice = feedNext(player, 30, opponents, deadline=0.1, rng=Random(1))
+
+    assert time.perf_counter() - begin < 1
+    assert isinstance(choice, CarnivoreFeeding)
+
+
+def test_plays_a_game_through_direct_proxy():
+    rng = Random(1)
+
+    def search(player, watering_hole, opponents):
+        return feedNext(player, watering_hole, opponents, max_rollouts=2,
+                        rng=rng)
+
+    deck = Dealer._make_deck()
+    rng.shuffle(deck)
+    dealer = Dealer(
+        players=[
+            ServerPlayer(id=i+1, proxy=DirectPlayerProxy(feed_next=search))
+            for i in range(3)],
+        deck=deck)
+    while not dealer._is_game_over():
+        dealer.play_turn()
+
+    assert len(dealer.players) == 3
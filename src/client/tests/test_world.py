@@ -0,0 +1,69 @@
+from pytest import raises
+
+from evolution.client.data import Card, Opponent, Player, Species
+from evolution.client.world import World
+from evolution.core.trait import Trait
+
+
+JSPECIES = [['food', 1], ['body', 2], ['population', 3], ['traits', []]]
+JCARNIVORE = [['food', 0], ['body', 1], ['population', 1],
+              ['traits', ['carnivore']]]
+JCARD = [3, 'carnivore']
+
+
+def test_player_matches_decoding_from_scratch():
+    jplayer = [4, [JSPECIES, JCARNIVORE], [JCARD]]
+
+    assert World().see_player(jplayer) == Player.from_json(jplayer)
+
+
+def test_unchanged_player_is_reused():
+    world = World()
+    player = world.see_player([4, [JSPECIES, JCARNIVORE], [JCARD]])
+
+    assert world.see_player([4, [JSPECIES, JCARNIVORE], [JCARD]]) is player
+
+
+def test_unchanged_species_are_reused():
+    world = World()
+    player = world.see_player([0, [JSPECIES, JCARNIVORE], []])
+    species, carnivore = player.boards
+
+    fed = [['food', 1], ['body', 1], ['population', 1],
+           ['traits', ['carnivore']]]
+    player = world.see_player([0, [JSPECIES, fed], [JCARD]])
+
+    assert player.boards[0] is species
+    assert player.boards[1] is not carnivore
+    assert player.boards[1] == Species(1, 1, 1, [Trait.carnivore])
+    assert player.cards == [Card(3, Trait.carnivore)]
+
+
+def test_equal_species_stay_distinct():
+    world = World()
+    first, second = world.see_player([0, [JSPECIES, JSPECIES], []]).boards
+    assert first is not second
+
+    boards = world.see_player([1, [JSPECIES, JSPECIES], []]).boards
+    assert boards[0] is first and boards[1] is second
+
+
+def test_unchanged_opponents_are_reused():
+    world = World()
+    first, second = world.see_opponents([[JSPECIES], [JCARNIVORE]])
+    opponents = world.see_opponents([[JSPECIES], [JSPECIES, JCARNIVORE]])
+
+    assert opponents[0] is first
+    assert opponents[1] is not second
+    assert opponents[1] == Opponent.from_json([JSPECIES, JCARNIVORE])
+
+
+def test_invalid_messages_raise():
+    world = World()
+
+    with raises(ValueError):
+        world.see_player([0, [['food', 1]], []])
+    with raises(ValueError):
+        world.see_player([0, [], 'cards'])
+    with raises(ValueError):
+        world.see_opponents([JSPECIES, 3])
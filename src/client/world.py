@@ -0,0 +1,144 @@
+from evolution.client.data import Card, Opponent, Player, Species
+
+
+class Decoded:
+    """Objects decoded from JSON, kept by the JSON's text until replaced
+
+    Objects are looked up by the repr of their JSON, which is equal exactly
+    when the JSON is, so an item that did not change since the previous
+    message is neither validated nor built again.
+    """
+
+    def __init__(self, decode):
+        """
+        :attr decode: builds an object from its validated JSON
+        :type decode: JSON -> Any
+
+        :attr known: objects decoded for the latest message, by JSON text;
+                     equal items of a message still get objects of their own
+        :type known: dict of str -> list of Any
+        """
+
+        self.decode = decode
+        self.known = {}
+
+    def reconcile(self, jitems):
+        """Decodes the items of a message, reusing unchanged objects
+
+        Objects not in the message are forgotten.
+
+        :param jitems: JSON of the items in the message
+        :type jitems: list of JSON
+
+        :returns: an object for every item, in order
+        :rtype: list of Any
+
+        :raises: ValueError if a new item is invalid
+        """
+
+        seen = {}
+        items = []
+        for jitem in jitems:
+            key = repr(jitem)
+            unused = self.known.get(key)
+            item = unused.pop(0) if unused else self.decode(jitem)
+            seen.setdefault(key, []).append(item)
+            items.append(item)
+
+        self.known = seen
+        return items
+
+
+class World:
+    """What the player knows about the game, kept across dealer messages
+
+    Every message is diffed against the one before it. Species, cards,
+    opponents and the player itself are only rebuilt when their JSON
+    changed, so a strategy may cache what it derives from them by identity
+    for as long as they are handed back.
+    """
+
+    def __init__(self):
+        """
+        :attr player: the player's own state
+        :type player: Player
+
+        :attr opponents: opponents as of the latest message about them
+        :type opponents: list of Opponent
+        """
+
+        self.player = Player(id=1)
+        self.opponents = []
+
+        self._boards = Decoded(Species.from_json)
+        self._cards = Decoded(Card.from_json)
+        self._opponent_boards = Decoded(Species.from_json)
+        self._known_opponents = {}
+
+    def see_player(self, jplayer):
+        """Reconciles the player's state with a message
+
+        :param jplayer: current state of the player
+        :type jplayer: JPlayer
+
+        :returns: the player, the same object if nothing changed
+        :rtype: Player
+
+        :raises: ValueError if the jplayer is invalid
+        """
+
+        Player._validate_jplayer(jplayer)
+        bag, jboards, jcards = jplayer
+
+        boards = self._boards.reconcile(jboards)
+        cards = self._cards.reconcile(jcards)
+        if not (bag == self.player.bag and
+                _same(boards, self.player.boards) and
+                _same(cards, self.player.cards)):
+            self.player = Player(id=1, boards=boards, bag=bag, cards=cards)
+        return self.player
+
+    def see_opponents(self, jopponents):
+        """Reconciles the opponents with a message
+
+        :param jopponents: boards of each opponent
+        :type jopponents: list of JOpponent
+
+        :returns: the opponents, reusing those whose boards did not change
+        :rtype: list of Opponent
+
+        :raises: ValueError if the jopponents are invalid
+        """
+
+        if not all(isinstance(jboards, list) for jboards in jopponents):
+            raise ValueError('opponent boards must be lists')
+
+        boards = self._opponent_boards.reconcile(
+            [jspecies for jboards in jopponents for jspecies in jboards])
+
+        known_opponents = {}
+        opponents = []
+        start = 0
+        for jboards in jopponents:
+            opponent_boards = boards[start:start + len(jboards)]
+            start += len(jboards)
+
+            key = tuple(map(id, opponent_boards))
+            opponent = (self._known_opponents.get(key) or
+                        Opponent(opponent_boards))
+            known_opponents[key] = opponent
+            opponents.append(opponent)
+
+        self._known_opponents = known_opponents
+        self.opponents = opponents
+        return opponents
+
+
+def _same(items, other_items):
+    """Are the two lists made of the very same objects?
+
+    :rtype: bool
+    """
+
+    return (len(items) == len(other_items) and
+            all(item is other for item, other in zip(items, other_items)))
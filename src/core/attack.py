@@ -0,0 +1,229 @@
+from evolution.core.trait import Trait
+
+
+"""
+An AttackerKey is a Natural below ATTACKER_KEYS packing, lowest first:
+    - whether the attacker has climbing (2 values)
+    - whether the attacker has ambush (2 values)
+    - the attacker's body, raised by its population if it has pack hunting
+      and capped at MAX_ATTACKER_BODY (MAX_ATTACKER_BODY + 1 values)
+    - the attacker's population, capped at MAX_VALUE + 1 (MAX_VALUE + 2
+      values)
+
+A DefenderKey is a Natural below DEFENDER_KEYS packing, lowest first:
+    - one bit for each defense protecting the defender: BURROWED, CLIMBING,
+      HARD_SHELL, HERDING, SYMBIOSIS and WARNED
+    - the defender's body (3 bits)
+    - the defender's population (3 bits)
+Interpretation:
+    - Capping an attacker's body or population does not change any
+      outcome, as no defender's body or population exceeds MAX_VALUE.
+    - A defender with a body or population above MAX_VALUE has no key and
+      is resolved by evaluating the defenses directly.
+"""
+
+MAX_VALUE = 7  # largest body or population a species can have
+HARD_SHELL_BONUS = 4
+MAX_ATTACKER_BODY = MAX_VALUE + HARD_SHELL_BONUS
+
+ATTACKER_BODIES = MAX_ATTACKER_BODY + 1
+ATTACKER_POPULATIONS = MAX_VALUE + 2
+ATTACKER_KEYS = 2 * 2 * ATTACKER_BODIES * ATTACKER_POPULATIONS
+
+BURROWED, CLIMBING, HARD_SHELL, HERDING, SYMBIOSIS, WARNED = (
+    1 << bit for bit in range(6))
+BODY_SHIFT = 6
+POPULATION_SHIFT = BODY_SHIFT + 3
+DEFENDER_KEYS = 1 << (POPULATION_SHIFT + 3)
+
+_ATTACKS = {Trait.climbing: 1, Trait.ambush: 2}
+_DEFENSES = {
+    Trait.burrowing: BURROWED,
+    Trait.climbing: CLIMBING,
+    Trait.hard_shell: HARD_SHELL,
+    Trait.herding: HERDING,
+    Trait.symbiosis: SYMBIOSIS
+}
+
+
+def attacker_key(attacker):
+    """Reduces an attacking species to what decides its attacks
+
+    :param attacker: attacking species
+    :type attacker: Species
+
+    :rtype: AttackerKey
+    """
+
+    body, population = attacker.body, attacker.population
+    key = 0
+    for trait in attacker.traits:
+        if trait is Trait.pack_hunting:
+            body += population
+        else:
+            key |= _ATTACKS.get(trait, 0)
+
+    return (key +
+            4 * min(body, MAX_ATTACKER_BODY) +
+            4 * ATTACKER_BODIES * min(population, MAX_VALUE + 1))
+
+
+def defender_key(defender, lneighbor, rneighbor):
+    """Reduces a defending species and its neighbors to what decides attacks
+
+    :param defender: defending species
+    :type defender: Species
+
+    :param lneighbor: species on left of defending species
+    :type lneighbor: Species or None
+
+    :param rneighbor: species on right of defending species
+    :type rneighbor: Species or None
+
+    :returns: the key, None if the defender's attributes are out of range
+    :rtype: DefenderKey or None
+    """
+
+    warned = ((lneighbor and Trait.warning_call in lneighbor.traits) or
+              (rneighbor and Trait.warning_call in rneighbor.traits))
+    return _defender_key(defender, rneighbor, warned)
+
+
+def _defender_key(defender, rneighbor, warned):
+    """Reduces a defending species to what decides attacks
+
+    :param defender: defending species
+    :type defender: Species
+
+    :param rneighbor: species on right of defending species
+    :type rneighbor: Species or None
+
+    :param warned: whether a neighbor of the defender has warning call
+    :type warned: bool
+
+    :rtype: DefenderKey or None
+    """
+
+    body, population = defender.body, defender.population
+    if body > MAX_VALUE or population > MAX_VALUE:
+        return None
+
+    defenses = WARNED if warned else 0
+    for trait in defender.traits:
+        defenses |= _DEFENSES.get(trait, 0)
+    if defenses & BURROWED and defender.food != population:
+        defenses ^= BURROWED
+    if defenses & SYMBIOSIS and not (rneighbor and rneighbor.body > body):
+        defenses ^= SYMBIOSIS
+
+    return defenses | body << BODY_SHIFT | population << POPULATION_SHIFT
+
+
+def _attackers(predicate):
+    """Bit mask of the attacker keys satisfying a predicate
+
+    :param predicate: decides whether an attacker is in the mask from
+                      whether it climbs, whether it ambushes, its body and
+                      its population
+    :type predicate: (bool, bool, Natural, Natural) -> bool
+
+    :rtype: int
+    """
+
+    mask = 0
+    for key in range(ATTACKER_KEYS):
+        climbing, ambush = key & 1, key >> 1 & 1
+        body = key // 4 % ATTACKER_BODIES
+        population = key // (4 * ATTACKER_BODIES)
+        if predicate(climbing, ambush, body, population):
+            mask |= 1 << key
+    return mask
+
+
+def _build_table():
+    """Resolves every attack as a mask of attacker keys per defender key
+
+    :returns: bit mask of the attacker keys able to attack, per defender key
+    :rtype: list of int
+    """
+
+    everyone = (1 << ATTACKER_KEYS) - 1
+    climbers = _attackers(lambda climbing, ambush, body, population: climbing)
+    ambushers = _attackers(lambda climbing, ambush, body, population: ambush)
+    bodies_above = [
+        _attackers(lambda climbing, ambush, body, population:
+                   body >= size + HARD_SHELL_BONUS)
+        for size in range(MAX_VALUE + 1)]
+    populations_above = [
+        _attackers(lambda climbing, ambush, body, population:
+                   population > size)
+        for size in range(MAX_VALUE + 1)]
+
+    table = []
+    for key in range(DEFENDER_KEYS):
+        defenses = key & ((1 << BODY_SHIFT) - 1)
+        body = key >> BODY_SHIFT & MAX_VALUE
+        population = key >> POPULATION_SHIFT
+
+        attackers = everyone
+        if defenses & (BURROWED | SYMBIOSIS):
+            attackers = 0
+        if defenses & CLIMBING:
+            attackers &= climbers
+        if defenses & HARD_SHELL:
+            attackers &= bodies_above[body]
+        if defenses & HERDING:
+            attackers &= populations_above[population]
+        if defenses & WARNED:
+            attackers &= ambushers
+        table.append(attackers)
+    return table
+
+
+ATTACK_TABLE = _build_table()
+
+
+def can_attack(dkey, akey):
+    """Whether an attacker can attack a defender, given their keys
+
+    :param dkey: key of the defender
+    :type dkey: DefenderKey
+
+    :param akey: key of the attacker
+    :type akey: AttackerKey
+
+    :rtype: bool
+    """
+
+    return bool(ATTACK_TABLE[dkey] >> akey & 1)
+
+
+def attackable_boards(boards, attacker):
+    """Indexes of the species boards an attacker can attack
+
+    :param boards: defending player's species boards
+    :type boards: list of Species
+
+    :param attacker: attacking species
+    :type attacker: Species
+
+    :rtype: list of Natural
+    """
+
+    akey = attacker_key(attacker)
+    warns = [False] + [Trait.warning_call in species.traits
+                       for species in boards] + [False]
+    rneighbors = list(boards[1:]) + [None]
+
+    indexes = []
+    for index, (defender, rneighbor) in enumerate(zip(boards, rneighbors)):
+        dkey = _defender_key(
+            defender, rneighbor, warns[index] or warns[index+2])
+        if dkey is None:
+            lneighbor = boards[index-1] if index > 0 else None
+            attackable = defender.is_attackable(attacker, lneighbor, rneighbor)
+        else:
+            attackable = ATTACK_TABLE[dkey] >> akey & 1
+        if attackable:
+            indexes.append(index)
+    return indexes
@@ -5,6 +5,8 @@ A JCard is [FoodValue, JTrait].
       specifications of Evolution.
 """
 
+from evolution.core.codec import CARD, CARD_INDICES
+
 
 class BaseCard:
     """
@@ -40,3 +42,12 @@ class BaseCard:
         """
 
         return [self.food, self.trait.to_json()]
+
+    def to_binary(self):
+        """Converts a Card to its binary representation
+
+        :returns: binary representation of the current card
+        :rtype: BinaryCard
+        """
+
+        return CARD.pack(CARD_INDICES[self.food, self.trait])
@@ -0,0 +1,284 @@
+import struct
+
+from evolution.core.trait import Trait
+
+
+"""
+A Codec is one of:
+    - 'json'
+    - 'binary'
+Interpretation:
+    - The encoding a dealer uses for the messages it sends to a player.
+    - Players always reply in JSON.
+
+A SignUp is one of:
+    - A JSON string
+    - [JSON string, SignUpOptions]
+Interpretation:
+    - The string names the player, conventionally "hello".
+    - SignUpOptions is a JSON object which may request a ["codec", Codec].
+
+The dealer accepts a SignUp with "ok" when it uses JSON for the connection,
+and with ["ok", SignUpOptions] listing the options it accepted otherwise.
+
+
+A BinaryFrame is a 1 byte frame kind and a 4 byte payload length followed by
+the payload. All integers are big endian.
+
+A BinarySpecies is 4 bytes:
+    - food and body as the high and low nibble of the first byte
+    - population and fat-food as the high and low nibble of the second byte
+    - a 16 bit trait field holding up to three 5 bit trait values in order,
+      where 0 marks an empty slot
+
+A BinaryCard is 1 byte, the card's index into CARD_CODES.
+
+A BinaryList is a 2 byte count followed by that many items.
+
+The payload of each frame kind is:
+    - START_FRAME: watering hole, bag, BinaryList of BinarySpecies,
+                   BinaryList of BinaryCard
+    - CHOOSE_FRAME: BinaryList of BinaryList of BinarySpecies for the
+                    opponents before and for the opponents after the player
+    - FEED_NEXT_FRAME: bag, BinaryList of BinarySpecies,
+                       BinaryList of BinaryCard, watering hole,
+                       BinaryList of BinaryList of BinarySpecies
+where the watering hole and bag are 2 byte naturals.
+"""
+
+JSON_CODEC = 'json'
+BINARY_CODEC = 'binary'
+CODECS = {JSON_CODEC, BINARY_CODEC}
+
+START_FRAME, CHOOSE_FRAME, FEED_NEXT_FRAME = 1, 2, 3
+
+FRAME_HEADER = struct.Struct('>BI')
+SPECIES = struct.Struct('>BBH')
+NATURAL = struct.Struct('>H')
+COUNT = struct.Struct('>H')
+CARD = struct.Struct('>B')
+
+NIBBLE_BITS, NIBBLE_MASK = 4, 0xf
+TRAIT_BITS, TRAIT_MASK, TRAIT_SLOTS = 5, 0x1f, 3
+
+CARNIVORE_FOOD_RANGE = (-8, 8)
+NON_CARNIVORE_FOOD_RANGE = (-3, 3)
+
+
+def _make_card_codes():
+    """Every (food, trait) pair a card can have, ordered by trait then food
+
+    :returns: all legal card values
+    :rtype: list of (int, Trait)
+    """
+
+    codes = []
+    for trait in Trait:
+        min_food, max_food = (
+            CARNIVORE_FOOD_RANGE if trait is Trait.carnivore
+            else NON_CARNIVORE_FOOD_RANGE)
+        codes.extend((food, trait) for food in range(min_food, max_food+1))
+    return codes
+
+
+CARD_CODES = _make_card_codes()
+CARD_INDICES = {card: code for code, card in enumerate(CARD_CODES)}
+
+
+def pack_nibbles(high, low):
+    """Packs two naturals below 16 into a byte
+
+    :param high: value of the high nibble
+    :type high: Natural
+
+    :param low: value of the low nibble
+    :type low: Natural
+
+    :returns: the packed byte
+    :rtype: Natural
+
+    :raises: ValueError if either value does not fit in a nibble
+    """
+
+    if not (0 <= high <= NIBBLE_MASK and 0 <= low <= NIBBLE_MASK):
+        raise ValueError('values must fit in a nibble')
+    return (high << NIBBLE_BITS) | low
+
+
+def unpack_nibbles(byte):
+    """Splits a byte into its high and low nibble
+
+    :param byte: byte to split
+    :type byte: Natural
+
+    :returns: high nibble, low nibble
+    :rtype: (Natural, Natural)
+    """
+
+    return byte >> NIBBLE_BITS, byte & NIBBLE_MASK
+
+
+def pack_traits(traits):
+    """Packs up to three traits into a 16 bit field, preserving their order
+
+    :param traits: traits to pack
+    :type traits: list of Trait
+
+    :returns: packed trait field
+    :rtype: Natural
+
+    :raises: ValueError if there are more traits than slots
+    """
+
+    if len(traits) > TRAIT_SLOTS:
+        raise ValueError('at most {} traits can be packed'.format(TRAIT_SLOTS))
+
+    field = 0
+    for slot, trait in enumerate(traits):
+        field |= trait.value << (slot * TRAIT_BITS)
+    return field
+
+
+def unpack_traits(field):
+    """Unpacks a 16 bit trait field
+
+    :param field: packed trait field
+    :type field: Natural
+
+    :returns: the packed traits in order
+    :rtype: list of Trait
+
+    :raises: ValueError if the field does not hold valid traits
+    """
+
+    traits = []
+    for slot in range(TRAIT_SLOTS):
+        value = (field >> (slot * TRAIT_BITS)) & TRAIT_MASK
+        if not value:
+            if field >> (slot * TRAIT_BITS):
+                raise ValueError('trait slots must be filled in order')
+            break
+        traits.append(Trait(value))
+    return traits
+
+
+def pack_list(items, pack_item):
+    """Packs a list as a count followed by its packed items
+
+    :param items: items to pack
+    :type items: list of Any
+
+    :param pack_item: packs a single item
+    :type pack_item: Any -> bytes
+
+    :returns: packed list
+    :rtype: bytes
+    """
+
+    return COUNT.pack(len(items)) + b''.join(map(pack_item, items))
+
+
+def unpack_list(buf, offset, unpack_item):
+    """Unpacks a list packed with pack_list
+
+    :param buf: buffer holding the packed list
+    :type buf: bytes or memoryview
+
+    :param offset: position of the list in buf
+    :type offset: Natural
+
+    :param unpack_item: unpacks an item at an offset into (item, new offset)
+    :type unpack_item: (bytes, Natural) -> (Any, Natural)
+
+    :returns: unpacked items and the offset just past the list
+    :rtype: (list of Any, Natural)
+    """
+
+    [count] = COUNT.unpack_from(buf, offset)
+    offset += COUNT.size
+
+    items = []
+    for _ in range(count):
+        item, offset = unpack_item(buf, offset)
+        items.append(item)
+    return items, offset
+
+
+def unpack_natural(buf, offset):
+    """Unpacks a 2 byte natural
+
+    :returns: the natural and the offset just past it
+    :rtype: (Natural, Natural)
+    """
+
+    [natural] = NATURAL.unpack_from(buf, offset)
+    return natural, offset + NATURAL.size
+
+
+def send_frame(kind, payload, sock):
+    """Sends a binary frame over the socket
+
+    :param kind: kind of the frame
+    :type kind: Natural
+
+    :param payload: contents of the frame
+    :type payload: bytes
+
+    :param sock: socket to send the frame over
+    :type sock: socket.socket
+    """
+
+    sock.sendall(encode_frame(kind, payload))
+
+
+def encode_frame(kind, payload):
+    """Encodes a binary frame the way it is sent over a socket
+
+    :param kind: kind of the frame
+    :type kind: Natural
+
+    :param payload: contents of the frame
+    :type payload: bytes
+
+    :rtype: bytes
+    """
+
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+
+def read_frame(sock):
+    """Reads a binary frame from the socket
+
+    :param sock: socket to read the frame from
+    :type sock: socket.socket
+
+    :returns: kind and payload of the frame, None if the socket closed
+    :rtype: (Natural, memoryview) or None
+    """
+
+    header = _read_exactly(sock, FRAME_HEADER.size)
+    if header is None:
+        return
+
+    kind, length = FRAME_HEADER.unpack(header)
+    payload = _read_exactly(sock, length)
+    if payload is None:
+        return
+    return kind, payload
+
+
+def _read_exactly(sock, size):
+    """Reads exactly size bytes from the socket
+
+    :returns: bytes read, None if the socket closed first
+    :rtype: memoryview or None
+    """
+
+    buf = memoryview(bytearray(size))
+    received = 0
+    while received < size:
+        count = sock.recv_into(buf[received:])
+        if not count:
+            return
+        received += count
+    return buf
@@ -1,7 +1,26 @@
 import json
+import select
+import socket
+import time
 
 
-def send_msg(msg, sock):
+MAX_QUEUED_BYTES = 1 << 20  # bytes queued for a connection before eviction
+SEND_SECONDS = 1  # seconds a queued message may take to leave
+MAX_MSG_BYTES = 1 << 20  # longest message read from a connection
+MAX_SCALAR_BYTES = 64  # longest number, true, false or null message
+
+_ENCODER = json.JSONEncoder()
+
+_QUOTE, _BACKSLASH = ord('"'), ord('\\')
+_WHITESPACE = frozenset(b' \t\n\r')
+_OPENERS = {ord('['): ord(']'), ord('{'): ord('}')}
+_CLOSERS = frozenset(b']}')
+_SCALAR_BYTES = frozenset(b'0123456789+-.eEtruefalsn')
+_STARTS = frozenset(b'[{"-0123456789tfn')
+_STRUCTURE_BYTES = _SCALAR_BYTES | _WHITESPACE | frozenset(b',:')
+
+
+def send_msg(msg, sock, buffer=None):
     """sends a message over the sender
 
     :param msg: message to send
@@ -10,30 +29,382 @@ def send_msg(msg, sock):
     :param sender: socket to send message over
     :type sender: socket.socket
 
+    :param buffer: (optional) buffer owned by the connection that the
+                   message is encoded into, emptied again once sent
+    :type buffer: bytearray or None
+
     :returns: reply message
     :type msg: JSON
     """
-    sock.sendall(json.dumps(msg).encode())
+    if buffer is None:
+        buffer = bytearray()
+    write_msg(msg, buffer)
+    try:
+        sock.sendall(buffer)
+    finally:
+        del buffer[:]
+
+
+def encode_msg(msg):
+    """Encodes a message the way it is sent over a socket
+
+    :param msg: message to encode
+    :type msg: JSON
+
+    :rtype: bytes
+    """
+
+    return json.dumps(msg).encode()
+
 
+def write_msg(msg, buffer):
+    """Appends a message to a buffer, encoded the way encode_msg does
 
-def read_msg(sock):
+    The message is written chunk by chunk as the encoder produces it, so
+    its text is never held whole, neither as a string nor as bytes.
+
+    :param msg: message to encode
+    :type msg: JSON
+
+    :param buffer: buffer to append the encoded message to
+    :type buffer: bytearray
+    """
+
+    for chunk in _ENCODER.iterencode(msg):
+        buffer += chunk.encode()
+
+
+def read_msg(sock, max_bytes=MAX_MSG_BYTES):
     """listens for a message on the receiver
 
+    Bytes are read one at a time so nothing past the message is consumed,
+    and checked as they arrive, so a message is parsed only once it is
+    complete.
+
     :param sock: the thing
     :type sock: socket.socket
 
-    :returns: the messsage it hears
-    :rtype: JSON
+    :param max_bytes: longest message accepted
+    :type max_bytes: Natural+
+
+    :returns: the messsage it hears, None if the connection closed
+    :rtype: JSON or None
+
+    :raises: MessageRejected if the message is too long or malformed
     """
 
-    msg = b''
+    scanner = MessageScanner(max_bytes)
+    msg = bytearray()
     while True:
         data = sock.recv(1)
         if not data:
             return
 
         msg += data
+        if scanner.feed(data[0]):
+            try:
+                return json.loads(msg.decode('utf-8'))
+            except ValueError:
+                if not scanner.scalar:
+                    raise MessageRejected('malformed', 'message is not JSON')
+
+
+class MessageRejected(ValueError):
+    """A message refused before it was fully read or parsed"""
+
+    def __init__(self, reason, message):
+        """
+        :attr reason: 'oversized' or 'malformed'
+        :type reason: str
+        """
+
+        super().__init__(message)
+        self.reason = reason
+
+
+class MessageScanner:
+    """Tracks the structure of a JSON message one byte at a time
+
+    The scanner knows when the brackets of a message balance, so the
+    message only has to be parsed once, and it refuses a message as soon
+    as it grows past its size limit or holds a byte that no JSON message
+    could hold at that point.
+    """
+
+    def __init__(self, max_bytes=MAX_MSG_BYTES):
+        """
+        :attr max_bytes: longest message accepted
+        :type max_bytes: Natural+
+
+        :attr size: bytes scanned so far
+        :type size: Natural
+
+        :attr scalar: whether the message is a number, true, false or null;
+                      those have no closing byte, so every byte scanned may
+                      end them
+        :type scalar: bool
+        """
+
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.scalar = False
+        self._started = False
+        self._closers = []
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, byte):
+        """Scans the next byte of the message
+
+        :param byte: next byte received
+        :type byte: int
+
+        :returns: whether the bytes so far may form a whole message
+        :rtype: bool
+
+        :raises: MessageRejected if the message is too long or malformed
+        """
+
+        self.size += 1
+        if self.size > self.max_bytes or (
+                self.scalar and self.size > MAX_SCALAR_BYTES):
+            raise MessageRejected(
+                'oversized', 'message exceeds {} bytes'.format(
+                    MAX_SCALAR_BYTES if self.scalar else self.max_bytes))
+
+        if self._in_string:
+            return self._feed_string(byte)
+
+        if not self._started:
+            if byte in _WHITESPACE:
+                return False
+            if byte not in _STARTS:
+                raise MessageRejected('malformed', 'message is not JSON')
+            self._started = True
+            self.scalar = byte not in _OPENERS and byte != _QUOTE
+
+        if self.scalar:
+            if byte not in _SCALAR_BYTES:
+                raise MessageRejected('malformed', 'message is not JSON')
+            return True
+
+        if byte == _QUOTE:
+            self._in_string = True
+        elif byte in _OPENERS:
+            self._closers.append(_OPENERS[byte])
+        elif byte in _CLOSERS:
+            if not self._closers or self._closers.pop() != byte:
+                raise MessageRejected('malformed', 'unbalanced brackets')
+            return not self._closers
+        elif byte not in _STRUCTURE_BYTES:
+            raise MessageRejected('malformed', 'message is not JSON')
+        return False
+
+    def _feed_string(self, byte):
+        """Scans a byte inside a string
+
+        :returns: whether the string ends the message
+        :rtype: bool
+        """
+
+        if self._escaped:
+            self._escaped = False
+        elif byte == _BACKSLASH:
+            self._escaped = True
+        elif byte == _QUOTE:
+            self._in_string = False
+            return not self._closers
+        elif byte < 0x20:
+            raise MessageRejected('malformed', 'control character in string')
+        return False
+
+
+class MessageDecoder:
+    """Splits a stream of bytes into the JSON messages it holds
+
+    Bytes can be fed in whatever pieces they arrive in, so a non-blocking
+    socket never has to wait for the rest of a message. Text that does not
+    parse is held in case more bytes complete it, unless it could never
+    become a message or grows past the size limit.
+    """
+
+    def __init__(self, max_bytes=MAX_MSG_BYTES):
+        """
+        :attr buffer: text received that does not yet form a message
+        :type buffer: str
+
+        :attr max_bytes: longest incomplete message held
+        :type max_bytes: Natural+
+        """
+
+        self.buffer = ''
+        self.max_bytes = max_bytes
+        self._partial = b''
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, data):
+        """Adds received bytes and decodes every message they complete
+
+        A number at the very end of the received bytes could still grow, so
+        it is only decoded once something follows it.
+
+        :param data: bytes received from the socket
+        :type data: bytes
+
+        :returns: messages completed by the data, oldest first
+        :rtype: list of JSON
+
+        :raises: ValueError if the data is not valid UTF-8
+        :raises: MessageRejected if the held text is too long or malformed
+        """
+
+        data = self._partial + data
+        try:
+            text = data.decode('utf-8')
+            self._partial = b''
+        except UnicodeDecodeError as error:
+            if error.end != len(data):
+                raise ValueError('message is not valid UTF-8')
+            text = data[:error.start].decode('utf-8')
+            self._partial = data[error.start:]
+
+        self.buffer += text
+        msgs = []
+        while True:
+            start = len(self.buffer) - len(self.buffer.lstrip())
+            try:
+                msg, end = self._decoder.raw_decode(self.buffer, start)
+            except ValueError:
+                self.buffer = self.buffer[start:]
+                return self._check_held(msgs)
+
+            if end == len(self.buffer) and self._is_number(msg):
+                self.buffer = self.buffer[start:]
+                return self._check_held(msgs)
+
+            msgs.append(msg)
+            self.buffer = self.buffer[end:]
+
+    def _check_held(self, msgs):
+        """Makes sure the text held could still become a message
+
+        :param msgs: messages decoded so far
+        :type msgs: list of JSON
+
+        :returns: the messages
+        :rtype: list of JSON
+
+        :raises: MessageRejected if the held text is too long or malformed
+        """
+
+        if len(self.buffer) + len(self._partial) > self.max_bytes:
+            raise MessageRejected(
+                'oversized', 'message exceeds {} bytes'.format(self.max_bytes))
+        if self.buffer and ord(self.buffer[0]) not in _STARTS:
+            raise MessageRejected('malformed', 'message is not JSON')
+        return msgs
+
+    @staticmethod
+    def _is_number(msg):
+        """Is the message a JSON number?
+
+        :rtype: bool
+        """
+
+        return isinstance(msg, (int, float)) and not isinstance(msg, bool)
+
+
+class Outbox:
+    """Bytes waiting to be sent over a connection, bounded in size and time
+
+    Writes never block: what the socket does not take at once stays queued
+    until the next write or flush. A peer that stops reading therefore
+    fills the queue instead of stalling the sender.
+    """
+
+    def __init__(self, sock, max_bytes=MAX_QUEUED_BYTES,
+                 send_seconds=SEND_SECONDS):
+        """
+        :attr sock: connection to send over
+        :type sock: socket.socket
+
+        :attr max_bytes: most bytes that may wait to be sent
+        :type max_bytes: Natural+
+
+        :attr send_seconds: longest a flush waits for the peer to read
+        :type send_seconds: int or float
+
+        :attr queued: bytes waiting to be sent
+        :type queued: bytearray
+        """
+
+        self.sock = sock
+        self.max_bytes = max_bytes
+        self.send_seconds = send_seconds
+        self.queued = bytearray()
+
+    def push(self, data):
+        """Queues data and sends as much of the queue as the socket takes
+
+        :param data: bytes to send
+        :type data: bytes
+
+        :raises: BlockingIOError if the queue would exceed max_bytes
+        :raises: socket.error if the connection is broken
+        """
+
+        if len(self.queued) + len(data) > self.max_bytes:
+            raise BlockingIOError('outbound queue is full')
+
+        self.queued += data
+        self._send()
+
+    def push_msg(self, msg):
+        """Encodes a message straight into the queue and sends what it can
+
+        :param msg: message to send
+        :type msg: JSON
+
+        :raises: BlockingIOError if the queue would exceed max_bytes
+        :raises: socket.error if the connection is broken
+        """
+
+        size = len(self.queued)
+        write_msg(msg, self.queued)
+        if len(self.queued) > self.max_bytes:
+            del self.queued[size:]
+            raise BlockingIOError('outbound queue is full')
+
+        self._send()
+
+    def flush(self):
+        """Sends everything queued, waiting at most send_seconds
+
+        :raises: TimeoutError if the peer does not read the queue in time
+        :raises: socket.error if the connection is broken
+        """
+
+        deadline = time.monotonic() + self.send_seconds
+        while self._send():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError('peer did not read its messages in time')
+            select.select([], [self.sock], [], remaining)
+
+    def _send(self):
+        """Sends as much of the queue as the socket takes without blocking
+
+        :returns: whether bytes are still queued
+        :rtype: bool
+        """
+
+        start = 0
         try:
-            return json.loads(msg.decode('utf-8').strip())
-        except ValueError:
-            continue
+            with memoryview(self.queued) as view:
+                while start < len(view):
+                    start += self.sock.send(view[start:], socket.MSG_DONTWAIT)
+        except BlockingIOError:
+            pass
+        finally:
+            del self.queued[:start]
+        return bool(self.queued)
@@ -1,6 +1,3 @@
-from evolution.core.trait import Trait
-
-
 """
 A JSpecies is a [["food", JNat],
                  ["body", JNat],
@@ -24,6 +21,10 @@ Interpretation:
     - A JSpecies+ with a 0-valued "fat-food" field renders as a plain Species.
 """
 
+from evolution.core import attack
+from evolution.core.codec import SPECIES, pack_nibbles, pack_traits
+from evolution.core.trait import Trait
+
 
 class BaseSpecies:
     """
@@ -93,6 +94,26 @@ class BaseSpecies:
         :type rneighbor: Species or None
         """
 
+        dkey = attack.defender_key(self, lneighbor, rneighbor)
+        if dkey is None:
+            return self._resolve_attack(attacker, lneighbor, rneighbor)
+        return attack.can_attack(dkey, attack.attacker_key(attacker))
+
+    def _resolve_attack(self, attacker, lneighbor, rneighbor):
+        """Is the species attackable, evaluating every defense directly?
+
+        Used for species too big for the attack table.
+
+        :param attacker: attacking species
+        :type attacker: Species
+
+        :param lneighbor: species on left of defending species
+        :type lneighbor: Species or None
+
+        :param rneighbor: species on right of defending species
+        :type rneighbor: Species or None
+        """
+
         modified_attacker = attacker._as_attacker()
 
         return not (
@@ -200,3 +221,15 @@ class BaseSpecies:
         if self.fat_food > 0:
             jspecies.append(['fat-food', self.fat_food])
         return jspecies
+
+    def to_binary(self):
+        """Converts a Species to its binary representation.
+
+        :returns: binary representation of the Species.
+        :rtype: BinarySpecies
+        """
+
+        return SPECIES.pack(
+            pack_nibbles(self.food, self.body),
+            pack_nibbles(self.population, self.fat_food),
+            pack_traits(self.traits))
@@ -0,0 +1,81 @@
+from itertools import product
+from random import Random
+
+from evolution.core.attack import (
+    ATTACK_TABLE, DEFENDER_KEYS, attackable_boards, attacker_key, can_attack,
+    defender_key)
+from evolution.core.species import BaseSpecies
+from evolution.core.trait import Trait
+
+
+ATTACK_TRAITS = [
+    Trait.ambush, Trait.burrowing, Trait.climbing, Trait.hard_shell,
+    Trait.herding, Trait.pack_hunting, Trait.symbiosis, Trait.warning_call,
+    Trait.carnivore]
+
+
+def random_species(rng, max_value=7):
+    population = rng.randint(0, max_value)
+    return BaseSpecies(
+        food=rng.randint(0, population), body=rng.randint(0, max_value),
+        population=population, traits=rng.sample(ATTACK_TRAITS, 3))
+
+
+def test_table_covers_every_defender():
+    assert len(ATTACK_TABLE) == DEFENDER_KEYS
+
+
+def test_table_matches_direct_resolution():
+    rng = Random(38)
+    for _ in range(5000):
+        attacker, defender = random_species(rng), random_species(rng)
+        lneighbor, rneighbor = [rng.choice([None, random_species(rng)])
+                                for _ in range(2)]
+
+        assert (can_attack(defender_key(defender, lneighbor, rneighbor),
+                           attacker_key(attacker)) ==
+                defender._resolve_attack(attacker, lneighbor, rneighbor))
+
+
+def test_each_defense():
+    attacker = BaseSpecies(body=3, population=3, traits=[Trait.carnivore])
+    defenses = [
+        BaseSpecies(food=2, population=2, traits=[Trait.burrowing]),
+        BaseSpecies(traits=[Trait.climbing]),
+        BaseSpecies(traits=[Trait.hard_shell]),
+        BaseSpecies(population=3, traits=[Trait.herding])]
+
+    for defender in defenses:
+        assert not defender.is_attackable(attacker, None, None)
+    assert BaseSpecies().is_attackable(attacker, None, None)
+
+    warner = BaseSpecies(traits=[Trait.warning_call])
+    assert not BaseSpecies().is_attackable(attacker, warner, None)
+    attacker.traits.append(Trait.ambush)
+    assert BaseSpecies().is_attackable(attacker, warner, None)
+
+
+def test_out_of_range_species_resolve_directly():
+    attacker = BaseSpecies(body=9, population=9, traits=[Trait.carnivore])
+    defender = BaseSpecies(body=9, population=8,
+                           traits=[Trait.hard_shell, Trait.herding])
+
+    assert defender_key(defender, None, None) is None
+    assert not defender.is_attackable(attacker, None, None)
+    attacker.population = 10
+    assert attackable_boards([defender], attacker) == []
+    attacker.body = 13
+    assert attackable_boards([defender], attacker) == [0]
+
+
+def test_attackable_boards_uses_neighbors():
+    rng = Random(8)
+    for size, _ in product(range(5), range(200)):
+        boards = [random_species(rng) for _ in range(size)]
+        attacker = random_species(rng)
+
+        assert attackable_boards(boards, attacker) == [
+            index for index, defender in enumerate(boards)
+            if defender._resolve_attack(
+                attacker, boards[index-1] if index else None,
+                boards[index+1] if index + 1 < size else None)]
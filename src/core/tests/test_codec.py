@@ -0,0 +1,56 @@
+import socket
+
+from pytest import raises
+
+from evolution.core import codec
+from evolution.core.trait import Trait
+
+
+def test_card_codes_fit_in_a_byte():
+    assert len(codec.CARD_CODES) == 17 + 15 * 7
+    assert len(codec.CARD_CODES) <= 256
+    assert len(set(codec.CARD_CODES)) == len(codec.CARD_CODES)
+
+
+def test_pack_nibbles():
+    assert codec.pack_nibbles(3, 7) == 0x37
+    assert codec.unpack_nibbles(0x37) == (3, 7)
+
+    with raises(ValueError):
+        codec.pack_nibbles(16, 0)
+
+
+def test_pack_traits_preserves_order():
+    traits = [Trait.warning_call, Trait.carnivore, Trait.fat_tissue]
+    assert codec.unpack_traits(codec.pack_traits(traits)) == traits
+    assert codec.unpack_traits(codec.pack_traits([])) == []
+
+
+def test_pack_too_many_traits():
+    with raises(ValueError):
+        codec.pack_traits(
+            [Trait.ambush, Trait.horns, Trait.herding, Trait.climbing])
+
+
+def test_unpack_traits_with_gap():
+    field = Trait.horns.value << (2 * codec.TRAIT_BITS)
+    with raises(ValueError):
+        codec.unpack_traits(field)
+
+
+def test_pack_list():
+    packed = codec.pack_list([1, 2], codec.NATURAL.pack)
+    assert codec.unpack_list(packed, 0, codec.unpack_natural) == ([1, 2], 6)
+
+
+def test_frame_round_trip():
+    sender, receiver = socket.socketpair()
+
+    codec.send_frame(codec.FEED_NEXT_FRAME, b'\x01\x02\x03', sender)
+    kind, payload = codec.read_frame(receiver)
+    assert kind == codec.FEED_NEXT_FRAME
+    assert bytes(payload) == b'\x01\x02\x03'
+
+    sender.close()
+    assert codec.read_frame(receiver) is None
+    receiver.close()
@@ -3,7 +3,11 @@ import socket
 from queue import Queue
 from threading import Thread
 
-from evolution.core.connection import send_msg, read_msg
+from pytest import raises
+
+from evolution.core.connection import (
+    MessageDecoder, MessageRejected, MessageScanner, Outbox, encode_msg,
+    read_msg, send_msg, write_msg)
 
 
 def test_send_msg():
@@ -41,3 +45,148 @@ def test_send_msg():
 
     assert read_msg(conn) == expected_reply
     assert client_queue.get() == sent_msg
+
+
+def test_send_msg_reuses_the_connection_buffer():
+    sender, receiver = socket.socketpair()
+    buffer = bytearray()
+
+    for msg in ['ok', [1, [2, {'codec': 'json'}]]]:
+        send_msg(msg, sender, buffer)
+        assert read_msg(receiver) == msg
+        assert not buffer
+
+    receiver.close()
+    with raises(OSError):
+        send_msg([3], sender, buffer)
+    assert not buffer
+
+
+def test_decoder_splits_messages():
+    decoder = MessageDecoder()
+
+    assert decoder.feed(b'"ok" [1, [2') == ['ok']
+    assert decoder.feed(b']] [[], []]') == [[1, [2]], [[], []]]
+    assert decoder.buffer == ''
+
+
+def test_decoder_waits_for_number_to_end():
+    decoder = MessageDecoder()
+
+    assert decoder.feed(b'12') == []
+    assert decoder.feed(b'3 ') == [123]
+
+
+def test_decoder_joins_split_characters():
+    decoder = MessageDecoder()
+    encoded = json.dumps('caf\u00e9', ensure_ascii=False).encode()
+
+    assert decoder.feed(encoded[:-2]) == []
+    assert decoder.feed(encoded[-2:]) == ['caf\u00e9']
+
+
+def test_decoder_rejects_oversized_message():
+    decoder = MessageDecoder(max_bytes=8)
+
+    assert decoder.feed(b'[1, 2') == []
+    with raises(MessageRejected) as error:
+        decoder.feed(b', 3, 4')
+    assert error.value.reason == 'oversized'
+
+
+def test_decoder_rejects_garbage():
+    with raises(MessageRejected) as error:
+        MessageDecoder().feed(b'GET / HTTP/1.1')
+    assert error.value.reason == 'malformed'
+
+
+def test_read_msg_parses_once_complete():
+    server_sock, client_sock = socket.socketpair()
+    client_sock.sendall(b' [1, ["a]", {"b": "\\\\"}]]"ok"')
+    client_sock.sendall(b'7 true ')
+
+    assert read_msg(server_sock) == [1, ['a]', {'b': '\\'}]]
+    assert read_msg(server_sock) == 'ok'
+    assert read_msg(server_sock) == 7
+    assert read_msg(server_sock) is True
+    client_sock.close()
+    assert read_msg(server_sock) is None
+
+
+def test_read_msg_rejects_oversized_message_early():
+    server_sock, client_sock = socket.socketpair()
+    client_sock.sendall(b'[' + b'0, ' * 100)
+
+    with raises(MessageRejected) as error:
+        read_msg(server_sock, max_bytes=16)
+    assert error.value.reason == 'oversized'
+    assert len(server_sock.recv(1024)) == 301 - 17
+
+
+def test_scanner_rejects_malformed_prefixes():
+    for prefix in [b'x', b'[}', b']', b'[1 ! 2]', b'"a\x01', b'tr[']:
+        scanner = MessageScanner()
+        with raises(MessageRejected) as error:
+            for byte in prefix:
+                scanner.feed(byte)
+        assert error.value.reason == 'malformed'
+
+
+def test_scanner_limits_scalars():
+    scanner = MessageScanner()
+
+    with raises(MessageRejected) as error:
+        for byte in b'1' * 100:
+            scanner.feed(byte)
+    assert error.value.reason == 'oversized'
+
+
+def test_outbox_sends_without_blocking():
+    sender, receiver = socket.socketpair()
+    outbox = Outbox(sender)
+
+    outbox.push(b'"hello"')
+    outbox.flush()
+    assert read_msg(receiver) == 'hello'
+
+
+def test_outbox_refuses_to_grow_past_limit():
+    sender, receiver = socket.socketpair()
+    outbox = Outbox(sender, max_bytes=1 << 16)
+
+    with raises(BlockingIOError):
+        while True:
+            outbox.push(b' ' * 1024)
+    assert len(outbox.queued) <= outbox.max_bytes
+
+
+def test_outbox_flush_gives_up_on_peer_not_reading():
+    sender, receiver = socket.socketpair()
+    outbox = Outbox(sender, max_bytes=1 << 24, send_seconds=0.1)
+    outbox.push(b' ' * (1 << 23))
+
+    with raises(TimeoutError):
+        outbox.flush()
+
+
+def test_write_msg_matches_encode_msg():
+    species = [['food', 1], ['body', 2], ['population', 3],
+               ['traits', ['carnivore', 'fat-tissue']], ['fat-food', 1]]
+    msgs = ['ok', 12, None, [], [[], [[]]], ['caf\u00e9', {'codec': 'json'}],
+            [3, [species], [[2, 'horns']], 4, [[species, species], []]]]
+
+    for msg in msgs:
+        buffer = bytearray(b'"before"')
+        write_msg(msg, buffer)
+        assert buffer == b'"before"' + encode_msg(msg)
+
+
+def test_outbox_rejects_message_past_limit_whole():
+    sender, receiver = socket.socketpair()
+    outbox = Outbox(sender, max_bytes=1 << 16)
+
+    with raises(BlockingIOError):
+        while True:
+            queued = bytes(outbox.queued)
+            outbox.push_msg([['food', 1]] * 100)
+    assert outbox.queued == queued
@@ -0,0 +1,78 @@
+import socket
+
+from pytest import mark, raises
+
+from evolution.core.connection import read_msg, send_msg
+from evolution.core.transport import (
+    TCP, UNIX, accept, connect, listen, parse_address, pipe, tcp_address,
+    unix_address)
+
+
+def nodelay(sock):
+    return sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+
+
+def test_parse_address():
+    assert parse_address(['localhost', '4567', 'binary']) == (
+        tcp_address('localhost', 4567), ['binary'])
+    assert parse_address(['unix:/tmp/evolution.sock', 'binary']) == (
+        unix_address('/tmp/evolution.sock'), ['binary'])
+    with raises(ValueError):
+        parse_address(['localhost'])
+
+
+def test_address_to_args_round_trip():
+    for address in [tcp_address('localhost', 4567), unix_address('/tmp/e')]:
+        assert parse_address(address.to_args()) == (address, [])
+    assert tcp_address('a', 1).transport == TCP
+    assert unix_address('a').transport == UNIX
+
+
+def test_tcp_disables_nagle():
+    listener = listen(tcp_address('localhost', 0))
+    player_end = connect(tcp_address(*listener.getsockname()))
+    dealer_end = accept(listener)
+
+    assert nodelay(player_end) and nodelay(dealer_end)
+    send_msg('hello', player_end)
+    assert read_msg(dealer_end) == 'hello'
+
+
+@mark.skipif(not socket.has_ipv6, reason='no IPv6 support')
+def test_connect_reaches_ipv6_hosts():
+    listener = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    try:
+        listener.bind(('::1', 0))
+    except OSError:
+        listener.close()
+        return
+    listener.listen(2)
+    address = tcp_address('::1', listener.getsockname()[1])
+
+    for blocking in [True, False]:
+        player_end = connect(address, blocking)
+        dealer_end = accept(listener)
+        player_end.setblocking(True)
+
+        assert player_end.family == socket.AF_INET6 and nodelay(player_end)
+        send_msg('hello', player_end)
+        assert read_msg(dealer_end) == 'hello'
+
+
+def test_unix_socket_replaces_stale_path(tmp_path):
+    address = unix_address(str(tmp_path / 'evolution.sock'))
+    listen(address).close()
+
+    listener = listen(address)
+    player_end = connect(address)
+    dealer_end = accept(listener)
+
+    send_msg(['ok'], dealer_end)
+    assert read_msg(player_end) == ['ok']
+
+
+def test_pipe():
+    dealer_end, player_end = pipe()
+
+    send_msg([1, 2], dealer_end)
+    assert read_msg(player_end) == [1, 2]
@@ -0,0 +1,204 @@
+from collections import namedtuple
+import errno
+import os
+import socket
+
+
+TCP, UNIX = 'tcp', 'unix'
+UNIX_PREFIX = UNIX + ':'
+
+
+class Address(namedtuple('Address', ['transport', 'target'])):
+    """
+    Where a dealer listens for players.
+
+    :attr transport: TCP or UNIX
+    :type transport: str
+
+    :attr target: (host, port) for TCP, the socket's path for UNIX
+    :type target: (str, int) or str
+    """
+
+    def to_args(self):
+        """Command line arguments that parse_address reads back
+
+        :rtype: list of str
+        """
+
+        if self.transport == UNIX:
+            return [UNIX_PREFIX + self.target]
+        host, port = self.target
+        return [host, str(port)]
+
+
+def tcp_address(host, port):
+    """Creates the address of a TCP endpoint
+
+    :rtype: Address
+    """
+
+    return Address(TCP, (host, port))
+
+
+def unix_address(path):
+    """Creates the address of a Unix domain socket
+
+    :rtype: Address
+    """
+
+    return Address(UNIX, path)
+
+
+def parse_address(args):
+    """Reads an address from the start of command line arguments
+
+    A Unix domain socket is given as a single 'unix:PATH' argument, a TCP
+    endpoint as a host argument followed by a port argument.
+
+    :param args: command line arguments starting with the address
+    :type args: list of str
+
+    :returns: the address and the arguments following it
+    :rtype: (Address, list of str)
+
+    :raises: ValueError if the arguments do not start with an address
+    """
+
+    if args and args[0].startswith(UNIX_PREFIX):
+        return unix_address(args[0][len(UNIX_PREFIX):]), args[1:]
+    if len(args) < 2:
+        raise ValueError('expected a host and port or unix:PATH')
+    return tcp_address(args[0], int(args[1])), args[2:]
+
+
+def connect(address, blocking=True):
+    """Connects to a dealer
+
+    A non-blocking connection may still be in progress when it is returned;
+    it becomes writable once established.
+
+    :param address: where the dealer listens
+    :type address: Address
+
+    :param blocking: (optional) whether to wait for the connection
+    :type blocking: bool
+
+    :returns: connection to the dealer
+    :rtype: socket.socket
+    """
+
+    if address.transport == TCP:
+        if blocking:
+            sock = socket.create_connection(address.target)
+            tune(sock)
+            return sock
+        return _connect_tcp_nonblocking(address.target)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if blocking:
+        try:
+            sock.connect(address.target)
+        except socket.error:
+            sock.close()
+            raise
+    else:
+        sock.setblocking(False)
+        sock.connect_ex(address.target)
+    return sock
+
+
+def _connect_tcp_nonblocking(target):
+    """Starts connecting to the first address of the host that accepts
+
+    Every address the host resolves to is tried in turn, IPv6 included,
+    like socket.create_connection does for blocking connections.
+
+    :param target: host and port to connect to
+    :type target: (str, int)
+
+    :returns: connection that may still be in progress
+    :rtype: socket.socket
+
+    :raises: socket.error if no address of the host can be connected to
+    """
+
+    host, port = target
+    error = socket.error('{} resolves to no address'.format(host))
+    for family, kind, proto, _, sockaddr in socket.getaddrinfo(
+            host, port, type=socket.SOCK_STREAM):
+        sock = socket.socket(family, kind, proto)
+        tune(sock)
+        sock.setblocking(False)
+        code = sock.connect_ex(sockaddr)
+        if code in {0, errno.EINPROGRESS, errno.EWOULDBLOCK}:
+            return sock
+        sock.close()
+        error = socket.error(code, os.strerror(code))
+    raise error
+
+
+def listen(address, backlog=5):
+    """Listens for players at the address
+
+    A stale Unix domain socket left at the path is replaced.
+
+    :param address: where to listen
+    :type address: Address
+
+    :param backlog: (optional) connections to queue before refusing more
+    :type backlog: Natural+
+
+    :returns: listening socket
+    :rtype: socket.socket
+    """
+
+    if address.transport == UNIX:
+        if os.path.exists(address.target):
+            os.unlink(address.target)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    sock.bind(address.target)
+    sock.listen(backlog)
+    return sock
+
+
+def accept(listener):
+    """Accepts a player's connection, tuned like the player's end
+
+    :param listener: listening socket
+    :type listener: socket.socket
+
+    :returns: connection to the player
+    :rtype: socket.socket
+    """
+
+    conn, _ = listener.accept()
+    tune(conn)
+    return conn
+
+
+def pipe():
+    """Creates an in-memory connection for a dealer and a player
+
+    :returns: the dealer's end and the player's end
+    :rtype: (socket.socket, socket.socket)
+    """
+
+    return socket.socketpair()
+
+
+def tune(sock):
+    """Tunes a TCP socket for small request/response messages
+
+    Every message is written in one call and then waits for a reply, so
+    holding small segments back for coalescing only adds latency.
+
+    :param sock: socket to tune
+    :type sock: socket.socket
+    """
+
+    if sock.family in {socket.AF_INET, socket.AF_INET6}:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
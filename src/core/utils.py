@@ -157,7 +157,7 @@ def timeout(seconds, exception=TimeoutError):
     """Decorator raises the exception if execution takes longer than seconds
 
     :param seconds: number of seconds to wait for function execution
-    :type seconds: int
+    :type seconds: int or float
 
     :param exception: (optional) Exception to raise if function takes too long
     :type exception: Exception
@@ -171,9 +171,10 @@ def timeout(seconds, exception=TimeoutError):
             def handler(signum, frame):
                 raise exception
             signal.signal(signal.SIGALRM, handler)
-            signal.alarm(seconds)
-            ret = fn(*args, **kwargs)
-            signal.alarm(0)
-            return ret
+            signal.setitimer(signal.ITIMER_REAL, seconds)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
         return inner
     return wraps
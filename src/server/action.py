@@ -87,9 +87,8 @@ class ReplaceTrait(
 
     def apply(self, player):
         self._validate_action(player)
-        species = player.boards[self.species_index]
         trait = player.cards[self.card_index].trait
-        species.replace_trait(self.trait_index, trait)
+        player.replace_trait(self.species_index, self.trait_index, trait)
 
 
 class AddSpecies(
@@ -117,7 +116,7 @@ class AddSpecies(
     def apply(self, player):
         traits = lmap(lambda i: player.cards[i].trait, self.trait_card_indices)
         new_species = Species(food=0, body=0, population=1, traits=traits)
-        player.boards.append(new_species)
+        player.add_species(new_species)
 
     def cards_used(self):
         return set(self.trait_card_indices) | {self.card_index}
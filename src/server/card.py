@@ -1,4 +1,5 @@
 from evolution.core.card import BaseCard
+from evolution.core.codec import CARD_CODES, CARD_INDICES
 
 
 class Card(BaseCard):
@@ -8,3 +9,30 @@ class Card(BaseCard):
 
     def copy(self):
         return self.__class__(self.food, self.trait)
+
+    def snapshot(self):
+        """Captures the card as its index into CARD_CODES
+
+        :returns: code of the card
+        :rtype: Natural
+        """
+
+        return CARD_INDICES[self.food, self.trait]
+
+    @classmethod
+    def restore(cls, snapshot):
+        """The card captured in a snapshot
+
+        Cards are never mutated, so every restore of a code shares one card.
+
+        :param snapshot: snapshot created by Card.snapshot
+        :type snapshot: Natural
+
+        :returns: card with the captured food and trait
+        :rtype: Card
+        """
+
+        return CARDS_BY_CODE[snapshot]
+
+
+CARDS_BY_CODE = [Card(food, trait) for food, trait in CARD_CODES]
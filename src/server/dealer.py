@@ -5,21 +5,40 @@ from evolution.core.utils import split_at
 from evolution.core.trait import Trait
 from evolution.server.card import Card
 from evolution.server.exception import CheatingPlayerException
+from evolution.server.player import Player
+from evolution.server.zobrist import DECK, WATERING_HOLE
 
 
 class Dealer:
     """
     :attr players: all players in game, ordered by turn from left to right
+        - Seated through assigning players, handle_cheating_player and
+          _move_first_player_to_last, so the list must only change through
+          those.
     :type players: list of Player
 
     :attr watering_hole: number of tokens at the watering hole
     :type watering_hole: Natural
 
     :attr deck: cards yet to be played, ordered from top of deck to bottom
-    :type bag: list of Card
+        - The dealer keeps its own copy, stored bottom first so that cards
+          are dealt from the end of the list. Reading the deck returns a
+          new list; changing it means assigning a new deck.
+    :type deck: list of Card
 
     :attr current_feeding_index: index of the player whose turn it is to feed
     :type current_feeding_index: Natural
+
+    :attr turn: number of turns played so far
+    :type turn: Natural
+
+    :attr journal: (optional) record of the game's decisions
+    :type journal: Journal
+
+    :attr _state_hash: hash of the players, watering hole and deck
+        - Kept up to date by the players, which pass on their changes,
+          and by assigning the watering hole, deck or players.
+    :type _state_hash: Natural
     """
 
     MIN_WATERING_HOLE = 0
@@ -28,17 +47,21 @@ class Dealer:
     CARDS_PER_SPECIES = 1
     DEFAULT_CARDS_PER_PLAYER = 3
 
-    def __init__(self, players, watering_hole=0, deck=None):
+    def __init__(self, players, watering_hole=0, deck=None, journal=None):
+        self._state_hash = WATERING_HOLE[0]
+        self._players, self._watering_hole, self._deck = [], 0, []
         self.players = players
         self.watering_hole = watering_hole
         self.deck = deck or []
         self.current_feeding_index = 0
+        self.turn = 0
+        self.journal = journal
 
     def __eq__(self, other):
         return (isinstance(other, self.__class__) and
                 self.players == other.players and
                 self.watering_hole == other.watering_hole and
-                self.deck == other.deck)
+                self._deck == other._deck)
 
     def __repr__(self):
         return (
@@ -46,21 +69,121 @@ class Dealer:
             'watering_hole: {self.watering_hole}, deck: {self.deck}'
             .format(self=self))
 
+    @property
+    def players(self):
+        return self._players
+
+    @players.setter
+    def players(self, players):
+        for player in self._players:
+            self._state_hash ^= player._state_hash
+            player._dealer = None
+        for seat, player in enumerate(players):
+            player._reseat(seat)
+            player._dealer = self
+            self._state_hash ^= player._state_hash
+        self._players = players
+
+    @property
+    def watering_hole(self):
+        return self._watering_hole
+
+    @watering_hole.setter
+    def watering_hole(self, watering_hole):
+        self._state_hash ^= (WATERING_HOLE[self._watering_hole] ^
+                             WATERING_HOLE[watering_hole])
+        self._watering_hole = watering_hole
+
+    @property
+    def deck(self):
+        return self._deck[::-1]
+
+    @deck.setter
+    def deck(self, deck):
+        self._state_hash ^= self._deck_hash(self._deck)
+        self._deck = list(reversed(deck))
+        self._state_hash ^= self._deck_hash(self._deck)
+
+    def state_hash(self):
+        """Hash of the state the dealer compares in __eq__
+
+        Covers the players in order, the watering hole and the deck, but
+        not whose turn it is to feed.
+
+        :rtype: Natural
+        """
+
+        return self._state_hash
+
+    def snapshot(self):
+        """Captures the state of the game, leaving out the players' proxies
+
+        :returns: watering hole, current feeding index, turn, deck card
+                  snapshots, player snapshots
+        :rtype: (Natural, Natural, Natural, tuple of Natural, tuple of tuple)
+        """
+
+        return (
+            self.watering_hole,
+            self.current_feeding_index,
+            self.turn,
+            tuple(card.snapshot() for card in self.deck),
+            tuple(player.snapshot() for player in self.players))
+
+    @classmethod
+    def restore(cls, snapshot, proxies=None):
+        """Creates a dealer from its snapshot
+
+        :param snapshot: snapshot created by Dealer.snapshot
+        :type snapshot: tuple
+
+        :param proxies: (optional) proxy for each player, in snapshot order
+        :type proxies: list of BasePlayerProxy
+
+        :returns: new dealer in the captured state
+        :rtype: Dealer
+        """
+
+        watering_hole, current_feeding_index, turn, deck, players = snapshot
+        proxies = proxies or [None] * len(players)
+
+        dealer = cls(
+            [
+                Player.restore(player, proxy)
+                for player, proxy in zip(players, proxies)
+            ],
+            watering_hole,
+            [Card.restore(card) for card in deck])
+        dealer.current_feeding_index = current_feeding_index
+        dealer.turn = turn
+        return dealer
+
     def run_game(self):
         """Runs the simulation of Evolution"""
 
         self.deck = self._make_deck()
+        if self.journal:
+            self.journal.begin(self)
 
         while not self._is_game_over():
-            self.start_turn()
-            self.run_turn()
-            self.end_turn()
-            self._move_first_player_to_last()
+            self.play_turn()
         return self.final_scores()
 
+    def play_turn(self):
+        """Plays a single turn of Evolution"""
+
+        if self.journal:
+            self.journal.start_turn(self)
+
+        self.start_turn()
+        self.run_turn()
+        self.finish_turn()
+
     def start_turn(self):
         """Gives players species and cards at the beginning of the turn"""
 
+        cheating_players = []
+
         for player in self.players:
             if not player.boards:
                 player.add_empty_species()
@@ -68,16 +191,27 @@ class Dealer:
                 player,
                 self.DEFAULT_CARDS_PER_PLAYER + len(player.boards))
 
-            player.start(self.watering_hole)
+            try:
+                player.start(self.watering_hole)
+            except CheatingPlayerException:
+                cheating_players.append(player)
+
+        for player in cheating_players:
+            self.handle_cheating_player(player)
 
     def run_turn(self):
         """Runs the fourth step of Evolution"""
 
         self.handle_play_cards()
+        self.prepare_feeding()
+        self.handle_feeding()
+
+    def prepare_feeding(self):
+        """Applies the traits that act between card plays and feeding"""
+
         self.handle_fertile()
         self.handle_long_neck()
         self.handle_fat_tissue_transfer()
-        self.handle_feeding()
 
     def end_turn(self):
         """Handle end of turn actions"""
@@ -86,6 +220,13 @@ class Dealer:
             player.end_turn()
             self.remove_extinct(player)
 
+    def finish_turn(self):
+        """Ends the turn and lets the next player go first"""
+
+        self.end_turn()
+        self._move_first_player_to_last()
+        self.turn += 1
+
     def final_scores(self):
         """The final scores of the game.
 
@@ -100,32 +241,64 @@ class Dealer:
     def handle_play_cards(self):
         """Tells player to play cards to add food to watering hole."""
 
-        cheating_players = []
+        cheating_players = [
+            player for i, player in enumerate(self.players)
+            if not self.play_cards(i)
+        ]
 
-        for i, player in enumerate(self.players):
-            before, after = split_at(self.players, i, exclusive=True)
-            try:
+        for player in cheating_players:
+            self.handle_cheating_player(player)
 
-                self.watering_hole += player.play_cards(before, after)
-            except CheatingPlayerException:
-                cheating_players.append(player)
+    def play_cards(self, player_index):
+        """Has one player play cards, leaving a cheater in the game
+
+        Cheaters are only removed once every player has played, so that
+        the players before and after each player stay the same.
+
+        :param player_index: index of the player in self.players
+        :type player_index: Natural
+
+        :returns: whether the player played by the rules
+        :rtype: bool
+        """
+
+        player = self.players[player_index]
+        before, after = split_at(self.players, player_index, exclusive=True)
+        try:
+            self.watering_hole += player.play_cards(before, after)
+        except CheatingPlayerException:
+            return False
+        finally:
             self.watering_hole = max(
                 self.watering_hole, self.MIN_WATERING_HOLE)
-
-        for player in cheating_players:
-            self.handle_cheating_player(player)
+        return True
 
     def handle_feeding(self):
         """Runs the feeding step in the game"""
 
-        while self.watering_hole > 0 and self.boards_still_hungry():
-            try:
-                self.feed1()
-            except CheatingPlayerException:
-                cheater = self.players[self.current_feeding_index]
-                self.handle_cheating_player(cheater)
-            else:
-                self._increment_feeding_index()
+        while self.is_feeding():
+            self.feed_step()
+
+    def is_feeding(self):
+        """Is there food left that a species could still take?
+
+        :rtype: bool
+        """
+
+        return self.watering_hole > 0 and self.boards_still_hungry()
+
+    def feed_step(self):
+        """Lets the current player feed, removing it if it cheats"""
+
+        try:
+            self.feed1()
+        except CheatingPlayerException:
+            cheater = self.players[self.current_feeding_index]
+            self.handle_cheating_player(cheater)
+            if self.current_feeding_index >= len(self.players):
+                self.current_feeding_index = 0
+        else:
+            self._increment_feeding_index()
 
     def feed1(self):
         """Executes one step in the feeding cycle"""
@@ -136,14 +309,26 @@ class Dealer:
         feeding.execute(self, player, opponents)
 
     def remove_extinct(self, player):
-        """Remove all extinct species from the player"""
+        """Remove all extinct species from the player
+
+        :param player: player whose extinct species are removed
+        :type player: Player
 
-        num_extinct_boards = player.remove_extinct()
-        self.give_cards(player, num_extinct_boards * self.CARDS_PER_EXTINCTION)
+        :returns: new index of every species board by old index, None for
+                  the extinct boards
+        :rtype: list of (Natural or None)
+        """
+
+        remap = player.remove_extinct()
+        self.give_cards(player, remap.count(None) * self.CARDS_PER_EXTINCTION)
+        return remap
 
     def give_cards(self, player, num_cards):
         """Gives cards to the given player
 
+        Cards are dealt from the top of the deck, which is the end of the
+        dealer's bottom first list, so only the dealt cards are moved.
+
         :param player: player to add cards to
         :type player: Player
 
@@ -151,8 +336,11 @@ class Dealer:
         :type num_cards: Natural+
         """
 
-        player_cards, self.deck = split_at(self.deck, num_cards)
-        player.cards.extend(player_cards)
+        top = max(len(self._deck) - num_cards, 0)
+        dealt = self._deck[top:]
+        self._state_hash ^= self._deck_hash(dealt, top)
+        player.add_cards(dealt[::-1])
+        del self._deck[top:]
 
     def trigger_scavenger(self):
         """Handles the scavenger trait after each attack"""
@@ -186,6 +374,9 @@ class Dealer:
         """
         player.end_game()
         self.players.remove(player)
+        self._state_hash ^= player._state_hash
+        player._dealer = None
+        self._reseat_players()
 
     def boards_still_hungry(self):
         """Are there still hungry species in the game?
@@ -242,6 +433,35 @@ class Dealer:
 
         if self.players:
             self.players.append(self.players.pop(0))
+            self._reseat_players()
+
+    def _reseat_players(self):
+        """Rehashes the players whose seat changed
+
+        Effect: Modifies self._state_hash
+        """
+
+        for seat, player in enumerate(self.players):
+            if player._seat != seat:
+                player._reseat(seat)
+
+    @staticmethod
+    def _deck_hash(cards, cards_below=0):
+        """XOR of the keys of cards in the deck, from the bottom up
+
+        :param cards: cards ordered from bottom to top
+        :type cards: list of Card
+
+        :param cards_below: number of cards below the first one
+        :type cards_below: Natural
+
+        :rtype: Natural
+        """
+
+        deck_hash = 0
+        for below, card in enumerate(cards, cards_below):
+            deck_hash ^= DECK[below, card.food, card.trait.value]
+        return deck_hash
 
     def _current_opponents(self, player_index=None):
         """All players other than the current player
@@ -277,4 +497,4 @@ class Dealer:
             self.DEFAULT_CARDS_PER_PLAYER + len(player.boards)
             for player in self.players)
 
-        return len(self.deck) < num_cards_needed or not self.players
+        return len(self._deck) < num_cards_needed or not self.players
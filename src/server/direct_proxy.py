@@ -0,0 +1,79 @@
+from evolution.client import action as client_action, strategy
+from evolution.client.data import Opponent, PlayerView, view_boards
+from evolution.client.dealer_proxy import BaseDealerProxy
+from evolution.server import action, feeding
+from evolution.server.player_proxy import BasePlayerProxy
+
+
+class DirectPlayerProxy(BasePlayerProxy):
+    """Hands read-only views of the game straight to an in-process strategy
+
+    Nothing is serialized unless validation is requested, in which case the
+    strategy's choices are checked against the JSON spec as if they had
+    arrived over the wire.
+    """
+
+    SPECIES_ACTION_ORDER = ['AddSpecies', 'ReplaceTrait', 'AddPopulation',
+                            'AddBody']
+
+    def __init__(self, play_cards=None, feed_next=None, validate=False):
+        """
+        :attr play_cards: strategy picking card plays
+        :type play_cards: (PlayerView, list of Opponent, list of Opponent)
+                          -> dict of (type -> Action or list of Action)
+
+        :attr feed_next: strategy picking feedings
+        :type feed_next: (PlayerView, Natural+, list of Opponent) -> Feeding
+
+        :attr validate: whether to check the strategy's choices
+        :type validate: bool
+        """
+        self.play_cards = play_cards or strategy.play_cards
+        self.feed_next = feed_next or strategy.feedNext
+        self.validate = validate
+
+    def start(self, watering_hole, player):
+        # the strategy reads the player directly, so there is nothing to send
+        pass
+
+    def choose(self, player, before_opponents, after_opponents):
+        actions = self.play_cards(
+            PlayerView.of(player),
+            self._view_opponents(before_opponents),
+            self._view_opponents(after_opponents))
+
+        if self.validate:
+            return self._deserialize_action4(
+                BaseDealerProxy._serialize_actions(actions))
+
+        whb_action = action.AddToWateringHole(
+            *actions[client_action.AddToWateringHole])
+        species_actions = [
+            getattr(action, name)(*play)
+            for name in self.SPECIES_ACTION_ORDER
+            for play in actions.get(getattr(client_action, name), [])
+        ]
+        return whb_action, species_actions
+
+    def feedNext(self, player, watering_hole, opponents):
+        choice = self.feed_next(
+            PlayerView.of(player), watering_hole,
+            self._view_opponents(opponents))
+
+        if self.validate:
+            return self._deserialize_feeding(choice.to_json())
+        return getattr(feeding, type(choice).__name__)(*choice)
+
+    def end_game(self):
+        # nothing to do when ending the game for directly bound players
+        pass
+
+    @staticmethod
+    def _view_opponents(players):
+        """Creates read-only views of the players' boards
+
+        :returns: opponents viewing each player's boards
+        :rtype: list of Opponent
+        """
+
+        return [Opponent(view_boards(player.boards)) for player in players]
@@ -0,0 +1,362 @@
+from random import Random
+
+import numpy as np
+
+from evolution.core.trait import Trait
+from evolution.server.dealer import Dealer
+from evolution.server.direct_proxy import DirectPlayerProxy
+from evolution.server.feeding import (
+    CarnivoreFeeding, FatTissueFeeding, NoFeeding, VegetarianFeeding)
+from evolution.server.matchmaking import MAX_PLAYERS
+from evolution.server.player import Player
+from evolution.server.species import Species
+
+
+MAX_BOARDS = 10  # species boards of a player shown in an observation
+MAX_CARDS = 16  # cards of a hand shown in an observation
+MAX_OPPONENTS = MAX_PLAYERS - 1
+
+CHOOSE, FEED = 0, 1  # kinds of decision a game can wait for
+
+"""
+Every feeding a player could make, in the order of the feeding action
+space. Feedings of boards past MAX_BOARDS cannot be chosen.
+"""
+FEEDINGS = (
+    [NoFeeding()] +
+    [VegetarianFeeding(species_index) for species_index in range(MAX_BOARDS)] +
+    [FatTissueFeeding(species_index, tokens)
+     for species_index in range(MAX_BOARDS)
+     for tokens in range(1, Species.MAX_BODY + 1)] +
+    [CarnivoreFeeding(attacker_index, opponent_index, defender_index)
+     for attacker_index in range(MAX_BOARDS)
+     for opponent_index in range(MAX_OPPONENTS)
+     for defender_index in range(MAX_BOARDS)]
+)
+FEEDING_INDEX = {feeding: index for index, feeding in enumerate(FEEDINGS)}
+
+SPECIES_FIELDS = ['food', 'body', 'population', 'fat_food'] + [
+    'trait:' + trait.to_json() for trait in Trait]
+CARD_FIELDS = ['food'] + ['trait:' + trait.to_json() for trait in Trait]
+STATE_FIELDS = ['watering_hole', 'bag', 'deck', 'turn', 'players']
+
+"""
+An Observation is a dict of NumPy arrays with one row per game, seen by the
+player whose decision the game waits for:
+    - 'seat': (N,) seat of that player, fixed for the whole game
+    - 'phase': (N,) CHOOSE or FEED
+    - 'state': (N, len(STATE_FIELDS)) values of STATE_FIELDS
+    - 'boards': (N, 1 + MAX_OPPONENTS, MAX_BOARDS, len(SPECIES_FIELDS))
+      the player's boards, then the boards of every opponent in the order
+      a CarnivoreFeeding refers to them; traits are marked with 1
+    - 'cards': (N, MAX_CARDS, len(CARD_FIELDS)) the player's hand
+    - 'mask': (N, len(FEEDINGS)) legal feedings, all False when choosing
+Rows past the boards, cards or opponents that exist are zero.
+"""
+
+
+class SeatProxy(DirectPlayerProxy):
+    """Answers with the action the environment was given for the seat
+
+    Without an action the seat falls back to the default strategy.
+    """
+
+    def __init__(self):
+        """
+        :attr action: action for the next decision of the seat
+        :type action: Action4, Feeding or None
+        """
+
+        super().__init__()
+        self.action = None
+
+    def choose(self, player, before_opponents, after_opponents):
+        if self.action is None:
+            return super().choose(player, before_opponents, after_opponents)
+        return self._deserialize_action4(self.action)
+
+    def feedNext(self, player, watering_hole, opponents):
+        if self.action is None:
+            return super().feedNext(player, watering_hole, opponents)
+        return self.action
+
+
+class SelfPlayGame:
+    """A game played one decision at a time
+
+    The game runs the dealer's turn steps itself and only stops at card
+    plays and at feedings with more than one choice. Forced feedings are
+    made on the way, as the dealer would make them.
+    """
+
+    def __init__(self, num_players, rng):
+        """
+        :attr num_players: players seated at the start of every game
+        :type num_players: Natural+, at most MAX_PLAYERS
+
+        :attr rng: source of randomness for shuffling the deck
+        :type rng: random.Random
+
+        :attr seats: players by seat, including those removed for cheating
+        :type seats: list of Player
+
+        :attr dealer: dealer of the game being played
+        :type dealer: Dealer
+
+        :attr phase: kind of decision the game waits for
+        :type phase: CHOOSE or FEED
+
+        :attr done: whether the game is over
+        :type done: bool
+
+        :raises: ValueError if num_players is not between 1 and MAX_PLAYERS
+        """
+
+        if not 1 <= num_players <= MAX_PLAYERS:
+            raise ValueError(
+                'a game needs 1 to {} players'.format(MAX_PLAYERS))
+
+        self.num_players = num_players
+        self.rng = rng
+        self.seats = []
+        self.dealer = None
+        self.phase = CHOOSE
+        self.done = True
+        self._chooser = 0
+        self._cheaters = []
+
+    def reset(self):
+        """Deals a new game and plays up to its first decision"""
+
+        self.seats = [Player(id=seat, proxy=SeatProxy())
+                      for seat in range(self.num_players)]
+        deck = Dealer._make_deck()
+        self.rng.shuffle(deck)
+        self.dealer = Dealer(players=list(self.seats), deck=deck)
+        self.done = False
+        self._start_turn()
+        self._advance()
+
+    def step(self, action):
+        """Makes the decision the game waits for and plays up to the next
+
+        A decision that breaks the rules removes its player from the game,
+        as it would a cheating remote player.
+
+        :param action: card plays, index of a feeding in FEEDINGS, or None
+                       for the default strategy's choice
+        :type action: Action4, Natural or None
+        """
+
+        player = self._player()
+        if action is not None and self.phase == FEED:
+            action = FEEDINGS[action]
+        player.proxy.action = action
+        try:
+            if self.phase == CHOOSE:
+                if not self.dealer.play_cards(self._chooser):
+                    self._cheaters.append(player)
+                self._chooser += 1
+            else:
+                self.dealer.feed_step()
+        finally:
+            player.proxy.action = None
+        self._advance()
+
+    def scores(self):
+        """Current score of every seat
+
+        :rtype: list of Natural
+        """
+
+        return [player.score() for player in self.seats]
+
+    def observe(self, observation, row):
+        """Writes what the deciding player sees into a row of the arrays
+
+        :param observation: arrays to write into, zero in the row
+        :type observation: Observation
+
+        :param row: row of the game in the arrays
+        :type row: Natural
+        """
+
+        dealer = self.dealer
+        index = self._index()
+        player = dealer.players[index]
+        opponents = dealer.players[:index] + dealer.players[index+1:]
+
+        observation['seat'][row] = player._id
+        observation['phase'][row] = self.phase
+        observation['state'][row] = [
+            dealer.watering_hole, player.bag, len(dealer.deck), dealer.turn,
+            len(dealer.players)]
+
+        boards = observation['boards'][row]
+        for position, each in enumerate([player] + opponents):
+            for species_index, species in enumerate(
+                    each.boards[:MAX_BOARDS]):
+                features = boards[position, species_index]
+                features[:4] = [species.food, species.body,
+                                species.population, species.fat_food]
+                for trait in species.traits:
+                    features[3 + trait.value] = 1
+
+        cards = observation['cards'][row]
+        for card_index, card in enumerate(player.cards[:MAX_CARDS]):
+            cards[card_index, 0] = card.food
+            cards[card_index, card.trait.value] = 1
+
+        if self.phase == FEED:
+            mask = observation['mask'][row]
+            mask[0] = True
+            for feeding in player.get_feeding_choices(
+                    dealer.watering_hole, opponents):
+                if feeding in FEEDING_INDEX:
+                    mask[FEEDING_INDEX[feeding]] = True
+
+    def _start_turn(self):
+        """Starts the next turn, or ends the game"""
+
+        if self.dealer._is_game_over():
+            self.done = True
+            return
+
+        self.dealer.start_turn()
+        self.phase = CHOOSE
+        self._chooser = 0
+        self._cheaters = []
+
+    def _advance(self):
+        """Plays on until a player has a decision to make"""
+
+        dealer = self.dealer
+        while not self.done:
+            if self.phase == CHOOSE:
+                if self._chooser < len(dealer.players):
+                    return
+                for player in self._cheaters:
+                    dealer.handle_cheating_player(player)
+                dealer.prepare_feeding()
+                self.phase = FEED
+
+            while dealer.is_feeding():
+                player = dealer.players[dealer.current_feeding_index]
+                choices = player.get_feeding_choices(
+                    dealer.watering_hole, dealer._current_opponents())
+                if len(choices) > 1:
+                    return
+                dealer.feed_step()
+
+            dealer.finish_turn()
+            self._start_turn()
+
+    def _index(self):
+        """Index in the dealer's players of the player deciding
+
+        :rtype: Natural
+        """
+
+        if self.phase == CHOOSE:
+            return self._chooser
+        return self.dealer.current_feeding_index
+
+    def _player(self):
+        """
+        :returns: player deciding
+        :rtype: Player
+        """
+
+        return self.dealer.players[self._index()]
+
+
+class SelfPlayEnv:
+    """Steps a batch of independent games in one call, for training bots
+
+    Every player of every game is controlled through step; each game waits
+    for one decision at a time, either a card play or a feeding with a
+    choice to make. A finished game is dealt again right away, and its
+    final scores are reported in the step that ended it.
+    """
+
+    def __init__(self, num_envs, num_players, seed=None):
+        """
+        :attr games: the games stepped together
+        :type games: list of SelfPlayGame
+
+        :raises: ValueError if num_players is not between 1 and MAX_PLAYERS
+        """
+
+        if not 1 <= num_players <= MAX_PLAYERS:
+            raise ValueError(
+                'a game needs 1 to {} players'.format(MAX_PLAYERS))
+
+        rng = Random(seed)
+        self.games = [SelfPlayGame(num_players, Random(rng.random()))
+                      for _ in range(num_envs)]
+        self._scores = None
+
+    def reset(self):
+        """Deals a new game in every slot
+
+        :rtype: Observation
+        """
+
+        for game in self.games:
+            game.reset()
+        self._scores = np.array([game.scores() for game in self.games])
+        return self._observe()
+
+    def step(self, actions):
+        """Makes the decision every game waits for
+
+        :param actions: decision for every game, see SelfPlayGame.step
+        :type actions: list of (Action4, Natural or None)
+
+        :returns: what the deciding players see next, the score every seat
+                  gained, whether each game ended, and the final scores of
+                  the games that ended
+        :rtype: (Observation, numpy.ndarray, numpy.ndarray, list of dict)
+
+        :raises: ValueError if there is not one action for every game
+        """
+
+        if len(actions) != len(self.games):
+            raise ValueError('step needs one action for every game')
+
+        rewards = np.empty_like(self._scores)
+        dones = np.zeros(len(self.games), dtype=bool)
+        infos = [{} for _ in self.games]
+        for row, (game, action) in enumerate(zip(self.games, actions)):
+            game.step(action)
+            scores = game.scores()
+            rewards[row] = np.subtract(scores, self._scores[row])
+            if game.done:
+                dones[row] = True
+                infos[row]['final_scores'] = scores
+                game.reset()
+                scores = game.scores()
+            self._scores[row] = scores
+
+        return self._observe(), rewards, dones, infos
+
+    def _observe(self):
+        """
+        :rtype: Observation
+        """
+
+        num_envs = len(self.games)
+        observation = {
+            'seat': np.zeros(num_envs, dtype=np.int8),
+            'phase': np.zeros(num_envs, dtype=np.int8),
+            'state': np.zeros((num_envs, len(STATE_FIELDS)), dtype=np.int16),
+            'boards': np.zeros(
+                (num_envs, 1 + MAX_OPPONENTS, MAX_BOARDS,
+                 len(SPECIES_FIELDS)), dtype=np.int8),
+            'cards': np.zeros((num_envs, MAX_CARDS, len(CARD_FIELDS)),
+                              dtype=np.int8),
+            'mask': np.zeros((num_envs, len(FEEDINGS)), dtype=bool)
+        }
+        for row, game in enumerate(self.games):
+            game.observe(observation, row)
+        return observation
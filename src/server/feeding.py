@@ -62,16 +62,12 @@ class CarnivoreFeeding(
         attacker_index, opponent_index, defender_index = self
         opponent = opponents[opponent_index]
 
-        def reduce_population(player, species_index):
-            new_population = player.reduce_population(species_index)
-            dealer.remove_extinct(player)
-            return new_population
-
         has_horns = opponent.species_has_trait(defender_index, Trait.horns)
-        reduce_population(opponent, defender_index)
-        if has_horns:
-            if reduce_population(player, attacker_index) == 0:
-                return
+        if opponent.reduce_population(defender_index) == 0:
+            dealer.remove_extinct(opponent)
+        if has_horns and player.reduce_population(attacker_index) == 0:
+            dealer.remove_extinct(player)
+            return
 
         if player.try_feed(attacker_index, dealer):
             dealer.trigger_scavenger()
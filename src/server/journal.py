@@ -0,0 +1,327 @@
+from collections import deque
+import json
+import socket
+
+from evolution.server import action, feeding
+from evolution.server.dealer import Dealer
+
+
+"""
+A JournalEntry is one of:
+    - ["snapshot", Natural, JDealerState]
+    - ["start", Natural, JOutcome]
+    - ["choose", Natural, JOutcome]
+    - ["feedNext", Natural, JOutcome]
+Interpretation:
+    - A "snapshot" records the state of the game at the start of the given
+      turn.
+    - Every other entry records what the player in the given seat answered
+      when the dealer asked it to start, choose or feedNext. A seat is the
+      position of the player in the dealer's players when the game began.
+
+A JOutcome is one of:
+    - ["ok", JResponse]
+    - ["error", ErrorKind]
+Interpretation:
+    - JResponse is null for "start", [Natural, list of JRecord] holding the
+      watering hole card index and species actions for "choose", and a
+      JRecord for "feedNext".
+    - ErrorKind is one of "timeout", "disconnect", "invalid" and stands for
+      the TimeoutError, socket.error or ValueError the proxy raised.
+
+A JRecord is [name of the Action or Feeding type, field, ...].
+
+A JDealerState is [JSON, list of Natural] holding a Dealer.snapshot and the
+seat of each player in the snapshot, in turn order.
+"""
+
+RECORD_TYPES = {
+    record_type.__name__: record_type
+    for record_type in [
+        action.AddToWateringHole, action.ReplaceTrait, action.AddSpecies,
+        action.AddPopulation, action.AddBody, feeding.FatTissueFeeding,
+        feeding.VegetarianFeeding, feeding.CarnivoreFeeding,
+        feeding.NoFeeding
+    ]
+}
+
+ERROR_KINDS = [
+    ('timeout', TimeoutError),
+    ('disconnect', socket.error),
+    ('invalid', ValueError)
+]
+
+DEFAULT_SNAPSHOT_INTERVAL = 10  # turns between snapshots
+
+
+class Journal:
+    """
+    :attr entries: every entry recorded so far, oldest first
+    :type entries: list of JournalEntry
+
+    :attr stream: (optional) file the entries are appended to as JSON lines
+    :type stream: file
+
+    :attr snapshot_interval: number of turns between snapshots
+    :type snapshot_interval: Natural+
+
+    :attr seats: seat of each player in the game, keyed by id(player)
+    :type seats: dict of int -> Natural
+    """
+
+    def __init__(self, stream=None,
+                 snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+        self.entries = []
+        self.stream = stream
+        self.snapshot_interval = snapshot_interval
+        self.seats = {}
+
+    @classmethod
+    def load(cls, stream):
+        """Reads a journal written as JSON lines
+
+        :param stream: file holding one JournalEntry per line
+        :type stream: file
+
+        :returns: journal holding the entries
+        :rtype: Journal
+        """
+
+        journal = cls()
+        journal.entries = [json.loads(line) for line in stream if line.strip()]
+        return journal
+
+    def begin(self, dealer):
+        """Starts journaling the responses of the dealer's players
+
+        :param dealer: dealer of the game to journal
+        :type dealer: Dealer
+
+        :effect: wraps the proxy of every player in a JournalingProxy
+        """
+
+        for seat, player in enumerate(dealer.players):
+            self.seats[id(player)] = seat
+            player.proxy = JournalingProxy(player.proxy, self, seat)
+
+    def start_turn(self, dealer):
+        """Snapshots the game if the dealer is at a snapshot turn
+
+        :param dealer: dealer of the journaled game
+        :type dealer: Dealer
+        """
+
+        if dealer.turn % self.snapshot_interval == 0:
+            self.record(['snapshot', dealer.turn, self._snapshot(dealer)])
+
+    def record(self, entry):
+        """Appends an entry to the journal
+
+        :param entry: entry to append
+        :type entry: JournalEntry
+        """
+
+        self.entries.append(entry)
+        if self.stream:
+            self.stream.write(json.dumps(entry, separators=(',', ':')))
+            self.stream.write('\n')
+
+    def replay(self, turn=None):
+        """Rebuilds the game at the start of the given turn
+
+        Only the journal is consulted; no player is contacted.
+
+        :param turn: (optional) turn to stop at, the end of the game if None
+        :type turn: Natural
+
+        :returns: dealer holding the state of the game at the given turn
+        :rtype: Dealer
+
+        :raises: ValueError if the journal has no snapshot before the turn
+        """
+
+        snapshots = [
+            (i, entry) for i, entry in enumerate(self.entries)
+            if entry[0] == 'snapshot' and (turn is None or entry[1] <= turn)
+        ]
+        if not snapshots:
+            raise ValueError('no snapshot to replay the game from')
+        position, [_, _, state] = snapshots[-1]
+
+        dealer = self._restore(state, self.entries[position+1:])
+
+        while not (dealer._is_game_over() or dealer.turn == turn):
+            dealer.play_turn()
+        return dealer
+
+    def _snapshot(self, dealer):
+        """Creates a JSON representation of the state of the game
+
+        :returns: state of the game
+        :rtype: JDealerState
+        """
+
+        return [
+            dealer.snapshot(),
+            [self.seats[id(player)] for player in dealer.players]
+        ]
+
+    @staticmethod
+    def _restore(state, entries):
+        """Creates a dealer from a snapshot, answering from the entries
+
+        :param state: state of the game
+        :type state: JDealerState
+
+        :param entries: entries recorded after the snapshot
+        :type entries: list of JournalEntry
+
+        :returns: dealer with the game state and replaying players
+        :rtype: Dealer
+        """
+
+        snapshot, seats = state
+
+        proxies = [
+            ReplayProxy(deque(
+                (entry[0], entry[2]) for entry in entries
+                if entry[0] != 'snapshot' and entry[1] == seat))
+            for seat in seats
+        ]
+        return Dealer.restore(snapshot, proxies)
+
+
+class JournalingProxy:
+    """Records the responses of the proxy it wraps in a journal"""
+
+    def __init__(self, proxy, journal, seat):
+        """
+        :attr proxy: proxy of the player being journaled
+        :type proxy: BasePlayerProxy
+
+        :attr journal: journal to record the responses in
+        :type journal: Journal
+
+        :attr seat: seat of the player being journaled
+        :type seat: Natural
+        """
+
+        self.proxy = proxy
+        self.journal = journal
+        self.seat = seat
+
+    def start(self, watering_hole, player):
+        self._record('start', lambda _: None, self.proxy.start,
+                     watering_hole, player)
+
+    def choose(self, player, before_opponents, after_opponents):
+        return self._record(
+            'choose',
+            lambda actions: [
+                actions[0].card_index, [_to_record(a) for a in actions[1]]
+            ],
+            self.proxy.choose, player, before_opponents, after_opponents)
+
+    def feedNext(self, player, watering_hole, opponents):
+        return self._record('feedNext', _to_record, self.proxy.feedNext,
+                            player, watering_hole, opponents)
+
+    def end_game(self):
+        self.proxy.end_game()
+
+    def _record(self, kind, to_json, fn, *args):
+        """Calls fn and records its outcome
+
+        :param kind: name of the request made to the player
+        :type kind: str
+
+        :param to_json: converts the result of fn to a JResponse
+        :type to_json: Any -> JSON
+
+        :returns: result of calling fn with args
+        :rtype: Any
+        """
+
+        try:
+            result = fn(*args)
+        except Exception as error:
+            for error_kind, error_type in ERROR_KINDS:
+                if isinstance(error, error_type):
+                    self.journal.record(
+                        [kind, self.seat, ['error', error_kind]])
+                    break
+            raise
+
+        self.journal.record([kind, self.seat, ['ok', to_json(result)]])
+        return result
+
+
+class ReplayProxy:
+    """Answers the dealer with the outcomes recorded in a journal"""
+
+    def __init__(self, outcomes):
+        """
+        :attr outcomes: recorded (request name, JOutcome) pairs, oldest first
+        :type outcomes: deque of (str, JOutcome)
+        """
+
+        self.outcomes = outcomes
+
+    def start(self, watering_hole, player):
+        self._next('start')
+
+    def choose(self, player, before_opponents, after_opponents):
+        whb_card_index, jactions = self._next('choose')
+        return (
+            action.AddToWateringHole(whb_card_index),
+            [_from_record(jaction) for jaction in jactions])
+
+    def feedNext(self, player, watering_hole, opponents):
+        return _from_record(self._next('feedNext'))
+
+    def end_game(self):
+        pass
+
+    def _next(self, kind):
+        """Pops the next recorded outcome, raising it if it was an error
+
+        :param kind: name of the request being made
+        :type kind: str
+
+        :returns: recorded response
+        :rtype: JResponse
+
+        :raises: ValueError if the journal does not match the replay
+        """
+
+        if not self.outcomes:
+            raise ValueError('journal has no {} outcome left'.format(kind))
+
+        recorded_kind, [status, response] = self.outcomes.popleft()
+        if recorded_kind != kind:
+            raise ValueError('journal recorded {} but replay requested {}'
+                             .format(recorded_kind, kind))
+
+        if status == 'error':
+            raise dict(ERROR_KINDS)[response]
+        return response
+
+
+def _to_record(result):
+    """Converts an Action or Feeding into a JRecord
+
+    :rtype: JRecord
+    """
+
+    return [type(result).__name__] + list(result)
+
+
+def _from_record(jrecord):
+    """Converts a JRecord into the Action or Feeding it represents
+
+    :rtype: Action or Feeding
+    """
+
+    name, *fields = jrecord
+    return RECORD_TYPES[name](*fields)
+
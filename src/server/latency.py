@@ -0,0 +1,169 @@
+from collections import Counter
+import time
+
+from evolution.core.connection import MessageRejected
+from evolution.core.utils import timeout
+
+
+SOFT_BUDGET_SECONDS = 1  # responses slower than this mark the player as slow
+HARD_BUDGET_SECONDS = 2  # responses slower than this are treated as cheating
+
+
+class LatencyHistogram:
+    """
+    :attr samples: response times recorded for a single message type
+    :type samples: list of float
+    """
+
+    def __init__(self):
+        self.samples = []
+
+    def record(self, seconds):
+        """Adds a response time to the histogram
+
+        :param seconds: time the player took to respond
+        :type seconds: float
+        """
+
+        self.samples.append(seconds)
+
+    def percentile(self, percent):
+        """The nearest-rank percentile of the recorded samples
+
+        :param percent: percentile to compute
+        :type percent: Natural in [0, 100]
+
+        :returns: response time at the given percentile, 0 if there are none
+        :rtype: float
+        """
+
+        if not self.samples:
+            return 0
+
+        ordered = sorted(self.samples)
+        rank = max(0, -(-percent * len(ordered) // 100) - 1)
+        return ordered[rank]
+
+    def summary(self):
+        """Summarizes the recorded response times
+
+        :returns: sample count with the p50, p95 and max response time
+        :rtype: dict
+        """
+
+        return {
+            'count': len(self.samples),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'max': max(self.samples, default=0)
+        }
+
+
+class LatencyTracker:
+    """
+    :attr soft_budget: seconds after which a response is counted as slow
+    :type soft_budget: int or float
+
+    :attr hard_budget: seconds after which a response times out
+    :type hard_budget: int or float
+
+    :attr histograms: response times per message type
+    :type histograms: dict of str -> LatencyHistogram
+
+    :attr soft_budget_exceeded: slow responses per message type
+    :type soft_budget_exceeded: Counter of str
+
+    :attr hard_budget_exceeded: timed out responses per message type
+    :type hard_budget_exceeded: Counter of str
+
+    :attr rejected: responses refused for their size or form, per message
+                    type and reason
+    :type rejected: Counter of (str, str)
+    """
+
+    def __init__(self, soft_budget=SOFT_BUDGET_SECONDS,
+                 hard_budget=HARD_BUDGET_SECONDS):
+        if soft_budget > hard_budget:
+            raise ValueError('soft budget cannot exceed the hard budget')
+
+        self.soft_budget = soft_budget
+        self.hard_budget = hard_budget
+        self.histograms = {}
+        self.soft_budget_exceeded = Counter()
+        self.hard_budget_exceeded = Counter()
+        self.rejected = Counter()
+
+    def measure(self, msg_type, fn, *args):
+        """Calls fn within the hard budget and records how long it took
+
+        :param msg_type: name of the message being exchanged
+        :type msg_type: str
+
+        :param fn: function that exchanges the message with the player
+        :type fn: Any -> Any
+
+        :returns: the result of calling fn with args
+        :rtype: Any
+
+        :raises: TimeoutError if fn takes longer than the hard budget
+        :raises: MessageRejected if fn refuses the player's response
+        """
+
+        begin = time.perf_counter()
+        try:
+            return timeout(self.hard_budget)(fn)(*args)
+        except TimeoutError:
+            self.hard_budget_exceeded[msg_type] += 1
+            raise
+        except MessageRejected as error:
+            self.rejected[msg_type, error.reason] += 1
+            raise
+        finally:
+            self.record(msg_type, time.perf_counter() - begin)
+
+    def record(self, msg_type, seconds):
+        """Records a response time for the given message type
+
+        :param msg_type: name of the message being exchanged
+        :type msg_type: str
+
+        :param seconds: time the player took to respond
+        :type seconds: float
+        """
+
+        if msg_type not in self.histograms:
+            self.histograms[msg_type] = LatencyHistogram()
+        self.histograms[msg_type].record(seconds)
+
+        if seconds > self.soft_budget:
+            self.soft_budget_exceeded[msg_type] += 1
+
+    def is_slow(self):
+        """Has the player ever exceeded its soft budget?
+
+        :returns: whether any response exceeded the soft budget
+        :rtype: bool
+        """
+
+        return sum(self.soft_budget_exceeded.values()) > 0
+
+    def summary(self):
+        """Summarizes the player's response times for export
+
+        :returns: per message type histograms and budget violations
+        :rtype: dict
+        """
+
+        return {
+            'messages': {
+                msg_type: histogram.summary()
+                for msg_type, histogram in self.histograms.items()
+            },
+            'soft_budget_exceeded': dict(self.soft_budget_exceeded),
+            'hard_budget_exceeded': dict(self.hard_budget_exceeded),
+            'rejected': {
+                '{} {}'.format(msg_type, reason): count
+                for (msg_type, reason), count in self.rejected.items()
+            },
+            'slow': self.is_slow()
+        }
@@ -0,0 +1,212 @@
+from collections import Counter
+import selectors
+import time
+
+from evolution.core import transport
+from evolution.core.connection import MessageDecoder, MessageRejected
+from evolution.server.player_proxy import RemotePlayerProxy
+
+
+SIGNUP_SECONDS = 5  # seconds the lobby stays open for sign ups
+HANDSHAKE_SECONDS = 1  # seconds a connection has to send its sign up
+MAX_PLAYERS = 8
+RECV_SIZE = 4096  # bytes read from a connection at a time
+MAX_SIGNUP_BYTES = 4096  # longest sign up message accepted
+
+
+class Handshake:
+    """A connection that has not sent its sign up yet"""
+
+    def __init__(self, sock, deadline):
+        """
+        :attr sock: non-blocking connection to the external player
+        :type sock: socket.socket
+
+        :attr deadline: time by which the sign up has to arrive
+        :type deadline: float
+
+        :attr decoder: splits the bytes received into messages
+        :type decoder: MessageDecoder
+        """
+
+        self.sock = sock
+        self.deadline = deadline
+        self.decoder = MessageDecoder(MAX_SIGNUP_BYTES)
+
+
+class Lobby:
+    """Signs up external players over many connections at once
+
+    A connection that is slow to send its sign up only ever holds up
+    itself, and is dropped once its handshake deadline passes.
+    """
+
+    def __init__(self, listener, max_players=MAX_PLAYERS,
+                 signup_seconds=SIGNUP_SECONDS,
+                 handshake_seconds=HANDSHAKE_SECONDS,
+                 from_signup=RemotePlayerProxy.from_signup):
+        """
+        :attr listener: socket external players connect to
+        :type listener: socket.socket
+
+        :attr max_players: sign ups that close the lobby early
+        :type max_players: Natural+
+
+        :attr signup_seconds: seconds the lobby stays open
+        :type signup_seconds: int or float
+
+        :attr handshake_seconds: seconds a connection has to sign up
+        :type handshake_seconds: int or float
+
+        :attr from_signup: accepts a sign up, returning the player's name
+                           and proxy
+        :type from_signup: (socket.socket, SignUp) -> (JSON, PlayerProxy)
+
+        :attr rejected: dropped connections per reason ('timeout',
+                        'closed', 'invalid', and 'oversized' or 'malformed'
+                        for sign ups refused before they were complete)
+        :type rejected: Counter of str
+        """
+
+        self.listener = listener
+        self.max_players = max_players
+        self.signup_seconds = signup_seconds
+        self.handshake_seconds = handshake_seconds
+        self.from_signup = from_signup
+        self.rejected = Counter()
+
+        self._signups = []
+        self._handshakes = {}
+
+    def run(self):
+        """Signs up players until the lobby is full or its time is up
+
+        Connections still in their handshake when the lobby closes are
+        dropped.
+
+        :returns: names and proxies of the players in sign up order
+        :rtype: list of (JSON, PlayerProxy)
+        """
+
+        closes_at = time.monotonic() + self.signup_seconds
+        self.listener.setblocking(False)
+        selector = selectors.DefaultSelector()
+        selector.register(self.listener, selectors.EVENT_READ)
+
+        try:
+            while len(self._signups) < self.max_players:
+                now = time.monotonic()
+                if now >= closes_at:
+                    break
+
+                wake_at = min([closes_at] + [handshake.deadline for handshake
+                                             in self._handshakes.values()])
+                for key, _ in selector.select(wake_at - now):
+                    if key.fileobj is self.listener:
+                        self._accept(selector)
+                    else:
+                        self._receive(selector, key.data)
+                    if len(self._signups) == self.max_players:
+                        break
+
+                self._expire(selector, time.monotonic())
+        finally:
+            for handshake in list(self._handshakes.values()):
+                self._drop(selector, handshake, 'timeout')
+            selector.unregister(self.listener)
+            selector.close()
+
+        return self._signups
+
+    def _accept(self, selector):
+        """Accepts every connection waiting on the listener
+
+        :param selector: selector watching the lobby's sockets
+        :type selector: selectors.BaseSelector
+        """
+
+        while True:
+            try:
+                sock = transport.accept(self.listener)
+            except (BlockingIOError, InterruptedError):
+                return
+
+            sock.setblocking(False)
+            handshake = Handshake(
+                sock, time.monotonic() + self.handshake_seconds)
+            self._handshakes[sock] = handshake
+            selector.register(sock, selectors.EVENT_READ, handshake)
+
+    def _receive(self, selector, handshake):
+        """Reads from a connection, signing it up once its message is in
+
+        :param selector: selector watching the lobby's sockets
+        :type selector: selectors.BaseSelector
+
+        :param handshake: connection that is readable
+        :type handshake: Handshake
+        """
+
+        try:
+            data = handshake.sock.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+
+        if not data:
+            self._drop(selector, handshake, 'closed')
+            return
+
+        try:
+            msgs = handshake.decoder.feed(data)
+        except MessageRejected as error:
+            self._drop(selector, handshake, error.reason)
+            return
+        except ValueError:
+            self._drop(selector, handshake, 'invalid')
+            return
+
+        if not msgs:
+            return
+
+        selector.unregister(handshake.sock)
+        del self._handshakes[handshake.sock]
+        handshake.sock.setblocking(True)
+        try:
+            self._signups.append(self.from_signup(handshake.sock, msgs[0]))
+        except OSError:
+            handshake.sock.close()
+            self.rejected['closed'] += 1
+
+    def _expire(self, selector, now):
+        """Drops connections whose handshake deadline has passed
+
+        :param selector: selector watching the lobby's sockets
+        :type selector: selectors.BaseSelector
+
+        :param now: current time
+        :type now: float
+        """
+
+        for handshake in list(self._handshakes.values()):
+            if handshake.deadline <= now:
+                self._drop(selector, handshake, 'timeout')
+
+    def _drop(self, selector, handshake, reason):
+        """Closes a connection that did not sign up
+
+        :param selector: selector watching the lobby's sockets
+        :type selector: selectors.BaseSelector
+
+        :param handshake: connection to close
+        :type handshake: Handshake
+
+        :param reason: why the connection was dropped
+        :type reason: str
+        """
+
+        selector.unregister(handshake.sock)
+        del self._handshakes[handshake.sock]
+        handshake.sock.close()
+        self.rejected[reason] += 1
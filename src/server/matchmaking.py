@@ -0,0 +1,539 @@
+from collections import OrderedDict, namedtuple
+import heapq
+from itertools import count, islice
+import json
+from operator import attrgetter
+import os
+import selectors
+import time
+
+from evolution.server.dealer import Dealer
+from evolution.server.lobby import HANDSHAKE_SECONDS, Handshake, Lobby
+from evolution.server.player import Player
+from evolution.server.player_proxy import RemotePlayerProxy
+
+
+DEFAULT_RATING = 1500
+K_FACTOR = 32  # most rating points a player can win or lose in one game
+MIN_PLAYERS = 3
+MAX_PLAYERS = 8
+BUCKET_WIDTH = 100  # rating points covered by each bucket of the queue
+RATING_WINDOW = 100  # rating points a lobby spans either side of its anchor
+RATING_WINDOW_GROWTH = 50  # rating points the window widens per second
+FILL_SECONDS = 2  # seconds to hold out for a full lobby
+POLL_SECONDS = 0.25  # seconds between lobby checks while players wait
+ANONYMOUS_NAME = 'hello'  # signed up with by players that give no name
+
+
+class RatingBook:
+    """Elo ratings of players by name, optionally persisted as JSON"""
+
+    def __init__(self, path=None, k_factor=K_FACTOR):
+        """
+        :attr path: JSON file the ratings are loaded from and saved to
+        :type path: str or None
+
+        :attr k_factor: most rating points won or lost in one game
+        :type k_factor: int or float
+
+        :attr ratings: rating of every player that finished a game
+        :type ratings: dict of str -> float
+        """
+
+        self.path = path
+        self.k_factor = k_factor
+        self.ratings = {}
+        if path and os.path.exists(path):
+            with open(path) as stream:
+                self.ratings = json.load(stream)
+
+    def rating(self, name):
+        """The rating of the player with the given name
+
+        :param name: name the player signed up with
+        :type name: JSON
+
+        :rtype: float
+        """
+
+        return self.ratings.get(self._key(name), DEFAULT_RATING)
+
+    def record_game(self, names, scores):
+        """Updates ratings from the outcome of a game
+
+        Every pair of players in the game counts as a match won by the
+        player with the higher score, so each player's change is the
+        average of their Elo updates against everyone else.
+
+        :param names: names of the players in the game
+        :type names: list of JSON
+
+        :param scores: score of each player, None if removed from the game
+        :type scores: list of (Natural or None)
+        """
+
+        before = [self.rating(name) for name in names]
+        ranks = [-1 if score is None else score for score in scores]
+        opponents = len(names) - 1
+
+        for i, name in enumerate(names):
+            change = 0
+            for j in range(len(names)):
+                if i != j:
+                    expected = 1 / (1 + 10 ** ((before[j] - before[i]) / 400))
+                    actual = ((ranks[i] > ranks[j]) +
+                              0.5 * (ranks[i] == ranks[j]))
+                    change += actual - expected
+            self.ratings[self._key(name)] = (
+                self.rating(name) + self.k_factor * change / opponents)
+
+    def forget(self, name):
+        """Drops the rating of a player who can never be matched again
+
+        :param name: name the player was rated under
+        :type name: JSON
+        """
+
+        self.ratings.pop(self._key(name), None)
+
+    def save(self):
+        """Writes the ratings to the book's path, replacing it atomically"""
+
+        if not self.path:
+            return
+
+        partial_path = self.path + '.tmp'
+        with open(partial_path, 'w') as stream:
+            json.dump(self.ratings, stream, sort_keys=True)
+        os.replace(partial_path, self.path)
+
+    @staticmethod
+    def _key(name):
+        """JSON object key for a player name"""
+
+        if isinstance(name, str):
+            return name
+        return json.dumps(name, sort_keys=True)
+
+
+QueueEntry = namedtuple('QueueEntry', ['key', 'rating', 'enqueued'])
+
+
+class MatchQueue:
+    """Players waiting for a game, bucketed by rating
+
+    Each bucket keeps its players in the order they joined, so the longest
+    waiting player of a bucket is always its first, and finding the players
+    near a rating only looks at the buckets that cover it.
+    """
+
+    def __init__(self, min_players=MIN_PLAYERS, max_players=MAX_PLAYERS,
+                 bucket_width=BUCKET_WIDTH, window=RATING_WINDOW,
+                 window_growth=RATING_WINDOW_GROWTH,
+                 fill_seconds=FILL_SECONDS):
+        """
+        :attr min_players: fewest players a lobby can start with
+        :type min_players: Natural+
+
+        :attr max_players: most players a lobby can hold
+        :type max_players: Natural+
+
+        :attr bucket_width: rating points covered by each bucket
+        :type bucket_width: Natural+
+
+        :attr window: rating points a lobby may span either side of the
+                      player it forms around
+        :type window: int or float
+
+        :attr window_growth: rating points the window widens per second
+                             that player has waited
+        :type window_growth: int or float
+
+        :attr fill_seconds: seconds to wait for a full lobby before
+                            starting one with fewer players
+        :type fill_seconds: int or float
+        """
+
+        self.min_players = min_players
+        self.max_players = max_players
+        self.bucket_width = bucket_width
+        self.window = window
+        self.window_growth = window_growth
+        self.fill_seconds = fill_seconds
+
+        self._buckets = {}
+        self._bucket_of = {}
+
+    def __len__(self):
+        return len(self._bucket_of)
+
+    def __contains__(self, key):
+        return key in self._bucket_of
+
+    def add(self, key, rating, now):
+        """Adds a player to the queue
+
+        :param key: identifies the player in the queue
+        :type key: Hashable
+
+        :param rating: the player's rating
+        :type rating: float
+
+        :param now: current time
+        :type now: float
+        """
+
+        index = self._bucket(rating)
+        self._buckets.setdefault(index, OrderedDict())[key] = QueueEntry(
+            key, rating, now)
+        self._bucket_of[key] = index
+
+    def remove(self, key):
+        """Removes a player from the queue
+
+        :param key: identifies the player in the queue
+        :type key: Hashable
+
+        :returns: the player's entry
+        :rtype: QueueEntry
+        """
+
+        index = self._bucket_of.pop(key)
+        bucket = self._buckets[index]
+        entry = bucket.pop(key)
+        if not bucket:
+            del self._buckets[index]
+        return entry
+
+    def form_lobby(self, now):
+        """Takes the players of a lobby that is ready to start, if any
+
+        Lobbies form around the longest waiting player of a bucket, trying
+        the longest waiting first. A lobby is ready once it is full, or once
+        it has enough players and that player has waited fill_seconds.
+
+        :param now: current time
+        :type now: float
+
+        :returns: players of the lobby, longest waiting first
+        :rtype: list of QueueEntry or None
+        """
+
+        anchors = sorted((next(iter(bucket.values()))
+                          for bucket in self._buckets.values()),
+                         key=attrgetter('enqueued'))
+
+        for anchor in anchors:
+            waited = now - anchor.enqueued
+            lobby = self._nearby(
+                anchor.rating, self.window + self.window_growth * waited)
+
+            if (len(lobby) == self.max_players or
+                    (len(lobby) >= self.min_players and
+                     waited >= self.fill_seconds)):
+                for entry in lobby:
+                    self.remove(entry.key)
+                return lobby
+
+    def _nearby(self, rating, window):
+        """Longest waiting players within the window around a rating
+
+        :param rating: rating at the center of the window
+        :type rating: float
+
+        :param window: rating points either side of the center
+        :type window: float
+
+        :returns: at most max_players players, longest waiting first
+        :rtype: list of QueueEntry
+        """
+
+        low = self._bucket(rating - window)
+        high = self._bucket(rating + window)
+        buckets = [bucket.values() for index, bucket in self._buckets.items()
+                   if low <= index <= high]
+        nearby = (entry for entry in heapq.merge(
+                      *buckets, key=attrgetter('enqueued'))
+                  if abs(entry.rating - rating) <= window)
+        return list(islice(nearby, self.max_players))
+
+    def _bucket(self, rating):
+        """Index of the bucket covering a rating"""
+
+        return int(rating // self.bucket_width)
+
+
+class MatchmakingServer(Lobby):
+    """Keeps signing up players and plays a game for every lobby formed
+
+    Each game runs in a forked child process that owns the players'
+    connections and reports the final scores back through a pipe, so the
+    server keeps signing up and matching players while games are played.
+
+    Players are rated under the name they sign up with while nobody else
+    waiting or playing holds it. Anonymous players, and players signing up
+    with a name already held, are told apart by a number added to the name
+    instead, and their ratings are dropped after their game since nobody
+    can sign up under that name again.
+    """
+
+    def __init__(self, listener, ratings, queue=None,
+                 handshake_seconds=HANDSHAKE_SECONDS,
+                 from_signup=RemotePlayerProxy.from_signup,
+                 report=None):
+        """
+        :attr ratings: ratings lobbies are balanced by and games update
+        :type ratings: RatingBook
+
+        :attr queue: signed up players waiting for a game
+        :type queue: MatchQueue
+
+        :attr report: (optional) called with the names and final scores of
+                      every finished game, before the ratings of numbered
+                      names are dropped
+        :type report: (list of JSON, list of (Natural or None)) -> None
+
+        :attr games_played: games that have finished
+        :type games_played: Natural
+        """
+
+        super().__init__(listener, handshake_seconds=handshake_seconds,
+                         from_signup=from_signup)
+        self.ratings = ratings
+        self.queue = MatchQueue() if queue is None else queue
+        self.report = report
+        self.games_played = 0
+
+        self._waiting = {}
+        self._games = {}
+        self._names = {}  # whether the rating is kept, by held name
+        self._numbers = count(1)
+
+    def serve(self, max_games=None):
+        """Signs up and matches players until max_games games have finished
+
+        :param max_games: (optional) games to play, forever if None
+        :type max_games: Natural+ or None
+        """
+
+        self.listener.setblocking(False)
+        selector = selectors.DefaultSelector()
+        selector.register(self.listener, selectors.EVENT_READ)
+        self._open(selector)
+
+        try:
+            while max_games is None or self.games_played < max_games:
+                for key, _ in selector.select(self._next_timeout()):
+                    if key.fileobj is self.listener:
+                        self._accept(selector)
+                    elif isinstance(key.data, Handshake):
+                        self._receive(selector, key.data)
+                    elif key.fileobj in self._games:
+                        self._finish(selector, key.fileobj)
+                    else:
+                        self._leave(selector, key.fileobj)
+
+                now = time.monotonic()
+                self._expire(selector, now)
+                self._enqueue(selector, now)
+                lobby = self.queue.form_lobby(now)
+                while lobby:
+                    self._start_game(selector, lobby)
+                    lobby = self.queue.form_lobby(now)
+        finally:
+            for handshake in list(self._handshakes.values()):
+                self._drop(selector, handshake, 'timeout')
+            for sock in self._waiting:
+                sock.close()
+            selector.close()
+
+    def _open(self, selector):
+        """Registers whatever else the server waits on besides players
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+        """
+
+        pass
+
+    def _next_timeout(self):
+        """Seconds until the server next has to check on its own
+
+        :rtype: float or None
+        """
+
+        timeouts = [handshake.deadline - time.monotonic()
+                    for handshake in self._handshakes.values()]
+        if self.queue:
+            timeouts.append(POLL_SECONDS)
+        return max(0, min(timeouts)) if timeouts else None
+
+    def _enqueue(self, selector, now):
+        """Queues the players that just signed up
+
+        A queued connection stays registered so that a player who leaves
+        while waiting is noticed.
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+
+        :param now: current time
+        :type now: float
+        """
+
+        for name, proxy in self._signups:
+            name = self._hold(name)
+            self._waiting[proxy.sock] = (name, proxy)
+            self.queue.add(proxy.sock, self.ratings.rating(name), now)
+            selector.register(proxy.sock, selectors.EVENT_READ)
+        self._signups = []
+
+    def _leave(self, selector, sock):
+        """Drops a waiting player whose connection became readable
+
+        Players have nothing to say before their game starts, so a readable
+        connection has either closed or broken the protocol.
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+
+        :param sock: the player's connection
+        :type sock: socket.socket
+        """
+
+        selector.unregister(sock)
+        self.queue.remove(sock)
+        name, _ = self._waiting.pop(sock)
+        self._release([name])
+        sock.close()
+        self.rejected['left'] += 1
+
+    def _hold(self, name):
+        """Picks the name a newly signed up player is rated under
+
+        :param name: name the player signed up with
+        :type name: JSON
+
+        :returns: a name no other waiting or playing player holds
+        :rtype: str
+        """
+
+        held = signed = RatingBook._key(name)
+        while held == ANONYMOUS_NAME or held in self._names:
+            held = '{}#{}'.format(signed, next(self._numbers))
+        self._names[held] = held == signed
+        return held
+
+    def _release(self, names):
+        """Frees the names of players who left or finished their game
+
+        :param names: names the players were rated under
+        :type names: list of str
+        """
+
+        for name in names:
+            del self._names[name]
+
+    def _start_game(self, selector, lobby):
+        """Forks a child process playing a game with the lobby's players
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+
+        :param lobby: players of the game
+        :type lobby: list of QueueEntry
+        """
+
+        players = [self._waiting.pop(entry.key) for entry in lobby]
+        for _, proxy in players:
+            selector.unregister(proxy.sock)
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            selector.close()
+            self._play_game(players, write_end)
+
+        os.close(write_end)
+        for _, proxy in players:
+            proxy.sock.close()
+        self._games[read_end] = (pid, [name for name, _ in players])
+        selector.register(read_end, selectors.EVENT_READ)
+
+    def _play_game(self, players, write_end):
+        """Plays a game in the forked child and reports its final scores
+
+        Never returns; the child exits once the scores are written.
+
+        :param players: names and proxies of the players in the game
+        :type players: list of (JSON, PlayerProxy)
+
+        :param write_end: pipe to write the final scores to
+        :type write_end: int
+        """
+
+        status = 1
+        try:
+            self.listener.close()
+            for sock in list(self._waiting) + [
+                    handshake.sock for handshake in self._handshakes.values()]:
+                sock.close()
+            for read_end in self._games:
+                os.close(read_end)
+
+            dealer = Dealer(players=[
+                Player(id=(i+1, name), proxy=proxy)
+                for i, (name, proxy) in enumerate(players)])
+            final_scores = [[player_id[0], score]
+                            for player_id, score in dealer.run_game()]
+            os.write(write_end, json.dumps(final_scores).encode('utf-8'))
+            status = 0
+        finally:
+            os._exit(status)
+
+    def _finish(self, selector, read_end):
+        """Records the outcome of a game whose child reported back
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+
+        :param read_end: pipe the child writes its final scores to
+        :type read_end: int
+        """
+
+        pid, names = self._games.pop(read_end)
+        selector.unregister(read_end)
+        data = b''
+        chunk = os.read(read_end, 4096)
+        while chunk:
+            data += chunk
+            chunk = os.read(read_end, 4096)
+        os.close(read_end)
+        os.waitpid(pid, 0)
+        self.games_played += 1
+
+        if data:
+            self._record_game(names, json.loads(data.decode('utf-8')))
+        self._release(names)
+
+    def _record_game(self, names, final_scores):
+        """Updates and reports the ratings of the players of a finished game
+
+        :param names: names of the players, by seat
+        :type names: list of JSON
+
+        :param final_scores: seat and score of every player left at the end
+        :type final_scores: list of [Natural+, Natural]
+        """
+
+        scores = [None] * len(names)
+        for seat, score in final_scores:
+            scores[seat-1] = score
+        self.ratings.record_game(names, scores)
+        if self.report:
+            self.report(names, scores)
+        for name in names:
+            if not self._names[name]:
+                self.ratings.forget(name)
+        self.ratings.save()
@@ -1,23 +1,143 @@
 import socket
 
+from evolution.core import attack
 from evolution.core.player import BasePlayer
+from evolution.server.card import Card
 from evolution.server.exception import CheatingPlayerException
 from evolution.server.feeding import (
     CarnivoreFeeding, FatTissueFeeding, VegetarianFeeding, NoFeeding)
 from evolution.server.species import Species
+from evolution.server.zobrist import BAG, HAND, ID, derive
 from evolution.core.trait import Trait
-from evolution.core.utils import get_neighbors
 
 
 class Player(BasePlayer):
     """
     :attr proxy: the external player to interact with
     :type: proxy: ProxyPlayer
+
+    :attr trait_index: positions of the species boards having each trait
+        - Kept up to date by add_species, replace_trait and assigning
+          boards, so species must gain traits through those.
+    :type trait_index: dict of Trait -> set of Natural
+
+    :attr _state_hash: hash of the player's id, boards, bag and hand at its
+                       seat
+        - Kept up to date by the species' methods, add_species,
+          remove_extinct, add_cards and assigning boards, bag or cards,
+          so the boards and hand lists must only change through those.
+    :type _state_hash: Natural
+
+    :attr _seat: position of the player among the dealer's players, 0
+                 outside of a game
+    :type _seat: Natural
+
+    :attr _dealer: dealer whose state hash includes the player's, if any
+    :type _dealer: Dealer or None
     """
 
     def __init__(self, id, proxy, boards=None, bag=0, cards=None):
         self.proxy = proxy
+        self._dealer = None
+        self._seat = 0
+        self._state_hash = 0
+        self._boards, self._bag, self._cards = [], 0, []
         super().__init__(id, boards, bag, cards)
+        self._reseat(0)
+
+    @property
+    def boards(self):
+        return self._boards
+
+    @boards.setter
+    def boards(self, boards):
+        delta = 0
+        for species in self._boards:
+            delta ^= species._state_hash
+            species._place(None, 0, 0)
+        for board, species in enumerate(boards):
+            species._place(self, self._seat, board)
+            delta ^= species._state_hash
+        self._rehash(delta)
+
+        self._boards = boards
+        self.trait_index = {trait: set() for trait in Trait}
+        for species_index, species in enumerate(boards):
+            for trait in species.traits:
+                self.trait_index[trait].add(species_index)
+
+    @property
+    def bag(self):
+        return self._bag
+
+    @bag.setter
+    def bag(self, bag):
+        self._rehash(BAG[self._seat, self._bag] ^ BAG[self._seat, bag])
+        self._bag = bag
+
+    @property
+    def cards(self):
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards):
+        self._rehash(self._hand_hash(self._cards) ^ self._hand_hash(cards))
+        self._cards = cards
+
+    def species_with(self, trait):
+        """Positions of the species boards having a trait, in board order
+
+        :param trait: trait to look for
+        :type trait: Trait
+
+        :rtype: list of Natural
+        """
+
+        return sorted(self.trait_index[trait])
+
+    def add_species(self, species):
+        """Adds a species board to the right of the player's boards
+
+        :param species: species to add
+        :type species: Species
+        """
+
+        species._place(self, self._seat, len(self.boards))
+        self._rehash(species._state_hash)
+        for trait in species.traits:
+            self.trait_index[trait].add(len(self.boards))
+        self.boards.append(species)
+
+    def add_cards(self, cards):
+        """Adds cards to the right of the player's hand
+
+        :param cards: cards to add
+        :type cards: list of Card
+        """
+
+        self._rehash(self._hand_hash(cards, len(self.cards)))
+        self.cards.extend(cards)
+
+    def replace_trait(self, species_index, trait_index, trait):
+        """Replaces a trait of one of the player's species
+
+        :param species_index: index of the species in the player's boards
+        :type species_index: Natural
+
+        :param trait_index: index of the trait to replace
+        :type trait_index: Natural
+
+        :param trait: new trait for the species
+        :type trait: Trait
+        """
+
+        species = self.boards[species_index]
+        old_trait = species.traits[trait_index]
+        species.replace_trait(trait_index, trait)
+
+        if old_trait not in species.traits:
+            self.trait_index[old_trait].discard(species_index)
+        self.trait_index[trait].add(species_index)
 
     def copy(self):
         """Creates a new instance of Player with the same attributes
@@ -33,6 +153,52 @@ class Player(BasePlayer):
             self.bag,
             [card.copy() for card in self.cards])
 
+    def state_hash(self):
+        """Hash of the player's id, species boards, bag and hand
+
+        Every piece is keyed by its seat, board and slot, so reordering
+        boards or cards, or seating the player elsewhere, changes the hash.
+
+        :rtype: Natural
+        """
+
+        return self._state_hash
+
+    def snapshot(self):
+        """Captures the state of the player, leaving out its proxy
+
+        :returns: id, bag, species snapshots, card snapshots
+        :rtype: (Any, Natural, tuple of tuple, tuple of Natural)
+        """
+
+        return (
+            self._id,
+            self.bag,
+            tuple(species.snapshot() for species in self.boards),
+            tuple(card.snapshot() for card in self.cards))
+
+    @classmethod
+    def restore(cls, snapshot, proxy=None):
+        """Creates a player from its snapshot
+
+        :param snapshot: snapshot created by Player.snapshot
+        :type snapshot: (Any, Natural, tuple of tuple, tuple of Natural)
+
+        :param proxy: (optional) proxy of the restored player
+        :type proxy: BasePlayerProxy
+
+        :returns: new player in the captured state
+        :rtype: Player
+        """
+
+        id, bag, boards, cards = snapshot
+        return cls(
+            id,
+            proxy,
+            [Species.restore(species) for species in boards],
+            bag,
+            [Card.restore(card) for card in cards])
+
     def start(self, watering_hole):
         """Informs the external player that the turn is about to start
 
@@ -194,7 +360,7 @@ class Player(BasePlayer):
     def add_empty_species(self):
         """Add an empty species to self.boards"""
 
-        self.boards.append(Species())
+        self.add_species(Species())
 
     def reduce_population(self, species_index):
         """Reduces the population of the given species
@@ -264,12 +430,7 @@ class Player(BasePlayer):
         :rtype: list of Natural
         """
 
-        attackable_boards = []
-        for index, species in enumerate(self.boards):
-            lneighbor, rneighbor = get_neighbors(self.boards, index)
-            if species.is_attackable(attacker, lneighbor, rneighbor):
-                attackable_boards.append(index)
-        return attackable_boards
+        return attack.attackable_boards(self.boards, attacker)
 
     def species_has_trait(self, species_index, trait):
         """Returns whether the species at the species_index has a given trait
@@ -286,39 +447,19 @@ class Player(BasePlayer):
 
         return trait in self.boards[species_index].traits
 
-    def trigger_cooperation(self, species_index, dealer):
-        """Applies cooperation if the species has the trait
-
-        :param species_index: index of the species in the player's boards
-        :type species_index: Natural
-
-        :param dealer: keeper of the state of the game, which is mutated
-        :type dealer: Dealer
-        """
-
-        _, rneighbor = get_neighbors(self.boards, species_index)
-
-        if (self.species_has_trait(species_index, Trait.cooperation) and
-                rneighbor):
-            rneighbor_index = species_index + 1
-            self.try_feed(rneighbor_index, dealer)
-
     def handle_scavenger(self, dealer):
         """Handles scavenger trait across all boards.
 
         :param dealer: keeper of the state of the game, which is mutated
         :type dealer: Dealer
         """
-        for species_index, species in enumerate(self.boards):
-            if Trait.scavenger in species.traits:
-                self.try_feed(species_index, dealer)
+        self.feed_each(self.species_with(Trait.scavenger), dealer)
 
     def handle_fertile(self):
         """Handles fertile trait across all boards"""
 
-        for species in self.boards:
-            if Trait.fertile in species.traits:
-                species.try_reproduce()
+        for species_index in self.species_with(Trait.fertile):
+            self.boards[species_index].try_reproduce()
 
     def handle_long_neck(self, dealer):
         """Handles long neck trait across all boards
@@ -327,14 +468,13 @@ class Player(BasePlayer):
         :type dealer: Dealer
         """
 
-        for species_index, species in enumerate(self.boards):
-            if Trait.long_neck in species.traits:
-                self.try_feed(species_index, dealer)
+        self.feed_each(self.species_with(Trait.long_neck), dealer)
 
     def handle_fat_tissue_transfer(self):
         """Handles the fat tissue transfer from fat food to food"""
 
-        for species in self.boards:
+        for species_index in self.species_with(Trait.fat_tissue):
+            species = self.boards[species_index]
             if species.fat_food > 0:
                 species.try_fat_tissue_transfer()
 
@@ -366,14 +506,69 @@ class Player(BasePlayer):
         :rtype: bool
         """
 
-        species = self.boards[species_index]
-        tokens_fed = species.try_eat(dealer.watering_hole)
-        if tokens_fed:
-            dealer.watering_hole -= tokens_fed
-            for feeding in range(tokens_fed):
-                self.trigger_cooperation(species_index, dealer)
-            return True
-        return False
+        return self.feed_each([species_index], dealer)[0] > 0
+
+    def feed_each(self, species_indexes, dealer):
+        """Feeds each of the species in turn, with their cooperation chains
+
+        Every token a species with cooperation eats feeds its right neighbor
+        once, and that feeding is resolved in full, down the rest of the
+        chain, before the species' next token is passed on. The pending
+        feedings are kept on a stack of (species index, feedings) so that
+        long chains take no recursion, and a species found full drops all of
+        its pending feedings at once.
+
+        :param species_indexes: indexes of the species to feed, in order
+        :type species_indexes: list of Natural
+
+        :param dealer: (mutable) keeper of the state of the game
+        :type dealer: Dealer
+
+        :returns: tokens each of the given species ate itself
+        :rtype: list of Natural
+        """
+
+        boards = self.boards
+        watering_hole = dealer.watering_hole
+        eaten = []
+
+        for species_index in species_indexes:
+            tokens = boards[species_index].try_eat(watering_hole)
+            watering_hole -= tokens
+            eaten.append(tokens)
+
+            pending = []
+            if tokens:
+                self._pass_on(pending, species_index, tokens)
+            while pending and watering_hole:
+                index, feedings = pending.pop()
+                tokens = boards[index].try_eat(watering_hole)
+                if not tokens:
+                    continue
+                watering_hole -= tokens
+                if feedings > 1:
+                    pending.append((index, feedings - 1))
+                self._pass_on(pending, index, tokens)
+
+        dealer.watering_hole = watering_hole
+        return eaten
+
+    def _pass_on(self, pending, species_index, tokens):
+        """Queues the feedings cooperation gives the species' right neighbor
+
+        :param pending: stack of (species index, feedings) to resolve
+        :type pending: list of (Natural, Natural+)
+
+        :param species_index: index of the species that ate
+        :type species_index: Natural
+
+        :param tokens: tokens the species ate
+        :type tokens: Natural+
+        """
+
+        if (Trait.cooperation in self.boards[species_index].traits and
+                species_index + 1 < len(self.boards)):
+            pending.append((species_index + 1, tokens))
 
     def try_feed_fat_tissue(self, species_index, tokens, dealer):
         """Feeds the fat tissue of a species a passed number of tokens
@@ -406,15 +601,39 @@ class Player(BasePlayer):
     def remove_extinct(self):
         """Removes the extinct species from the player's boards
 
-        :returns: number of extinct species removed
-        :rtype: Natural
+        The surviving boards are moved left in place and the trait index is
+        remapped rather than rebuilt.
+
+        :returns: new index of every species board by old index, None for
+                  the extinct boards
+        :rtype: list of (Natural or None)
         """
-        new_boards = [
-            species for species in self.boards if species.population > 0
-        ]
-        count = len(self.boards) - len(new_boards)
-        self.boards = new_boards
-        return count
+
+        remap = []
+        survivors = 0
+        delta = 0
+        for species_index, species in enumerate(self.boards):
+            if species.population > 0:
+                if survivors < species_index:
+                    delta ^= species._state_hash
+                    species._place(self, self._seat, survivors)
+                    delta ^= species._state_hash
+                self.boards[survivors] = species
+                remap.append(survivors)
+                survivors += 1
+            else:
+                delta ^= species._state_hash
+                species._place(None, 0, 0)
+                remap.append(None)
+
+        if survivors < len(self.boards):
+            self._rehash(delta)
+            del self.boards[survivors:]
+            for trait, species_indexes in self.trait_index.items():
+                self.trait_index[trait] = {
+                    remap[species_index] for species_index in species_indexes
+                    if remap[species_index] is not None}
+        return remap
 
     def to_json(self):
         """Converts Player into JSON representation
@@ -428,3 +647,46 @@ class Player(BasePlayer):
             [species.to_json() for species in self.boards],
             [card.to_json() for card in self.cards]
         ]
+
+    def _reseat(self, seat):
+        """Moves the player to a seat, rehashing everything it holds
+
+        :param seat: position of the player among the dealer's players
+        :type seat: Natural
+        """
+
+        self._seat = seat
+        state_hash = derive(ID, (seat, self._id)) ^ BAG[seat, self.bag]
+        for board, species in enumerate(self.boards):
+            species._place(self, seat, board)
+            state_hash ^= species._state_hash
+        state_hash ^= self._hand_hash(self.cards)
+        self._rehash(self._state_hash ^ state_hash)
+
+    def _rehash(self, delta):
+        """Applies a change of keys to the hashes of the player and dealer
+
+        :param delta: XOR of the keys going out and coming in
+        :type delta: Natural
+        """
+
+        self._state_hash ^= delta
+        if self._dealer is not None:
+            self._dealer._state_hash ^= delta
+
+    def _hand_hash(self, cards, first_slot=0):
+        """XOR of the keys of cards held from the given slot onwards
+
+        :param cards: cards in slot order
+        :type cards: list of Card
+
+        :param first_slot: slot of the first card
+        :type first_slot: Natural
+
+        :rtype: Natural
+        """
+
+        hand_hash = 0
+        for slot, card in enumerate(cards, first_slot):
+            hand_hash ^= HAND[self._seat, slot, card.food, card.trait.value]
+        return hand_hash
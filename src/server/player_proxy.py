@@ -1,14 +1,24 @@
 import socket
 
-from evolution.core.connection import send_msg, read_msg
+from evolution.core.codec import (
+    BINARY_CODEC, CHOOSE_FRAME, CODECS, FEED_NEXT_FRAME, JSON_CODEC, NATURAL,
+    START_FRAME, encode_frame, pack_list)
+from evolution.core.connection import (
+    MAX_QUEUED_BYTES, SEND_SECONDS, Outbox, read_msg)
 from evolution.server.action import (
     AddToWateringHole, AddSpecies, AddPopulation, ReplaceTrait, AddBody)
 from evolution.server.feeding import (
     VegetarianFeeding, NoFeeding, CarnivoreFeeding, FatTissueFeeding)
 from evolution.core.utils import assert_list_with_size, timeout
+from evolution.server.latency import LatencyTracker
+from evolution.server.policy import FeedingPolicy
 
 
 TIMEOUT_SECONDS = 2  # seconds to wait for external player to respond
+MAX_REPLY_BYTES = {  # longest reply accepted from a player, per message
+    CHOOSE_FRAME: 1 << 14,
+    FEED_NEXT_FRAME: 1 << 8
+}
 
 """
 A JState is a
@@ -179,45 +189,266 @@ class BasePlayerProxy:
             cls._serialize_boards(opponents)
         ]
 
+    @staticmethod
+    def _encode_boards(players):
+        """Converts the players' boards into their binary representation
+
+        :returns: BinaryList of BinarySpecies for each player
+        :rtype: bytes
+        """
+
+        return pack_list(
+            players,
+            lambda player: pack_list(
+                player.boards, lambda species: species.to_binary()))
+
+    @staticmethod
+    def _encode_player(player):
+        """Converts a player's bag, boards and cards into binary
+
+        :returns: bag, BinaryList of BinarySpecies, BinaryList of BinaryCard
+        :rtype: bytes
+        """
+
+        return (
+            NATURAL.pack(player.bag) +
+            pack_list(player.boards, lambda species: species.to_binary()) +
+            pack_list(player.cards, lambda card: card.to_binary()))
+
+    @classmethod
+    def _encode_start(cls, watering_hole, player):
+        """Creates the payload of a START_FRAME
+
+        :returns: binary representation of the start of a turn
+        :rtype: bytes
+        """
+
+        return NATURAL.pack(watering_hole) + cls._encode_player(player)
+
+    @classmethod
+    def _encode_choose(cls, before_opponents, after_opponents):
+        """Creates the payload of a CHOOSE_FRAME
+
+        :returns: binary representation of the opponents' boards
+        :rtype: bytes
+        """
+
+        return (
+            cls._encode_boards(before_opponents) +
+            cls._encode_boards(after_opponents))
+
+    @classmethod
+    def _encode_state(cls, player, watering_hole, opponents):
+        """Creates the payload of a FEED_NEXT_FRAME
+
+        :returns: binary representation of the state of the game
+        :rtype: bytes
+        """
+
+        return (
+            cls._encode_player(player) +
+            NATURAL.pack(watering_hole) +
+            cls._encode_boards(opponents))
+
+
+def parse_signup(signup):
+    """Splits a sign up message into the player's name and options
+
+    Any message that does not carry options is taken to be the name.
+
+    :param signup: sign up message sent by an external player
+    :type signup: SignUp
+
+    :returns: name and requested options
+    :rtype: (JSON, dict)
+    """
+
+    if (isinstance(signup, list) and len(signup) == 2 and
+            isinstance(signup[0], str) and isinstance(signup[1], dict)):
+        return signup[0], signup[1]
+    return signup, {}
+
 
 class RemotePlayerProxy(BasePlayerProxy):
     """Serialize / deserialize messages from a remotely linked player"""
 
-    def __init__(self, sock):
+    SIGN_UP_RESPONSE = 'ok'
+
+    def __init__(self, sock, latency=None, report=None, codec=JSON_CODEC,
+                 max_queued_bytes=MAX_QUEUED_BYTES, send_seconds=SEND_SECONDS,
+                 policy=None, max_reply_bytes=None):
         """
         :attr sock: connection to the external player
         :type sock: socket.socket
+
+        :attr outbox: messages waiting for the external player to read them;
+                      a player that lets more than max_queued_bytes pile up,
+                      or takes longer than send_seconds to read a message it
+                      has to answer, is treated as having broken the
+                      connection
+        :type outbox: Outbox
+
+        :attr latency: response time accounting for the external player
+        :type latency: LatencyTracker
+
+        :attr report: (optional) receives the latency summary at game end
+        :type report: dict -> None
+
+        :attr codec: encoding of the messages sent to the external player
+        :type codec: Codec
+
+        :attr policy: (optional) feeding choices the external player
+                      delegated to the dealer, asked before the player is
+        :type policy: FeedingPolicy or None
+
+        :attr delegated_feedings: feedings the policy chose for the player
+        :type delegated_feedings: Natural
+
+        :attr max_reply_bytes: longest reply accepted, by the frame kind of
+                               the message answered; longer or malformed
+                               replies are refused as they arrive. Kinds
+                               not given keep their MAX_REPLY_BYTES limit
+        :type max_reply_bytes: dict of Natural -> Natural+
         """
+        if codec not in CODECS:
+            raise ValueError('{} is not a valid codec'.format(codec))
+
         self.sock = sock
+        self.outbox = Outbox(sock, max_queued_bytes, send_seconds)
+        self.latency = latency or LatencyTracker()
+        self.report = report
+        self.codec = codec
+        self.policy = policy
+        self.delegated_feedings = 0
+        self.max_reply_bytes = dict(MAX_REPLY_BYTES)
+        self.max_reply_bytes.update(max_reply_bytes or {})
+
+    @classmethod
+    def from_signup(cls, sock, signup, **kwargs):
+        """Accepts the sign up of an external player, negotiating options
+
+        A player may ask for a codec and delegate a feeding policy. Options
+        the dealer does not support are declined, and the response only
+        carries options if the player asked for more than the defaults.
+
+        :param sock: connection to the external player
+        :type sock: socket.socket
+
+        :param signup: sign up message sent by the external player
+        :type signup: SignUp
+
+        :returns: the player's name and a proxy for the player
+        :rtype: (JSON, RemotePlayerProxy)
+        """
+
+        name, options = parse_signup(signup)
+        codec = options.get('codec', JSON_CODEC)
+        if codec not in CODECS:
+            codec = JSON_CODEC
+
+        accepted = {'codec': codec}
+        policy = None
+        if 'policy' in options:
+            try:
+                policy = FeedingPolicy.from_json(options['policy'])
+            except ValueError:
+                pass
+            accepted['policy'] = policy is not None
+
+        proxy = cls(sock, codec=codec, policy=policy, **kwargs)
+        if accepted == {'codec': JSON_CODEC}:
+            proxy.outbox.push_msg(cls.SIGN_UP_RESPONSE)
+        else:
+            proxy.outbox.push_msg([cls.SIGN_UP_RESPONSE, accepted])
+        proxy.outbox.flush()
+
+        return name, proxy
 
     def start(self, watering_hole, player):
-        msg = [watering_hole] + player.to_json()
-        send_msg(msg, self.sock)
+        if self.codec == BINARY_CODEC:
+            msg = self._encode_start(watering_hole, player)
+        else:
+            msg = [watering_hole] + player.to_json()
+        self.latency.measure('start', self._send, START_FRAME, msg)
 
-    @timeout(TIMEOUT_SECONDS)
     def choose(self, player, before_opponents, after_opponents):
-        opponents_boards = [
-            self._serialize_boards(before_opponents),
-            self._serialize_boards(after_opponents)
-        ]
+        if self.codec == BINARY_CODEC:
+            msg = self._encode_choose(before_opponents, after_opponents)
+        else:
+            msg = [
+                self._serialize_boards(before_opponents),
+                self._serialize_boards(after_opponents)
+            ]
+
+        action4 = self.latency.measure(
+            'choose', self._exchange, CHOOSE_FRAME, msg)
+        return self._deserialize_action4(action4)
 
-        send_msg(opponents_boards, self.sock)
-        return self._deserialize_action4(read_msg(self.sock))
-
-    @timeout(TIMEOUT_SECONDS)
     def feedNext(self, player, watering_hole, opponents):
-        state = self._serialize_state(player, watering_hole, opponents)
+        if self.policy:
+            feeding = self.policy.choose(player, watering_hole, opponents)
+            if feeding:
+                self.delegated_feedings += 1
+                return feeding
+
+        if self.codec == BINARY_CODEC:
+            msg = self._encode_state(player, watering_hole, opponents)
+        else:
+            msg = self._serialize_state(player, watering_hole, opponents)
 
-        send_msg(state, self.sock)
-        return self._deserialize_feeding(read_msg(self.sock))
+        jfeeding = self.latency.measure(
+            'feedNext', self._exchange, FEED_NEXT_FRAME, msg)
+        return self._deserialize_feeding(jfeeding)
 
     def end_game(self):
+        if self.report:
+            self.report(self.latency.summary())
+
         try:
             self.sock.shutdown(socket.SHUT_RDWR)
             self.sock.close()
         except socket.error:
             pass
 
+    def _send(self, kind, msg):
+        """Queues the message for the external player using its codec
+
+        The message leaves as soon as the connection takes it, at the
+        latest when the next reply is awaited.
+
+        :param kind: frame kind of the message when sent as binary
+        :type kind: Natural
+
+        :param msg: message to send
+        :type msg: JSON or bytes
+
+        :raises: BlockingIOError if the player is not reading its messages
+        """
+
+        if self.codec == BINARY_CODEC:
+            self.outbox.push(encode_frame(kind, msg))
+        else:
+            self.outbox.push_msg(msg)
+
+    def _exchange(self, kind, msg):
+        """Sends the message to the external player and waits for its reply
+
+        :param kind: frame kind of the message when sent as binary
+        :type kind: Natural
+
+        :param msg: message to send
+        :type msg: JSON or bytes
+
+        :returns: the external player's reply
+        :rtype: JSON
+
+        :raises: MessageRejected if the reply is too long or malformed
+        """
+
+        self._send(kind, msg)
+        self.outbox.flush()
+        return read_msg(self.sock, self.max_reply_bytes[kind])
+
 
 class StaticPlayerProxy(BasePlayerProxy):
     """Serialize / deseriailze messages from a statically linked player"""
@@ -0,0 +1,195 @@
+from evolution.core.trait import Trait
+from evolution.server.feeding import (
+    CarnivoreFeeding, FatTissueFeeding, VegetarianFeeding)
+
+
+"""
+A JPolicy is a list of [Kind, list of Key], at most one per Kind.
+
+A Kind is one of "fat-tissue", "vegetarian" and "carnivore".
+
+A Key is one of "population", "food", "body", "hunger" and "fat-need".
+
+Interpretation:
+    The kinds are tried in order and the first that finds a feeding is the
+    player's choice. Each kind ranks species by comparing their keys in
+    order, largest first, and takes the first of the best ranked species:
+    - "fat-tissue" feeds the best species that can store fat as many tokens
+      as it needs or the watering hole holds.
+    - "vegetarian" feeds the best hungry species without carnivore.
+    - "carnivore" has the best hungry carnivore attack the best species it
+      can attack, scanning the opponents in order. The kind finds nothing if
+      that carnivore cannot attack anyone.
+    If no kind finds a feeding the policy declines, and the player is asked.
+"""
+
+KINDS = ['fat-tissue', 'vegetarian', 'carnivore']
+KEYS = {
+    'population': lambda species: species.population,
+    'food': lambda species: species.food,
+    'body': lambda species: species.body,
+    'hunger': lambda species: species.hunger(),
+    'fat-need': lambda species: species.fat_food_need()
+}
+
+
+class FeedingPolicy:
+    """Feeding choices a player delegates to the dealer
+
+    Evaluating the policy where the game runs saves a round trip to the
+    player for every feeding it covers.
+    """
+
+    def __init__(self, rules):
+        """
+        :attr rules: kinds of feeding to try in order, each with the keys
+                     ranking its species
+        :type rules: list of (str, list of str)
+        """
+
+        self.rules = rules
+
+    @classmethod
+    def from_json(cls, jpolicy):
+        """Creates a policy from its JSON representation
+
+        :param jpolicy: policy sent by the player when signing up
+        :type jpolicy: JPolicy
+
+        :rtype: FeedingPolicy
+
+        :raises: ValueError if the jpolicy does not match the spec
+        """
+
+        if not isinstance(jpolicy, list):
+            raise ValueError('policy must be a list')
+
+        rules = []
+        for rule in jpolicy:
+            if not (isinstance(rule, list) and len(rule) == 2 and
+                    rule[0] in KINDS and isinstance(rule[1], list)):
+                raise ValueError('policy rule must be [Kind, list of Key]')
+            kind, keys = rule
+            if not all(isinstance(key, str) and key in KEYS for key in keys):
+                raise ValueError('unknown policy key in {}'.format(keys))
+            rules.append((kind, keys))
+
+        if len({kind for kind, _ in rules}) != len(rules):
+            raise ValueError('policy lists a kind of feeding twice')
+        return cls(rules)
+
+    def to_json(self):
+        """
+        :rtype: JPolicy
+        """
+
+        return [[kind, list(keys)] for kind, keys in self.rules]
+
+    def choose(self, player, watering_hole, opponents):
+        """The feeding the policy picks for the player
+
+        :param player: player about to feed
+        :type player: Player
+
+        :param watering_hole: number of tokens at the watering hole
+        :type watering_hole: Natural+
+
+        :param opponents: opponents a carnivore might attack
+        :type opponents: list of Player
+
+        :returns: the feeding, None if the policy declines
+        :rtype: Feeding or None
+        """
+
+        for kind, keys in self.rules:
+            rank = _ranking(keys)
+            if kind == 'fat-tissue':
+                feeding = _feed_fat_tissue(player, watering_hole, rank)
+            elif kind == 'vegetarian':
+                feeding = _feed_vegetarian(player, rank)
+            else:
+                feeding = _feed_carnivore(player, opponents, rank)
+            if feeding:
+                return feeding
+        return None
+
+
+def _ranking(keys):
+    """Ranks species by the given keys
+
+    :param keys: keys compared in order
+    :type keys: list of str
+
+    :rtype: Species -> tuple
+    """
+
+    getters = [KEYS[key] for key in keys]
+    return lambda species: tuple(getter(species) for getter in getters)
+
+
+def _best(indexed_species, rank):
+    """Index of the first of the best ranked species, None if there are none
+
+    :param indexed_species: species and their indexes
+    :type indexed_species: list of (Any, Species)
+
+    :param rank: ranking of the species
+    :type rank: Species -> tuple
+
+    :rtype: Any or None
+    """
+
+    if not indexed_species:
+        return None
+    index, _ = max(indexed_species, key=lambda pair: rank(pair[1]))
+    return index
+
+
+def _feed_fat_tissue(player, watering_hole, rank):
+    """
+    :rtype: FatTissueFeeding or None
+    """
+
+    index = _best([(i, species) for i, species in enumerate(player.boards)
+                   if species.fat_food_need() > 0], rank)
+    if index is None:
+        return None
+
+    tokens = min(player.boards[index].fat_food_need(), watering_hole)
+    return FatTissueFeeding(index, tokens)
+
+
+def _feed_vegetarian(player, rank):
+    """
+    :rtype: VegetarianFeeding or None
+    """
+
+    index = _best([(i, species) for i, species in enumerate(player.boards)
+                   if Trait.carnivore not in species.traits and
+                   species.hunger() > 0], rank)
+    if index is None:
+        return None
+    return VegetarianFeeding(index)
+
+
+def _feed_carnivore(player, opponents, rank):
+    """
+    :rtype: CarnivoreFeeding or None
+    """
+
+    attacker_index = _best(
+        [(i, species) for i, species in enumerate(player.boards)
+         if Trait.carnivore in species.traits and species.hunger() > 0],
+        rank)
+    if attacker_index is None:
+        return None
+
+    attacker = player.boards[attacker_index]
+    targets = [
+        ((opponent_index, defender_index), opponent.boards[defender_index])
+        for opponent_index, opponent in enumerate(opponents)
+        for defender_index in opponent.attackable_boards(attacker)]
+    target = _best(targets, rank)
+    if target is None:
+        return None
+    return CarnivoreFeeding(attacker_index, *target)
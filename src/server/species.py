@@ -1,12 +1,76 @@
 from evolution.core.trait import Trait
 from evolution.core.species import BaseSpecies
+from evolution.server.zobrist import BODY, FAT_FOOD, FOOD, POPULATION, TRAIT
+
+
+TRAITS_BY_VALUE = {trait.value: trait for trait in Trait}
 
 
 class Species(BaseSpecies):
+    """
+    :attr _state_hash: hash of the species' values at its place
+        - Kept up to date by the methods below, which also pass every
+          change on to the owner, so a species must only change through
+          them.
+    :type _state_hash: Natural
+
+    :attr _owner: player whose boards hold the species, if any
+    :type _owner: Player or None
+
+    :attr _seat: seat of the owner, 0 without an owner
+    :type _seat: Natural
+
+    :attr _board: position of the species in the owner's boards
+    :type _board: Natural
+    """
 
     MIN_BODY, MAX_BODY = 0, 7
     MIN_POPULATION, MAX_POPULATION = 1, 7
 
+    def __init__(self, food=0, body=0, population=1, traits=None, fat_food=0):
+        super().__init__(food, body, population, traits, fat_food)
+        self._place(None, 0, 0)
+
+    def state_hash(self):
+        """Hash of the species' food, body, population, traits and fat food
+
+        The hash depends on where the species sits, so the same species on
+        another board or seat hashes differently.
+
+        :rtype: Natural
+        """
+
+        return self._state_hash
+
+    def snapshot(self):
+        """Captures the state of the species as flat values
+
+        :returns: food, body, population, trait values, fat food
+        :rtype: (Nat, Nat, Nat, tuple of Natural+, Nat)
+        """
+
+        return (
+            self.food,
+            self.body,
+            self.population,
+            tuple(trait.value for trait in self.traits),
+            self.fat_food)
+
+    @classmethod
+    def restore(cls, snapshot):
+        """Creates a species from its snapshot
+
+        :param snapshot: snapshot created by Species.snapshot
+        :type snapshot: (Nat, Nat, Nat, tuple of Natural+, Nat)
+
+        :returns: new species in the captured state
+        :rtype: Species
+        """
+
+        food, body, population, trait_values, fat_food = snapshot
+        traits = [TRAITS_BY_VALUE[value] for value in trait_values]
+        return cls(food, body, population, traits, fat_food)
+
     def score(self):
         """Score contributed by this species
 
@@ -28,8 +92,11 @@ class Species(BaseSpecies):
 
         old_trait = self.traits[trait_index]
         if old_trait is Trait.fat_tissue and new_trait is not Trait.fat_tissue:
-            self.fat_food = 0
+            self._set_fat_food(0)
 
+        place = self._seat, self._board, trait_index
+        self._rehash(TRAIT[place + (old_trait.value,)] ^
+                     TRAIT[place + (new_trait.value,)])
         self.traits[trait_index] = new_trait
 
     def food_bag_transfer(self):
@@ -40,7 +107,7 @@ class Species(BaseSpecies):
         """
 
         add_food = self.food
-        self.food = 0
+        self._set_food(0)
         return add_food
 
     def reduce_population(self):
@@ -52,8 +119,8 @@ class Species(BaseSpecies):
         :rtype: Nat
         """
 
-        self.population -= 1
-        self.food = min(self.food, self.population)
+        self._set_population(self.population - 1)
+        self._set_food(min(self.food, self.population))
         return self.population
 
     def try_eat(self, watering_hole):
@@ -69,18 +136,23 @@ class Species(BaseSpecies):
         default_tokens = 2 if Trait.foraging in self.traits else 1
         tokens_to_eat = min(default_tokens, watering_hole, self.hunger())
 
-        self.food += tokens_to_eat
+        if tokens_to_eat:
+            self._set_food(self.food + tokens_to_eat)
         return tokens_to_eat
 
     def try_reproduce(self):
         """Tries to add population the species if it's under the max"""
 
-        self.population = min(self.MAX_POPULATION, self.population + 1)
+        population = min(self.MAX_POPULATION, self.population + 1)
+        if population != self.population:
+            self._set_population(population)
 
     def try_add_body(self):
         """Tries to add body the species if it's under the max"""
 
-        self.body = min(self.MAX_BODY, self.body + 1)
+        body = min(self.MAX_BODY, self.body + 1)
+        if body != self.body:
+            self._set_body(body)
 
     def try_take_fat_food(self, tokens, watering_hole):
         """Take fat food, if possible.
@@ -97,7 +169,7 @@ class Species(BaseSpecies):
         assert Trait.fat_tissue in self.traits
 
         tokens_to_take = min(watering_hole, tokens)
-        self.fat_food += tokens_to_take
+        self._set_fat_food(self.fat_food + tokens_to_take)
         return tokens_to_take
 
     def reset_food(self):
@@ -108,17 +180,84 @@ class Species(BaseSpecies):
         """
 
         add_food = self.food
-        self.food = 0
+        if add_food:
+            self._set_food(0)
         return add_food
 
     def try_fat_tissue_transfer(self):
         """Tries to move fat food to food"""
 
         tokens_to_transfer = min(self.hunger(), self.fat_food)
-        self.food += tokens_to_transfer
-        self.fat_food -= tokens_to_transfer
+        self._set_food(self.food + tokens_to_transfer)
+        self._set_fat_food(self.fat_food - tokens_to_transfer)
 
     def try_reduce_population_to_food(self):
         """Set population to food value if population is higher"""
 
-        self.population = min(self.population, self.food)
+        if self.population > self.food:
+            self._set_population(self.food)
+
+    def _place(self, owner, seat, board):
+        """Moves the species to a board, rehashing it for its new place
+
+        The owner is not told; it accounts for the old and new hashes of
+        the species itself.
+
+        :param owner: player whose boards hold the species, if any
+        :type owner: Player or None
+
+        :param seat: seat of the owner
+        :type seat: Natural
+
+        :param board: position of the species in the owner's boards
+        :type board: Natural
+        """
+
+        self._owner = owner
+        self._seat = seat
+        self._board = board
+        self._state_hash = (
+            FOOD[seat, board, self.food] ^ BODY[seat, board, self.body] ^
+            POPULATION[seat, board, self.population] ^
+            FAT_FOOD[seat, board, self.fat_food])
+        for slot, trait in enumerate(self.traits):
+            self._state_hash ^= TRAIT[seat, board, slot, trait.value]
+
+    def _rehash(self, delta):
+        """Applies a change of keys to the hashes of the species and owner
+
+        :param delta: XOR of the keys going out and coming in
+        :type delta: Natural
+        """
+
+        self._state_hash ^= delta
+        if self._owner is not None:
+            self._owner._rehash(delta)
+
+    def _set_food(self, food):
+        """Sets the food, updating the state hashes"""
+
+        self._rehash(FOOD[self._seat, self._board, self.food] ^
+                     FOOD[self._seat, self._board, food])
+        self.food = food
+
+    def _set_body(self, body):
+        """Sets the body, updating the state hashes"""
+
+        self._rehash(BODY[self._seat, self._board, self.body] ^
+                     BODY[self._seat, self._board, body])
+        self.body = body
+
+    def _set_population(self, population):
+        """Sets the population, updating the state hashes"""
+
+        self._rehash(POPULATION[self._seat, self._board, self.population] ^
+                     POPULATION[self._seat, self._board, population])
+        self.population = population
+
+    def _set_fat_food(self, fat_food):
+        """Sets the fat food, updating the state hashes"""
+
+        self._rehash(FAT_FOOD[self._seat, self._board, self.fat_food] ^
+                     FAT_FOOD[self._seat, self._board, fat_food])
+        self.fat_food = fat_food
@@ -0,0 +1,346 @@
+from collections import Counter, deque
+from functools import partial
+import json
+import os
+import selectors
+import socket
+import traceback
+
+from evolution.server.dealer import Dealer
+from evolution.server.lobby import HANDSHAKE_SECONDS
+from evolution.server.matchmaking import MAX_PLAYERS, MatchmakingServer
+from evolution.server.player import Player
+from evolution.server.player_proxy import RemotePlayerProxy
+from evolution.server.policy import FeedingPolicy
+
+
+MESSAGE_SIZE = 1 << 16  # largest message between supervisor and worker
+
+
+"""
+A GameOrder is a list of [JSON, Codec, JPolicy or null], the name, codec
+and delegated feeding policy of the player in every seat of a game. It is
+sent to a worker together with the players' connections, in seat order.
+
+A GameResult is one of:
+    - {'scores': list of [Natural+, Natural],
+       'latency': list of [Natural+, dict]}
+    - {'error': str}
+It holds the seat and final score of every player left at the end of the
+game and the latency summary of every seat that was reported, or the
+error that ended the game early.
+"""
+
+
+def make_proxy(sock, codec):
+    """Creates the proxy of a player whose connection a worker received
+
+    :param sock: connection to the external player
+    :type sock: socket.socket
+
+    :param codec: codec negotiated when the player signed up
+    :type codec: Codec
+
+    :rtype: RemotePlayerProxy
+    """
+
+    return RemotePlayerProxy(sock, codec=codec)
+
+
+def work(channel, make_proxy=make_proxy):
+    """Plays every game the supervisor hands over until it hangs up
+
+    :param channel: Unix socket to the supervisor
+    :type channel: socket.socket
+
+    :param make_proxy: creates the proxy of a player from its connection
+    :type make_proxy: (socket.socket, Codec) -> PlayerProxy
+    """
+
+    while True:
+        msg, fds, _, _ = socket.recv_fds(channel, MESSAGE_SIZE, MAX_PLAYERS)
+        if not msg:
+            return
+
+        socks = [socket.socket(fileno=fd) for fd in fds]
+        try:
+            result = play_game(json.loads(msg.decode('utf-8')), socks,
+                               make_proxy)
+        except Exception:
+            result = {'error': traceback.format_exc()}
+        finally:
+            for sock in socks:
+                sock.close()
+        channel.send(json.dumps(result).encode('utf-8'))
+
+
+def play_game(order, socks, make_proxy=make_proxy):
+    """Plays a game handed over by the supervisor
+
+    :param order: name, codec and policy of the player in every seat
+    :type order: GameOrder
+
+    :param socks: connection to the player in every seat
+    :type socks: list of socket.socket
+
+    :param make_proxy: creates the proxy of a player from its connection
+    :type make_proxy: (socket.socket, Codec) -> PlayerProxy
+
+    :rtype: GameResult
+
+    :raises: ValueError if the order does not match the connections
+    """
+
+    if len(order) != len(socks):
+        raise ValueError('every seat needs exactly one connection')
+
+    summaries = {}
+    players = []
+    for seat, ((name, codec, jpolicy), sock) in enumerate(
+            zip(order, socks), 1):
+        proxy = make_proxy(sock, codec)
+        if jpolicy is not None:
+            proxy.policy = FeedingPolicy.from_json(jpolicy)
+        proxy.report = partial(summaries.__setitem__, seat)
+        players.append(Player(id=(seat, name), proxy=proxy))
+
+    final_scores = Dealer(players=players).run_game()
+    return {
+        'scores': [[player_id[0], score] for player_id, score in final_scores],
+        'latency': sorted([seat, summary]
+                          for seat, summary in summaries.items())
+    }
+
+
+class Supervisor(MatchmakingServer):
+    """Matches players and hands their games to a pool of worker processes
+
+    The supervisor owns the listener, the handshakes and the queue. Every
+    game formed is sent to an idle worker over a Unix socket, together with
+    the players' connections, and waits in a backlog while every worker is
+    busy. Workers live across games and send back scores and latency
+    summaries; a worker that dies only loses the game it was playing and
+    is replaced.
+    """
+
+    def __init__(self, listener, ratings, queue=None, num_workers=None,
+                 handshake_seconds=HANDSHAKE_SECONDS,
+                 from_signup=RemotePlayerProxy.from_signup,
+                 make_proxy=make_proxy, report=None, report_latency=None):
+        """
+        :attr num_workers: worker processes playing games, one per core by
+                           default
+        :type num_workers: Natural+
+
+        :attr make_proxy: creates a player's proxy inside a worker
+        :type make_proxy: (socket.socket, Codec) -> PlayerProxy
+
+        :attr report_latency: (optional) called with the name and latency
+                              summary of every player of a finished game
+        :type report_latency: (JSON, dict) -> None
+
+        :attr failures: games lost, by whether the game raised an error or
+                        its worker died
+        :type failures: Counter of str
+
+        :attr games_per_worker: games finished by each worker process
+        :type games_per_worker: Counter of int
+        """
+
+        super().__init__(listener, ratings, queue, handshake_seconds,
+                         from_signup, report)
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.make_proxy = make_proxy
+        self.report_latency = report_latency
+        self.failures = Counter()
+        self.games_per_worker = Counter()
+
+        self._workers = {}
+        self._idle = deque()
+        self._backlog = deque()
+        self._selector = None
+
+    def serve(self, max_games=None):
+        """Matches players like MatchmakingServer, then stops the workers
+
+        :param max_games: (optional) games to play, forever if None
+        :type max_games: Natural+ or None
+        """
+
+        try:
+            super().serve(max_games)
+        finally:
+            for channel, pid in list(self._workers.items()):
+                channel.close()
+                os.waitpid(pid, 0)
+            self._workers = {}
+            self._idle.clear()
+            for players in self._backlog:
+                for _, proxy in players:
+                    proxy.sock.close()
+            self._backlog.clear()
+            self._selector = None
+
+    def _open(self, selector):
+        """Starts the workers, watching their channels for results
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+        """
+
+        self._selector = selector
+        for _ in range(self.num_workers):
+            self._spawn()
+
+    def _spawn(self):
+        """Forks a worker process and marks it idle"""
+
+        channel, worker_channel = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        pid = os.fork()
+        if pid == 0:
+            channel.close()
+            self._work(worker_channel)
+
+        worker_channel.close()
+        self._workers[channel] = pid
+        self._idle.append(channel)
+        self._selector.register(channel, selectors.EVENT_READ)
+
+    def _work(self, channel):
+        """Runs a worker in the forked child
+
+        Never returns; the child exits once the supervisor hangs up.
+
+        :param channel: Unix socket to the supervisor
+        :type channel: socket.socket
+        """
+
+        status = 1
+        try:
+            self._selector.close()
+            self.listener.close()
+            for sock in list(self._waiting) + [
+                    handshake.sock for handshake in self._handshakes.values()]:
+                sock.close()
+            for players in self._backlog:
+                for _, proxy in players:
+                    proxy.sock.close()
+            for other in self._workers:
+                other.close()
+
+            work(channel, self.make_proxy)
+            status = 0
+        finally:
+            os._exit(status)
+
+    def _start_game(self, selector, lobby):
+        """Hands the lobby's game to an idle worker, or backlogs it
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+
+        :param lobby: players of the game
+        :type lobby: list of QueueEntry
+        """
+
+        players = [self._waiting.pop(entry.key) for entry in lobby]
+        for _, proxy in players:
+            selector.unregister(proxy.sock)
+        self._backlog.append(players)
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hands backlogged games to idle workers"""
+
+        while self._backlog and self._idle:
+            players = self._backlog.popleft()
+            channel = self._idle.popleft()
+
+            order = [[name, proxy.codec,
+                      proxy.policy.to_json() if proxy.policy else None]
+                     for name, proxy in players]
+            try:
+                socket.send_fds(
+                    channel, [json.dumps(order).encode('utf-8')],
+                    [proxy.sock.fileno() for _, proxy in players])
+            except OSError:
+                self.failures['crash'] += 1
+                self.games_played += 1
+                self._release([name for name, _ in players])
+                self._replace(channel)
+            else:
+                self._games[channel] = [name for name, _ in players]
+            finally:
+                for _, proxy in players:
+                    proxy.sock.close()
+
+    def _leave(self, selector, sock):
+        """Takes a worker's result, or drops a player who left the queue
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+
+        :param sock: readable worker channel or player connection
+        :type sock: socket.socket
+        """
+
+        if sock in self._workers:
+            self._finish(selector, sock)
+        else:
+            super()._leave(selector, sock)
+
+    def _finish(self, selector, channel):
+        """Records the result a worker sent back, replacing a dead worker
+
+        :param selector: selector watching the server's sockets
+        :type selector: selectors.BaseSelector
+
+        :param channel: readable channel to the worker
+        :type channel: socket.socket
+        """
+
+        try:
+            msg = channel.recv(MESSAGE_SIZE)
+        except OSError:
+            msg = b''
+
+        names = self._games.pop(channel, None)
+        if names is not None:
+            self.games_played += 1
+
+        if not msg:
+            if names is not None:
+                self.failures['crash'] += 1
+                self._release(names)
+            self._replace(channel)
+            self._dispatch()
+            return
+
+        self._idle.append(channel)
+        self.games_per_worker[self._workers[channel]] += 1
+        result = json.loads(msg.decode('utf-8'))
+        if 'error' in result:
+            self.failures['error'] += 1
+        else:
+            self._record_game(names, result['scores'])
+            if self.report_latency:
+                for seat, summary in result['latency']:
+                    self.report_latency(names[seat-1], summary)
+        self._release(names)
+        self._dispatch()
+
+    def _replace(self, channel):
+        """Reaps a dead worker and spawns another in its place
+
+        :param channel: channel to the dead worker
+        :type channel: socket.socket
+        """
+
+        pid = self._workers.pop(channel)
+        if channel in self._idle:
+            self._idle.remove(channel)
+        self._selector.unregister(channel)
+        channel.close()
+        os.waitpid(pid, 0)
+        self._spawn()
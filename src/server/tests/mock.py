@@ -14,7 +14,26 @@ class MockPlayerProxy:
         pass
 
 
-class MockCheatingPlayer:
+class MockDisconnectedProxy(MockPlayerProxy):
+    def start(self, *args):
+        raise BlockingIOError
+
+    def end_game(self):
+        pass
+
+
+class MockSeatedPlayer:
+    # adds nothing to the state hash of the dealer seating it
+
+    _state_hash = 0
+    _seat = None
+    _dealer = None
+
+    def _reseat(self, seat):
+        self._seat = seat
+
+
+class MockCheatingPlayer(MockSeatedPlayer):
     def can_feed(self, watering_hole, opponents):
         return True
 
@@ -28,7 +47,7 @@ class MockCheatingPlayer:
         pass
 
 
-class MockCardPlayPlayer:
+class MockCardPlayPlayer(MockSeatedPlayer):
     def __eq__(self, other):
         return isinstance(other, MockCardPlayPlayer)
 
@@ -8,7 +8,8 @@ from evolution.server.feeding import (
 from evolution.server.player import Player
 from evolution.server.species import Species
 from evolution.server.tests.mock import (
-    MockPlayerProxy, MockCheatingPlayer, MockCardPlayPlayer)
+    MockCardPlayPlayer, MockCheatingPlayer, MockDisconnectedProxy,
+    MockPlayerProxy)
 
 
 def test_give_cards():
@@ -33,6 +34,7 @@ def test_give_cards():
     updated_deck = [Card(3, Trait.carnivore), Card(1, Trait.horns)]
     assert player_to_receive_cards == dealer.players[1]
     assert updated_deck == dealer.deck
+    assert len(deck) == 4
 
 
 def test_remove_extinct():
@@ -170,6 +172,17 @@ def test_handle_cheating_player_play_cards():
     assert before_dealer == after_dealer
 
 
+def test_handle_cheating_player_start():
+    players = [
+        Player(id=1, proxy=MockPlayerProxy()),
+        Player(id=2, proxy=MockDisconnectedProxy()),
+    ]
+    dealer = Dealer(players=players, deck=[Card(1, Trait.horns)] * 10)
+
+    dealer.start_turn()
+    assert [player._id for player in dealer.players] == [1]
+
+
 def test_handle_cheating_player_feedNext():
     players = [
         MockCheatingPlayer(),
@@ -182,6 +195,16 @@ def test_handle_cheating_player_feedNext():
     assert before_dealer == after_dealer
 
 
+def test_cheater_feeding_last_passes_feeding_to_first():
+    player = Player(id=1, proxy=MockPlayerProxy(), boards=[Species()])
+    dealer = Dealer(players=[player, MockCheatingPlayer()], watering_hole=1)
+    dealer.current_feeding_index = 1
+
+    dealer.feed_step()
+    assert dealer.players == [player]
+    assert dealer.current_feeding_index == 0
+
+
 def test_is_game_over():
     players = [
         Player(id=1, proxy=MockPlayerProxy(), boards=[], bag=4),
@@ -196,7 +219,7 @@ def test_is_game_over():
     dealer = Dealer(players=players, watering_hole=0, deck=deck)
     assert dealer._is_game_over() is True
 
-    deck.append(Card(3, Trait.carnivore))
+    dealer.deck = deck + [Card(3, Trait.carnivore)]
     assert dealer._is_game_over() is False
 
 
@@ -1057,3 +1080,45 @@ class TestFatTissueTransferOneToken(BaseTestFeeding):
 
         cls.expected_dealer = Dealer(
             players=expected_players, watering_hole=0, deck=[])
+
+
+def test_snapshot_restore():
+
+    fat_tissue = Species(
+        food=1, body=3, population=2, traits=[Trait.fat_tissue], fat_food=2)
+    players = [
+        Player(id=1, proxy=MockPlayerProxy(), boards=[fat_tissue], bag=4,
+               cards=[Card(2, Trait.horns)]),
+        Player(id=2, proxy=MockPlayerProxy(), boards=[Species()], bag=2),
+        Player(id=3, proxy=MockPlayerProxy(), boards=[], bag=5),
+    ]
+    dealer = Dealer(players=players, watering_hole=4, deck=Dealer._make_deck())
+    dealer.current_feeding_index = 2
+    dealer.turn = 3
+
+    proxies = [MockPlayerProxy() for _ in players]
+    restored = Dealer.restore(dealer.snapshot(), proxies)
+
+    assert restored == dealer
+    assert restored.current_feeding_index == 2
+    assert restored.turn == 3
+    assert [player.proxy for player in restored.players] == proxies
+
+
+def test_restored_dealer_is_independent():
+
+    players = [
+        Player(id=1, proxy=MockPlayerProxy(), boards=[Species()]),
+        Player(id=2, proxy=MockPlayerProxy(), boards=[Species()]),
+        Player(id=3, proxy=MockPlayerProxy(), boards=[Species()]),
+    ]
+    dealer = Dealer(players=players, watering_hole=4, deck=Dealer._make_deck())
+    snapshot = dealer.snapshot()
+
+    fork = Dealer.restore(snapshot)
+    fork.players[0].try_feed(0, fork)
+    fork.give_cards(fork.players[1], 3)
+
+    assert Dealer.restore(snapshot) == dealer
+    assert dealer.watering_hole == 4
+    assert dealer.players[0].boards[0].food == 0
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+from pytest import raises
+
+from evolution.client.dealer_proxy import StaticDealerProxy
+from evolution.core.trait import Trait
+from evolution.server.dealer import Dealer
+from evolution.server.direct_proxy import DirectPlayerProxy
+from evolution.server.player import Player
+from evolution.server.player_proxy import StaticPlayerProxy
+from evolution.server.species import Species
+
+
+def play_game(make_proxy, num_players):
+
+    players = [Player(id=i+1, proxy=make_proxy()) for i in range(num_players)]
+    dealer = Dealer(players=players)
+    return dealer, dealer.run_game()
+
+
+def test_direct_proxy_matches_static_proxy():
+
+    for num_players in range(3, 9):
+        static_game = play_game(
+            lambda: StaticPlayerProxy(external=StaticDealerProxy()),
+            num_players)
+        assert play_game(DirectPlayerProxy, num_players) == static_game
+        assert play_game(
+            lambda: DirectPlayerProxy(validate=True),
+            num_players) == static_game
+
+
+def test_direct_proxy_views_are_read_only():
+
+    def play_cards(player, before, after):
+        player.boards[0].food = 3
+
+    species = Species(food=1, body=2, population=3, traits=[Trait.horns])
+    player = Player(id=1, proxy=None, boards=[species], cards=[])
+
+    with raises(AttributeError):
+        DirectPlayerProxy(play_cards=play_cards).choose(player, [], [])
+    assert species.food == 1
+
+
+def test_remote_proxies_do_not_load_the_client():
+    check = (
+        'import sys, evolution.server.player_proxy\n'
+        'assert not any(name.startswith("evolution.client")\n'
+        '               for name in sys.modules)')
+
+    path = os.pathsep.join(sys.path)
+    subprocess.check_call([sys.executable, '-c', check],
+                          env=dict(os.environ, PYTHONPATH=path))
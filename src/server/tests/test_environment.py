@@ -0,0 +1,118 @@
+from random import Random
+
+from pytest import importorskip, raises
+
+np = importorskip('numpy')
+
+from evolution.server.dealer import Dealer  # noqa: E402
+from evolution.server.direct_proxy import DirectPlayerProxy  # noqa: E402
+from evolution.server.environment import (  # noqa: E402
+    CHOOSE, FEED, FEEDING_INDEX, FEEDINGS, SelfPlayEnv, SelfPlayGame)
+from evolution.server.feeding import NoFeeding  # noqa: E402
+from evolution.server.matchmaking import MAX_PLAYERS  # noqa: E402
+from evolution.server.player import Player  # noqa: E402
+
+
+def play_to_feeding(game):
+    while game.phase != FEED:
+        game.step(None)
+
+
+def test_default_actions_play_the_dealers_game():
+    game = SelfPlayGame(4, Random(3))
+    game.reset()
+    while not game.done:
+        game.step(None)
+
+    deck = Dealer._make_deck()
+    Random(3).shuffle(deck)
+    dealer = Dealer(
+        players=[Player(id=seat, proxy=DirectPlayerProxy())
+                 for seat in range(4)],
+        deck=deck)
+    while not dealer._is_game_over():
+        dealer.play_turn()
+
+    assert dict(dealer.final_scores()) == dict(enumerate(game.scores()))
+
+
+def test_mask_holds_the_legal_feedings():
+    env = SelfPlayEnv(1, 3, seed=5)
+    env.reset()
+    [game] = env.games
+    play_to_feeding(game)
+
+    player = game.dealer.players[game.dealer.current_feeding_index]
+    choices = player.get_feeding_choices(
+        game.dealer.watering_hole, game.dealer._current_opponents())
+    observation = env._observe()
+
+    assert observation['phase'][0] == FEED
+    assert observation['seat'][0] == player._id
+    assert sorted(np.flatnonzero(observation['mask'][0])) == sorted(
+        FEEDING_INDEX[feeding] for feeding in choices | {NoFeeding()})
+
+
+def test_illegal_feeding_removes_the_player():
+    game = SelfPlayGame(3, Random(5))
+    game.reset()
+    play_to_feeding(game)
+    player = game.dealer.players[game.dealer.current_feeding_index]
+    choices = player.get_feeding_choices(
+        game.dealer.watering_hole, game.dealer._current_opponents())
+    illegal = next(index for index, feeding in enumerate(FEEDINGS)
+                   if feeding not in choices | {NoFeeding()})
+
+    game.step(illegal)
+
+    assert player not in game.dealer.players
+    assert player in game.seats
+
+
+def test_card_plays_are_taken_as_action4():
+    game = SelfPlayGame(3, Random(1))
+    game.reset()
+    player = game.dealer.players[0]
+    cards = list(player.cards)
+
+    game.step([0, [], [], [[1]], []])
+
+    assert game.phase == CHOOSE
+    assert len(player.boards) == 2
+    assert player.cards == cards[2:]
+
+
+def test_rewards_add_up_to_the_final_scores():
+    env = SelfPlayEnv(2, 3, seed=0)
+    env.reset()
+    starting_scores = np.array([game.scores() for game in env.games])
+    totals = np.zeros_like(starting_scores)
+
+    done = False
+    while not done:
+        _, rewards, dones, infos = env.step([None, None])
+        totals += rewards
+        done = dones[0]
+        if done:
+            final_scores = infos[0]['final_scores']
+
+    assert (totals[0] + starting_scores[0]).tolist() == final_scores
+    assert not env.games[0].done
+
+
+def test_step_needs_an_action_for_every_game():
+    env = SelfPlayEnv(2, 3)
+    env.reset()
+
+    with raises(ValueError):
+        env.step([None])
+
+
+def test_number_of_players_must_fit_a_game():
+    for num_players in [0, MAX_PLAYERS + 1]:
+        with raises(ValueError):
+            SelfPlayGame(num_players, Random(0))
+        with raises(ValueError):
+            SelfPlayEnv(0, num_players)
+
+    assert len(SelfPlayEnv(1, MAX_PLAYERS).reset()['seat']) == 1
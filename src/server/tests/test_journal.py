@@ -0,0 +1,85 @@
+from collections import deque
+import io
+
+from pytest import raises
+
+from evolution.client.dealer_proxy import StaticDealerProxy
+from evolution.server.action import AddSpecies, AddToWateringHole
+from evolution.server.dealer import Dealer
+from evolution.server.feeding import CarnivoreFeeding, NoFeeding
+from evolution.server.journal import Journal, ReplayProxy
+from evolution.server.player import Player
+from evolution.server.player_proxy import StaticPlayerProxy
+
+
+class TimeoutProxy:
+    def feedNext(self, *args):
+        raise TimeoutError
+
+
+def play_journaled_game(journal, num_players=4):
+    players = [
+        Player(id=i+1, proxy=StaticPlayerProxy(external=StaticDealerProxy()))
+        for i in range(num_players)
+    ]
+    dealer = Dealer(players=players, journal=journal)
+    return dealer, dealer.run_game()
+
+
+def test_replay_whole_game():
+    stream = io.StringIO()
+    dealer, final_scores = play_journaled_game(Journal(stream))
+
+    journal = Journal.load(io.StringIO(stream.getvalue()))
+    replayed = journal.replay()
+
+    assert replayed == dealer
+    assert replayed.final_scores() == final_scores
+
+
+def test_replay_seeks_from_earlier_snapshot():
+    journal = Journal(snapshot_interval=2)
+    play_journaled_game(journal)
+
+    at_snapshot = journal.replay(turn=2)
+
+    without_snapshot = Journal()
+    without_snapshot.entries = [
+        entry for entry in journal.entries
+        if entry[:2] != ['snapshot', 2]
+    ]
+    assert without_snapshot.replay(turn=2) == at_snapshot
+    assert at_snapshot.turn == 2
+
+
+def test_journal_records_errors():
+    journal = Journal()
+    dealer = Dealer(players=[Player(id=1, proxy=TimeoutProxy())])
+    journal.begin(dealer)
+
+    with raises(TimeoutError):
+        dealer.players[0].proxy.feedNext(None, 1, [])
+    assert journal.entries == [['feedNext', 0, ['error', 'timeout']]]
+
+
+def test_replay_proxy():
+    proxy = ReplayProxy(deque([
+        ('choose', ['ok', [1, [['AddSpecies', 0, [2]]]]]),
+        ('feedNext', ['ok', ['CarnivoreFeeding', 0, 1, 2]]),
+        ('feedNext', ['ok', ['NoFeeding']]),
+        ('feedNext', ['error', 'disconnect']),
+    ]))
+
+    assert proxy.choose(None, [], []) == (
+        AddToWateringHole(1), [AddSpecies(0, [2])])
+    assert proxy.feedNext(None, 1, []) == CarnivoreFeeding(0, 1, 2)
+    assert proxy.feedNext(None, 1, []) == NoFeeding()
+    with raises(OSError):
+        proxy.feedNext(None, 1, [])
+    with raises(ValueError):
+        proxy.feedNext(None, 1, [])
+
+
+def test_replay_without_snapshot():
+    with raises(ValueError):
+        Journal().replay()
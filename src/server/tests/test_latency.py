@@ -0,0 +1,91 @@
+import socket
+import time
+
+from pytest import raises
+
+from evolution.core.codec import CHOOSE_FRAME, FEED_NEXT_FRAME
+from evolution.core.connection import read_msg, send_msg
+from evolution.server.feeding import VegetarianFeeding
+from evolution.server.latency import LatencyHistogram, LatencyTracker
+from evolution.server.player import Player
+from evolution.server.player_proxy import MAX_REPLY_BYTES, RemotePlayerProxy
+from evolution.server.species import Species
+from evolution.server.tests.mock import MockPlayerProxy
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for sample in range(1, 101):
+        histogram.record(sample / 100)
+
+    assert histogram.summary() == {
+        'count': 100, 'p50': 0.5, 'p95': 0.95, 'max': 1.0}
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().summary() == {
+        'count': 0, 'p50': 0, 'p95': 0, 'max': 0}
+
+
+def test_tracker_soft_budget():
+    tracker = LatencyTracker(soft_budget=0.5, hard_budget=1)
+    tracker.record('feedNext', 0.1)
+    assert not tracker.is_slow()
+
+    tracker.record('feedNext', 0.7)
+    assert tracker.is_slow()
+    assert tracker.summary()['soft_budget_exceeded'] == {'feedNext': 1}
+
+
+def test_tracker_hard_budget():
+    tracker = LatencyTracker(soft_budget=0.01, hard_budget=0.05)
+
+    with raises(TimeoutError):
+        tracker.measure('choose', time.sleep, 1)
+
+    summary = tracker.summary()
+    assert summary['hard_budget_exceeded'] == {'choose': 1}
+    assert summary['messages']['choose']['count'] == 1
+    assert summary['slow']
+
+
+def test_tracker_invalid_budgets():
+    with raises(ValueError):
+        LatencyTracker(soft_budget=2, hard_budget=1)
+
+
+def test_remote_proxy_reports_latency():
+    server_sock, client_sock = socket.socketpair()
+    summaries = []
+    proxy = RemotePlayerProxy(server_sock, report=summaries.append)
+    player = Player(id=1, proxy=MockPlayerProxy(), boards=[Species()])
+
+    send_msg(0, client_sock)
+    assert proxy.feedNext(player, 3, []) == VegetarianFeeding(0)
+    assert read_msg(client_sock) == [
+        0, [player.boards[0].to_json()], [], 3, []]
+
+    proxy.end_game()
+    [summary] = summaries
+    assert summary['messages']['feedNext']['count'] == 1
+    assert not summary['slow']
+    client_sock.close()
+
+
+def test_remote_proxy_counts_rejected_replies():
+    server_sock, client_sock = socket.socketpair()
+    summaries = []
+    proxy = RemotePlayerProxy(server_sock, report=summaries.append,
+                              max_reply_bytes={FEED_NEXT_FRAME: 4})
+    player = Player(id=1, proxy=MockPlayerProxy(), boards=[Species()])
+
+    client_sock.sendall(b'[0, 0, 0]')
+    with raises(ValueError):
+        proxy.feedNext(player, 3, [])
+
+    proxy.end_game()
+    [summary] = summaries
+    assert summary['rejected'] == {'feedNext oversized': 1}
+    limit = MAX_REPLY_BYTES[CHOOSE_FRAME]
+    assert proxy.max_reply_bytes[CHOOSE_FRAME] == limit
+    client_sock.close()
@@ -0,0 +1,76 @@
+import time
+
+from evolution.core.connection import read_msg, send_msg
+from evolution.core.transport import connect, listen, tcp_address
+from evolution.server.lobby import Lobby
+
+
+def open_lobby(**kwargs):
+    listener = listen(tcp_address('localhost', 0))
+    return Lobby(listener, **kwargs), tcp_address(*listener.getsockname())
+
+
+def sign_up(address, name):
+    sock = connect(address)
+    send_msg(name, sock)
+    return sock
+
+
+def test_silent_connection_does_not_stall_sign_ups():
+    lobby, address = open_lobby(max_players=3, signup_seconds=5,
+                                handshake_seconds=5)
+    silent = connect(address)
+    clients = [sign_up(address, name) for name in ['a', 'b', 'c']]
+
+    started = time.monotonic()
+    signups = lobby.run()
+
+    assert time.monotonic() - started < 1
+    assert [name for name, _ in signups] == ['a', 'b', 'c']
+    assert [read_msg(client) for client in clients] == ['ok'] * 3
+    assert read_msg(silent) is None
+
+
+def test_handshake_deadline_drops_silent_connection():
+    lobby, address = open_lobby(signup_seconds=0.5, handshake_seconds=0.1)
+    silent = connect(address)
+    sign_up(address, 'a')
+
+    signups = lobby.run()
+
+    assert [name for name, _ in signups] == ['a']
+    assert lobby.rejected == {'timeout': 1}
+    assert read_msg(silent) is None
+
+
+def test_sign_up_split_across_packets():
+    lobby, address = open_lobby(max_players=1, signup_seconds=1)
+    client = connect(address)
+    client.sendall(b'["bot", {"co')
+    client.sendall(b'dec": "binary"}]')
+
+    [(name, proxy)] = lobby.run()
+
+    assert name == 'bot'
+    assert proxy.codec == 'binary'
+
+
+def test_oversized_sign_up_is_dropped():
+    lobby, address = open_lobby(signup_seconds=0.3)
+    client = connect(address)
+    client.sendall(b'["' + b'a' * 5000)
+
+    assert lobby.run() == []
+    assert lobby.rejected == {'oversized': 1}
+    assert read_msg(client) is None
+
+
+def test_lobby_closes_after_sign_up_window():
+    lobby, address = open_lobby(signup_seconds=0.2)
+    closed = connect(address)
+    closed.close()
+
+    started = time.monotonic()
+    assert lobby.run() == []
+    assert 0.2 <= time.monotonic() - started < 1
+    assert lobby.rejected == {'closed': 1}
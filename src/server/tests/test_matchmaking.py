@@ -0,0 +1,134 @@
+import selectors
+import socket
+from threading import Thread
+
+from evolution.client.host import BotHost
+from evolution.core.transport import listen, tcp_address
+from evolution.server.matchmaking import (
+    DEFAULT_RATING, MatchmakingServer, MatchQueue, RatingBook)
+from evolution.server.player_proxy import RemotePlayerProxy
+
+
+def keys(lobby):
+    return [entry.key for entry in lobby]
+
+
+def sign_up(server, names):
+    selector = selectors.DefaultSelector()
+    for name in names:
+        sock, _ = socket.socketpair()
+        server._signups.append((name, RemotePlayerProxy(sock)))
+    server._enqueue(selector, now=0)
+    return [name for name, _ in server._waiting.values()]
+
+
+def test_winner_gains_rating():
+    ratings = RatingBook()
+    ratings.record_game(['a', 'b', 'c'], [5, 3, None])
+
+    assert ratings.rating('a') > ratings.rating('b') > ratings.rating('c')
+    assert ratings.rating('d') == DEFAULT_RATING
+    assert abs(sum(ratings.ratings.values()) - 3 * DEFAULT_RATING) < 1e-6
+
+
+def test_ratings_persist(tmp_path):
+    path = str(tmp_path / 'ratings.json')
+    ratings = RatingBook(path)
+    ratings.record_game([['bot', 1], 'b', 'c'], [1, 0, 0])
+    ratings.save()
+
+    assert RatingBook(path).ratings == ratings.ratings
+    assert RatingBook(path).rating(['bot', 1]) > DEFAULT_RATING
+
+
+def test_players_signing_up_alike_are_rated_apart():
+    ratings = RatingBook()
+    reported = {}
+    server = MatchmakingServer(
+        listen(tcp_address('localhost', 0)), ratings,
+        report=lambda names, scores: reported.update(
+            (name, ratings.rating(name)) for name in names))
+    names = sign_up(server, ['alice', 'hello', 'alice', 'hello'])
+
+    assert names[0] == 'alice'
+    assert len(set(names)) == 4
+    assert len(set(sign_up(server, ['alice', 'bob']))) == 6
+
+    server._record_game(names, [[1, 2], [2, 5], [3, 1], [4, 0]])
+    assert (reported[names[1]] > reported['alice'] > DEFAULT_RATING >
+            reported[names[2]] > reported[names[3]])
+    assert ratings.ratings == {'alice': reported['alice']}
+
+    server._release(names)
+    assert sign_up(server, ['alice'])[-1] == 'alice'
+
+
+def test_full_lobby_starts_at_once():
+    queue = MatchQueue(min_players=3, max_players=4)
+    for key in range(5):
+        queue.add(key, DEFAULT_RATING, now=key)
+
+    assert keys(queue.form_lobby(now=4)) == [0, 1, 2, 3]
+    assert len(queue) == 1
+    assert queue.form_lobby(now=4) is None
+
+
+def test_smaller_lobby_waits_for_players():
+    queue = MatchQueue(min_players=3, max_players=8, fill_seconds=2)
+    for key in range(3):
+        queue.add(key, DEFAULT_RATING, now=0)
+
+    assert queue.form_lobby(now=1) is None
+    assert keys(queue.form_lobby(now=2)) == [0, 1, 2]
+
+
+def test_lobbies_group_similar_ratings():
+    queue = MatchQueue(min_players=3, max_players=3, window=100,
+                       window_growth=0)
+    for key, rating in enumerate([1000, 2000, 1050, 2040, 990, 1980]):
+        queue.add(key, rating, now=key)
+
+    assert keys(queue.form_lobby(now=6)) == [0, 2, 4]
+    assert keys(queue.form_lobby(now=6)) == [1, 3, 5]
+
+
+def test_window_widens_with_wait():
+    queue = MatchQueue(min_players=3, max_players=3, window=100,
+                       window_growth=100)
+    for key, rating in enumerate([1000, 1300, 1600]):
+        queue.add(key, rating, now=0)
+
+    assert queue.form_lobby(now=1) is None
+    assert keys(queue.form_lobby(now=5)) == [0, 1, 2]
+
+
+def test_removed_player_leaves_queue():
+    queue = MatchQueue(min_players=3, max_players=3)
+    for key in range(3):
+        queue.add(key, DEFAULT_RATING, now=0)
+    queue.remove(1)
+
+    assert 1 not in queue
+    assert queue.form_lobby(now=10) is None
+
+
+def test_server_plays_games_and_updates_ratings(tmp_path):
+    listener = listen(tcp_address('localhost', 0))
+    ratings = RatingBook(str(tmp_path / 'ratings.json'))
+    reports = []
+    server = MatchmakingServer(
+        listener, ratings, MatchQueue(min_players=3, max_players=4),
+        report=lambda names, scores: reports.append(
+            {name: ratings.rating(name) for name in names}))
+
+    bot_host = BotHost(tcp_address(*listener.getsockname()), 8)
+    thread = Thread(target=bot_host.run)
+    thread.daemon = True
+    thread.start()
+    server.serve(max_games=2)
+    thread.join(5)
+
+    assert bot_host.finished == 8
+    assert [len(game) for game in reports] == [4, 4]
+    assert len(set(reports[0]) | set(reports[1])) == 8
+    assert RatingBook(ratings.path).ratings == ratings.ratings == {}
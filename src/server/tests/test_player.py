@@ -1,5 +1,7 @@
 import unittest
 
+from random import Random
+
 from pytest import raises
 
 from evolution.core.trait import Trait
@@ -7,6 +9,7 @@ from evolution.server.action import (
     AddToWateringHole, AddBody, AddPopulation, AddSpecies, ReplaceTrait)
 from evolution.server.card import Card
 from evolution.server.exception import CheatingPlayerException
+from evolution.server.dealer import Dealer
 from evolution.server.feeding import (
     VegetarianFeeding, CarnivoreFeeding, FatTissueFeeding)
 from evolution.server.player import Player
@@ -70,7 +73,9 @@ def test_remove_extinct():
         bag=3)
 
     after_player = before_player.copy()
-    assert before_player.remove_extinct() == 2
+    boards = before_player.boards
+    assert before_player.remove_extinct() == [None, 0, 1, None]
+    assert before_player.boards is boards
 
     after_player.boards = [not_extinct.copy(), not_extinct.copy()]
     assert before_player == after_player
@@ -342,6 +347,89 @@ class TestGetFeedingChoices(BasePlayerTest, unittest.TestCase):
             self.before_player.get_feeding_choices(10, opponents), choices)
 
 
+def test_trait_index_follows_card_plays():
+    player = Player(
+        id=1, proxy=MockPlayerProxy(), cards=[
+            Card(1, Trait.scavenger), Card(2, Trait.fertile),
+            Card(3, Trait.long_neck), Card(0, Trait.fertile)],
+        boards=[Species(traits=[Trait.scavenger, Trait.carnivore])])
+
+    AddSpecies(0, [1, 2]).apply(player)
+    assert player.species_with(Trait.fertile) == [1]
+    assert player.species_with(Trait.scavenger) == [0]
+
+    ReplaceTrait(0, 0, 3).apply(player)
+    assert player.species_with(Trait.scavenger) == []
+    assert player.species_with(Trait.fertile) == [0, 1]
+    assert player.species_with(Trait.carnivore) == [0]
+
+
+def test_trait_index_follows_extinction():
+    player = Player(id=1, proxy=MockPlayerProxy(), boards=[
+        Species(population=0, traits=[Trait.long_neck]),
+        Species(traits=[Trait.scavenger]),
+        Species(traits=[Trait.long_neck])])
+
+    assert player.remove_extinct() == [None, 0, 1]
+    assert player.species_with(Trait.long_neck) == [1]
+    assert player.species_with(Trait.scavenger) == [0]
+    assert player.copy().trait_index == player.trait_index
+
+
+def feed_recursively(boards, species_index, watering_hole):
+    """Feeding as resolved one Python frame per cooperation token"""
+
+    tokens = boards[species_index].try_eat(watering_hole)
+    watering_hole -= tokens
+    for _ in range(tokens):
+        if (Trait.cooperation in boards[species_index].traits and
+                species_index + 1 < len(boards)):
+            watering_hole = feed_recursively(
+                boards, species_index + 1, watering_hole)
+    return watering_hole
+
+
+def test_feed_each_matches_recursive_cooperation():
+    rng = Random(41)
+    traits = [Trait.cooperation, Trait.foraging, Trait.long_neck]
+
+    for _ in range(500):
+        boards = []
+        for _ in range(rng.randint(1, 8)):
+            population = rng.randint(1, 7)
+            boards.append(Species(
+                food=rng.randint(0, population), population=population,
+                traits=rng.sample(traits, rng.randint(0, 3))))
+        roots = sorted(rng.sample(range(len(boards)),
+                                  rng.randint(1, min(3, len(boards)))))
+        watering_hole = rng.randint(0, 30)
+
+        expected = [species.copy() for species in boards]
+        expected_watering_hole = watering_hole
+        for root in roots:
+            expected_watering_hole = feed_recursively(
+                expected, root, expected_watering_hole)
+
+        player = Player(id=1, proxy=MockPlayerProxy(), boards=boards)
+        dealer = Dealer(players=[player], watering_hole=watering_hole)
+        player.feed_each(roots, dealer)
+
+        assert player.boards == expected
+        assert dealer.watering_hole == expected_watering_hole
+
+
+def test_long_cooperation_chain_takes_no_recursion():
+    boards = [Species(population=7, traits=[Trait.cooperation, Trait.foraging])
+              for _ in range(5000)]
+    player = Player(id=1, proxy=MockPlayerProxy(), boards=boards)
+    dealer = Dealer(players=[player], watering_hole=10 ** 6)
+
+    assert player.try_feed(0, dealer)
+    assert [boards[0].food, boards[1].food, boards[-1].food] == [2, 4, 7]
+    assert dealer.watering_hole == 10 ** 6 - sum(
+        species.food for species in boards)
+
+
 class TestAttackableBoards(BasePlayerTest, unittest.TestCase):
     def setUp(self):
         super().setUp()
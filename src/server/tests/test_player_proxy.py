@@ -1,10 +1,27 @@
+import json
+import socket
+from threading import Thread
+
 from pytest import raises
 
+from evolution.client.dealer_proxy import (
+    BaseDealerProxy, RemoteDealerProxy, StaticDealerProxy)
+from evolution.client.data import Opponent, Player as ClientPlayer
+from evolution.core.connection import read_msg
+from evolution.core.trait import Trait
+from evolution.core.transport import pipe
+
 from evolution.server.action import (
     AddToWateringHole, ReplaceTrait, AddSpecies, AddPopulation, AddBody)
 from evolution.server.feeding import(
     NoFeeding, VegetarianFeeding, FatTissueFeeding, CarnivoreFeeding)
-from evolution.server.player_proxy import BasePlayerProxy
+from evolution.server.card import Card
+from evolution.server.dealer import Dealer
+from evolution.server.player import Player
+from evolution.server.player_proxy import (
+    BasePlayerProxy, RemotePlayerProxy, StaticPlayerProxy)
+from evolution.server.species import Species
+from evolution.server.tests.mock import MockPlayerProxy
 
 
 def test_deserialize_action4():
@@ -46,3 +63,89 @@ def test_deserialize_invalid_feeding():
 
     with raises(ValueError):
         BasePlayerProxy._deserialize_feeding([1, 2, 3, 4])
+
+
+def test_encode_state_matches_json():
+
+    species = Species(
+        food=1, body=3, population=4,
+        traits=[Trait.fat_tissue, Trait.horns], fat_food=2)
+    player = Player(
+        id=1, proxy=None, boards=[species], bag=9,
+        cards=[Card(3, Trait.horns), Card(-8, Trait.carnivore)])
+    opponent = Player(id=2, proxy=None, boards=[Species(), species.copy()])
+
+    payload = BasePlayerProxy._encode_state(player, 4, [opponent])
+    jstate = BasePlayerProxy._serialize_state(player, 4, [opponent])
+
+    decoded_player, watering_hole, opponents = (
+        BaseDealerProxy._decode_state(payload))
+    assert decoded_player == ClientPlayer.from_json(jstate[:3])
+    assert watering_hole == 4
+    assert opponents == [Opponent.from_json(jstate[4][0])]
+    assert len(payload) * 10 < len(json.dumps(jstate))
+
+
+def test_signup_negotiates_codec():
+
+    server_sock, client_sock = socket.socketpair()
+
+    name, proxy = RemotePlayerProxy.from_signup(
+        server_sock, ['bot', {'codec': 'binary'}])
+    assert name == 'bot'
+    assert proxy.codec == 'binary'
+    assert read_msg(client_sock) == ['ok', {'codec': 'binary'}]
+
+    name, proxy = RemotePlayerProxy.from_signup(server_sock, 'hello')
+    assert name == 'hello'
+    assert proxy.codec == 'json'
+    assert read_msg(client_sock) == 'ok'
+
+    name, proxy = RemotePlayerProxy.from_signup(
+        server_sock, ['hello', {'codec': 'gzip'}])
+    assert proxy.codec == 'json'
+    assert read_msg(client_sock) == 'ok'
+
+
+def play_game(make_proxy, num_players):
+
+    players = [Player(id=i+1, proxy=make_proxy()) for i in range(num_players)]
+    dealer = Dealer(players=players)
+    return dealer, dealer.run_game()
+
+
+def test_remote_proxy_over_pipe_matches_static_proxy():
+
+    def make_proxy():
+        dealer_end, player_end = pipe()
+        thread = Thread(target=RemoteDealerProxy(player_end).request_join)
+        thread.daemon = True
+        thread.start()
+        dealer_ends.append(dealer_end)
+        return RemotePlayerProxy.from_signup(
+            dealer_end, read_msg(dealer_end))[1]
+
+    dealer_ends = []
+    _, remote_scores = play_game(make_proxy, 4)
+    for dealer_end in dealer_ends:
+        dealer_end.close()
+
+    _, static_scores = play_game(
+        lambda: StaticPlayerProxy(external=StaticDealerProxy()), 4)
+    assert remote_scores == static_scores
+
+
+def test_player_not_reading_is_evicted():
+    dealer_end, player_end = pipe()
+    proxy = RemotePlayerProxy(dealer_end, max_queued_bytes=1 << 16,
+                              send_seconds=0.1)
+    players = [Player(id=1, proxy=proxy),
+               Player(id=2, proxy=MockPlayerProxy())]
+    dealer = Dealer(players=players)
+    dealer.deck = dealer._make_deck()
+
+    while len(dealer.players) == 2:
+        dealer.start_turn()
+
+    assert [player._id for player in dealer.players] == [2]
+    player_end.close()
@@ -0,0 +1,106 @@
+import socket
+from threading import Thread
+
+from pytest import raises
+
+from evolution.client.dealer_proxy import RemoteDealerProxy, StaticDealerProxy
+from evolution.client.strategy import GREEDY_POLICY
+from evolution.core.connection import read_msg
+from evolution.core.trait import Trait
+from evolution.core.transport import pipe
+from evolution.server.dealer import Dealer
+from evolution.server.feeding import (
+    CarnivoreFeeding, FatTissueFeeding, VegetarianFeeding)
+from evolution.server.player import Player
+from evolution.server.player_proxy import RemotePlayerProxy, StaticPlayerProxy
+from evolution.server.policy import FeedingPolicy
+from evolution.server.species import Species
+from evolution.server.tests.mock import MockPlayerProxy
+
+
+def make_player(id, boards):
+    return Player(id=id, proxy=MockPlayerProxy(), boards=boards)
+
+
+def test_kinds_are_tried_in_order():
+    player = make_player(1, [
+        Species(food=1, body=2, population=2, traits=[Trait.carnivore]),
+        Species(food=0, body=1, population=1),
+        Species(food=0, body=3, population=1, traits=[Trait.fat_tissue])])
+    opponents = [make_player(2, [Species(population=1)])]
+
+    policy = FeedingPolicy.from_json(GREEDY_POLICY)
+    assert policy.choose(player, 2, opponents) == FatTissueFeeding(2, 2)
+
+    policy = FeedingPolicy.from_json([['carnivore', ['food']],
+                                      ['vegetarian', ['body']]])
+    assert policy.choose(player, 2, opponents) == CarnivoreFeeding(0, 0, 0)
+
+    policy = FeedingPolicy.from_json([['vegetarian', ['body']]])
+    assert policy.choose(player, 2, opponents) == VegetarianFeeding(2)
+
+
+def test_policy_declines_when_nothing_applies():
+    player = make_player(1, [
+        Species(population=1, traits=[Trait.carnivore])])
+    opponents = [make_player(2, [Species(traits=[Trait.climbing])])]
+
+    policy = FeedingPolicy.from_json(GREEDY_POLICY)
+    assert policy.choose(player, 3, opponents) is None
+
+
+def test_invalid_policies_raise():
+    for jpolicy in ['greedy', [['omnivore', []]], [['carnivore', ['size']]],
+                    [['carnivore', []], ['carnivore', ['food']]],
+                    [['vegetarian', [['food']]]]]:
+        with raises(ValueError):
+            FeedingPolicy.from_json(jpolicy)
+
+    assert FeedingPolicy.from_json(GREEDY_POLICY).to_json() == GREEDY_POLICY
+
+
+def test_signup_accepts_policy():
+    server_sock, client_sock = socket.socketpair()
+
+    _, proxy = RemotePlayerProxy.from_signup(
+        server_sock, ['bot', {'policy': GREEDY_POLICY}])
+    assert proxy.policy.to_json() == GREEDY_POLICY
+    assert read_msg(client_sock) == ['ok', {'codec': 'json', 'policy': True}]
+
+    _, proxy = RemotePlayerProxy.from_signup(
+        server_sock, ['bot', {'policy': 'greedy'}])
+    assert proxy.policy is None
+    assert read_msg(client_sock) == ['ok', {'codec': 'json', 'policy': False}]
+
+
+def test_delegated_game_matches_static_game():
+    num_players = 4
+    dealer_ends = []
+    players = []
+    for i in range(num_players):
+        dealer_end, player_end = pipe()
+        bot = RemoteDealerProxy(player_end, policy=GREEDY_POLICY)
+        thread = Thread(target=bot.request_join)
+        thread.daemon = True
+        thread.start()
+        dealer_ends.append(dealer_end)
+        _, proxy = RemotePlayerProxy.from_signup(
+            dealer_end, read_msg(dealer_end))
+        players.append(Player(id=i+1, proxy=proxy))
+
+    proxies = [player.proxy for player in players]
+    final_scores = Dealer(players=players).run_game()
+    for dealer_end in dealer_ends:
+        dealer_end.close()
+
+    static_players = [
+        Player(id=i+1, proxy=StaticPlayerProxy(external=StaticDealerProxy()))
+        for i in range(num_players)]
+    assert final_scores == Dealer(players=static_players).run_game()
+
+    delegated = sum(proxy.delegated_feedings for proxy in proxies)
+    asked = sum(len(proxy.latency.histograms['feedNext'].samples)
+                for proxy in proxies
+                if 'feedNext' in proxy.latency.histograms)
+    assert delegated > 0
+    assert asked < delegated
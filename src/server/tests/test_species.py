@@ -591,3 +591,16 @@ class TestReplaceTrait(unittest.TestCase):
             Species(
                 food=1, body=1, population=1, traits=[Trait.fat_tissue],
                 fat_food=2))
+
+
+def test_snapshot_restore():
+    species = Species(
+        food=3, body=3, population=4,
+        traits=[Trait.fat_tissue, Trait.horns], fat_food=2)
+
+    snapshot = species.snapshot()
+    restored = Species.restore(snapshot)
+
+    assert restored == species
+    assert restored.traits is not species.traits
+    assert snapshot == (3, 3, 4, (Trait.fat_tissue.value, Trait.horns.value), 2)
@@ -0,0 +1,64 @@
+import os
+from threading import Thread
+
+from evolution.client.host import BotHost
+from evolution.core.transport import listen, tcp_address
+from evolution.server.matchmaking import MatchQueue, RatingBook
+from evolution.server.supervisor import Supervisor
+
+
+def serve_bots(num_bots, max_games, **kwargs):
+    listener = listen(tcp_address('localhost', 0))
+    supervisor = Supervisor(
+        listener, RatingBook(),
+        MatchQueue(min_players=3, max_players=4), **kwargs)
+
+    bot_host = BotHost(tcp_address(*listener.getsockname()), num_bots)
+    thread = Thread(target=bot_host.run)
+    thread.daemon = True
+    thread.start()
+    supervisor.serve(max_games=max_games)
+    thread.join(5)
+    listener.close()
+    return supervisor, bot_host
+
+
+def test_workers_play_games_and_report_back():
+    reports = []
+    latencies = []
+    supervisor, bot_host = serve_bots(
+        8, 2, num_workers=2,
+        report=lambda names, scores: reports.append(names),
+        report_latency=lambda name, summary: latencies.append(summary))
+
+    assert bot_host.finished == 8
+    assert [len(game) for game in reports] == [4, 4]
+    assert len(set(reports[0]) | set(reports[1])) == 8
+    assert len(latencies) == 8
+    assert all('start' in summary['messages'] for summary in latencies)
+    assert sum(supervisor.games_per_worker.values()) == 2
+    assert not supervisor.failures
+    assert supervisor.ratings.ratings == {}
+
+
+def test_game_error_only_fails_its_game():
+    def make_proxy(sock, codec):
+        raise ValueError('broken proxy')
+
+    supervisor, bot_host = serve_bots(
+        4, 1, num_workers=1, make_proxy=make_proxy)
+
+    assert supervisor.failures == {'error': 1}
+    assert bot_host.finished + sum(bot_host.failures.values()) == 4
+    assert not supervisor.ratings.ratings
+
+
+def test_dead_worker_is_replaced():
+    def make_proxy(sock, codec):
+        os._exit(1)
+
+    supervisor, bot_host = serve_bots(
+        8, 2, num_workers=1, make_proxy=make_proxy)
+
+    assert supervisor.failures == {'crash': 2}
+    assert bot_host.finished + sum(bot_host.failures.values()) == 8
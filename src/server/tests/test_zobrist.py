@@ -0,0 +1,178 @@
+from random import Random
+
+from evolution.core.trait import Trait
+from evolution.server.card import Card
+from evolution.server.dealer import Dealer
+from evolution.server.direct_proxy import DirectPlayerProxy
+from evolution.server.player import Player
+from evolution.server.species import Species
+from evolution.server.zobrist import FOOD, Keys, derive
+
+
+def assert_up_to_date(dealer):
+    fresh = Dealer.restore(dealer.snapshot())
+
+    assert dealer.state_hash() == fresh.state_hash()
+    for player, fresh_player in zip(dealer.players, fresh.players):
+        assert player.state_hash() == fresh_player.state_hash()
+        for species, fresh_species in zip(player.boards, fresh_player.boards):
+            assert species.state_hash() == fresh_species.state_hash()
+
+
+def make_dealer():
+    return Dealer(
+        players=[
+            Player(id=1, proxy=DirectPlayerProxy(), boards=[Species()],
+                   cards=[Card(3, Trait.horns)]),
+            Player(id=2, proxy=DirectPlayerProxy(), bag=4, boards=[
+                Species(population=2, traits=[Trait.cooperation]),
+                Species(food=1, body=2, population=3,
+                        traits=[Trait.fat_tissue, Trait.foraging])]),
+            Player(id=3, proxy=DirectPlayerProxy())],
+        watering_hole=3,
+        deck=[Card(1, Trait.horns), Card(2, Trait.ambush),
+              Card(-1, Trait.scavenger), Card(0, Trait.climbing)])
+
+
+def assert_each_mutation_is_tracked(dealer, mutations):
+    hashes = {dealer.state_hash()}
+    for mutate in mutations:
+        mutate()
+        assert_up_to_date(dealer)
+        hashes.add(dealer.state_hash())
+    assert len(hashes) == len(mutations) + 1
+
+
+def test_keys_are_the_same_everywhere():
+    food = Keys('food')
+
+    assert food[0, 1, 3] == FOOD[0, 1, 3]
+    assert food[0, 1, 3] != food[0, 1, 4]
+    assert food[0, 1, 3] != food[0, 2, 3]
+    assert food[0, 1, 3] != Keys('body')[0, 1, 3]
+    assert food[0, 1, 3] == derive('food', (0, 1, 3))
+    assert 0 <= food[0, 1, 3] < 1 << 64
+
+
+def test_species_mutators_keep_the_hash_up_to_date():
+    dealer = make_dealer()
+    species = dealer.players[1].boards[1]
+
+    assert_each_mutation_is_tracked(dealer, [
+        lambda: species.try_eat(5),
+        lambda: species.try_reproduce(),
+        lambda: species.try_add_body(),
+        lambda: species.try_take_fat_food(2, 5),
+        lambda: species.reset_food(),
+        lambda: species.try_fat_tissue_transfer(),
+        lambda: species.reduce_population(),
+        lambda: species.try_reduce_population_to_food(),
+        lambda: species.replace_trait(0, Trait.carnivore),
+        lambda: species.food_bag_transfer(),
+    ])
+
+
+def test_player_mutators_keep_the_hash_up_to_date():
+    dealer = make_dealer()
+    player = dealer.players[1]
+
+    def remove_first_species():
+        player.boards[0].reduce_population()
+        player.boards[0].reduce_population()
+        assert player.remove_extinct() == [None, 0, 1]
+
+    new_cards = [Card(2, Trait.horns), Card(0, Trait.ambush)]
+
+    assert_each_mutation_is_tracked(dealer, [
+        lambda: player.add_species(Species(body=1, traits=[Trait.horns])),
+        lambda: player.replace_trait(2, 0, Trait.carnivore),
+        lambda: player.add_cards(new_cards),
+        lambda: player.move_food_to_bag(),
+        remove_first_species,
+        lambda: setattr(player, 'bag', 9),
+        lambda: setattr(player, 'cards', player.cards[1:]),
+        lambda: setattr(player, 'boards', [Species(population=5)]),
+    ])
+
+
+def test_dealer_mutators_keep_the_hash_up_to_date():
+    dealer = make_dealer()
+    cheater = dealer.players[0]
+
+    assert_each_mutation_is_tracked(dealer, [
+        lambda: setattr(dealer, 'watering_hole', 1),
+        lambda: dealer.give_cards(dealer.players[2], 3),
+        lambda: dealer._move_first_player_to_last(),
+        lambda: dealer.handle_cheating_player(cheater),
+        lambda: setattr(dealer, 'deck', [Card(-3, Trait.carnivore)]),
+        lambda: setattr(dealer, 'players', dealer.players[::-1]),
+    ])
+    cheater.add_species(Species())
+    assert_up_to_date(dealer)
+
+
+def test_board_order_changes_the_player_hash():
+    boards = [Species(population=2), Species(body=3)]
+    player = Player(id=1, proxy=None, boards=boards)
+    swapped = Player(id=1, proxy=None,
+                     boards=[species.copy() for species in boards[::-1]])
+
+    assert player.state_hash() != swapped.state_hash()
+    assert player.state_hash() == player.copy().state_hash()
+
+
+def test_hash_follows_dealer_equality():
+    def dealer():
+        return Dealer(
+            players=[Player(id=1, proxy=None, boards=[Species()])],
+            watering_hole=3,
+            deck=[Card(1, Trait.horns), Card(2, Trait.ambush)])
+
+    assert dealer().state_hash() == dealer().state_hash()
+
+    dealt = dealer()
+    dealt.give_cards(dealt.players[0], 1)
+    assert dealt.state_hash() != dealer().state_hash()
+    assert_up_to_date(dealt)
+
+    drier = dealer()
+    drier.watering_hole = 2
+    assert drier.state_hash() != dealer().state_hash()
+
+
+def test_hash_follows_new_decks():
+    dealer = Dealer(players=[], deck=[Card(1, Trait.horns)])
+
+    dealer.deck = dealer.deck + [Card(2, Trait.ambush)]
+    assert_up_to_date(dealer)
+
+    reordered = dealer.state_hash()
+    dealer.deck = dealer.deck[::-1]
+    assert_up_to_date(dealer)
+    assert dealer.state_hash() != reordered
+
+
+def test_hash_stays_up_to_date_through_a_game():
+    deck = Dealer._make_deck()
+    Random(7).shuffle(deck)
+    dealer = Dealer(
+        players=[Player(id=seat, proxy=DirectPlayerProxy())
+                 for seat in range(4)],
+        deck=deck)
+
+    hashes = set()
+    while not dealer._is_game_over():
+        dealer.start_turn()
+        dealer.handle_play_cards()
+        assert_up_to_date(dealer)
+
+        dealer.prepare_feeding()
+        while dealer.is_feeding():
+            dealer.feed_step()
+            assert_up_to_date(dealer)
+            hashes.add(dealer.state_hash())
+
+        dealer.finish_turn()
+        assert_up_to_date(dealer)
+
+    assert len(hashes) > 1
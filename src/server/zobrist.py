@@ -0,0 +1,66 @@
+"""
+A state hash is a Natural below 2**64 identifying the state of a species,
+player or dealer. Equal states have equal hashes; different states have
+different hashes except with negligible probability.
+
+Every piece of a state, such as the species on the second board of the
+first seat having 3 food, has its own random key, and the hash of a state
+is the XOR of the keys of its pieces. Keys include the position of the
+piece, so changing a piece, wherever it sits, only takes XOR-ing out its
+old key and XOR-ing in the new one. Only moving a species board or a
+player to another position changes the keys of everything on it.
+"""
+
+from hashlib import blake2b
+
+
+def derive(name, value):
+    """Derives the random key of a value one piece of a state can take
+
+    Keys are derived from the name of the piece and the value, so every
+    process agrees on them and hashes can be compared across runs.
+
+    :param name: name of the piece
+    :type name: str
+
+    :param value: value of the piece, including its position
+    :type value: Any with a stable repr
+
+    :rtype: Natural
+    """
+
+    digest = blake2b(repr((name, value)).encode('utf-8'), digest_size=8)
+    return int.from_bytes(digest.digest(), 'little')
+
+
+class Keys(dict):
+    """Cached keys of the values one piece of a state can take
+
+    Only pieces with a bounded number of values are cached; see derive for
+    the others.
+    """
+
+    def __init__(self, name):
+        """
+        :attr name: name of the piece
+        :type name: str
+        """
+
+        super().__init__()
+        self.name = name
+
+    def __missing__(self, value):
+        key = self[value] = derive(self.name, value)
+        return key
+
+
+FOOD = Keys('food')  # by (seat, board, food)
+BODY = Keys('body')  # by (seat, board, body)
+POPULATION = Keys('population')  # by (seat, board, population)
+FAT_FOOD = Keys('fat-food')  # by (seat, board, fat food)
+TRAIT = Keys('trait')  # by (seat, board, slot, trait value)
+ID = 'id'  # derived by (seat, id), since ids are not bounded
+BAG = Keys('bag')  # by (seat, bag)
+HAND = Keys('hand')  # by (seat, slot, food, trait value)
+WATERING_HOLE = Keys('watering-hole')
+DECK = Keys('deck')  # by (cards below, food, trait value)